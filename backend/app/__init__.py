@@ -1 +1,7 @@
-from . import main, models, router, db, auth
+"""
+RH service application package.
+
+Subpackages are imported where they are used (``app.main`` for the API), so
+importing a light module such as ``app.server`` does not build the whole
+application.
+"""
@@ -0,0 +1,9 @@
+"""Admission control: concurrency limits and bounded queues per route class."""
+
+from . import settings
+from .limiter import (
+    ConcurrencyLimiter,
+    Rejected,
+    build_limiters,
+    route_class,
+)
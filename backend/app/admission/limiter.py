@@ -0,0 +1,162 @@
+"""
+Concurrency limits with bounded queues.
+
+A ``ConcurrencyLimiter`` lets ``limit`` requests run at once. The next ones
+wait in FIFO order, at most ``queue_size`` of them and for at most
+``queue_timeout`` seconds; past either bound ``acquire`` raises ``Rejected``
+right away, so an overloaded worker answers quickly instead of letting every
+request time out.
+
+With ``latency_target`` set the limit adapts (AIMD): a request slower than the
+target shrinks it by ``decrease_factor``, at most once per target period, and
+a faster one grows it by ``1 / limit``, between ``min_limit`` and
+``max_limit``.
+
+The limiters of a worker live on its event loop and need no locking.
+"""
+
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import Callable
+
+from . import settings as st
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    def __init__(
+        self,
+        limit: float,
+        queue_size: int,
+        queue_timeout: float,
+        latency_target: float | None = None,
+        min_limit: float = st.ADMISSION_MIN_LIMIT,
+        decrease_factor: float = st.ADMISSION_DECREASE_FACTOR,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.max_limit = limit
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.min_limit = min(min_limit, limit)
+        self.decrease_factor = decrease_factor
+        self.clock = clock
+        self.in_use = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = float("-inf")
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _has_slot(self) -> bool:
+        return self.in_use < max(int(self.limit), 1)
+
+    async def acquire(self):
+        if self._has_slot() and not self._waiters:
+            self.in_use += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            raise Rejected("queue full", self.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError as e:
+            self._abandon(waiter)
+            raise Rejected("queue timeout", self.queue_timeout) from e
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as the wait ended, pass it on.
+            self.release()
+            return
+
+        waiter.cancel()
+
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, seconds: float | None = None):
+        """Frees a slot; ``seconds`` is the time the request took."""
+
+        self.in_use -= 1
+
+        if seconds is not None:
+            self._adapt(seconds)
+
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
+
+    def _adapt(self, seconds: float):
+        if self.latency_target is None:
+            return
+
+        if seconds > self.latency_target:
+            now = self.clock()
+
+            if now - self._decreased_at >= self.latency_target:
+                self._decreased_at = now
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+# Probes, metrics and keys must answer even when the worker is overloaded.
+EXEMPT_PREFIXES = ("/check", "/metrics", "/.well-known/", "/admin/")
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def route_class(
+    method: str, path: str, export_paths: list[str] = st.ADMISSION_EXPORT_PATHS
+) -> str | None:
+    """The class limiting a request: auth, export, write or read (None: exempt)."""
+
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+
+    if path.startswith("/auth/"):
+        return "auth"
+
+    if any(path.startswith(prefix) for prefix in export_paths):
+        return "export"
+
+    return "write" if method in WRITE_METHODS else "read"
+
+
+def build_limiters(
+    adaptive: bool = st.ADMISSION_ADAPTIVE,
+) -> dict[str, ConcurrencyLimiter]:
+    """One limiter per class of ADMISSION_LIMITS, the other classes are free."""
+
+    return {
+        name: ConcurrencyLimiter(
+            limit,
+            int(st.ADMISSION_QUEUE_SIZES.get(name, 0)),
+            st.ADMISSION_QUEUE_TIMEOUTS.get(name, 1.0),
+            st.ADMISSION_LATENCY_TARGETS.get(name) if adaptive else None,
+        )
+        for name, limit in st.ADMISSION_LIMITS.items()
+        if limit > 0
+    }
@@ -0,0 +1,45 @@
+""" Variables defined by the environment for the admission control """
+
+import os
+
+
+def parse_classes(value: str) -> dict[str, float]:
+    """Parses ``"auth=4,read=16"`` into ``{"auth": 4.0, "read": 16.0}``."""
+
+    values = {}
+
+    for entry in value.split(","):
+        name, _, number = entry.partition("=")
+        if name.strip() and number.strip():
+            values[name.strip()] = float(number)
+
+    return values
+
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+# Per worker and route class: requests handled at once, requests waiting for a
+# slot, and how long one may wait before it is answered 503.
+ADMISSION_LIMITS = parse_classes(
+    os.environ.get("ADMISSION_LIMITS", "auth=4,read=16,write=8,export=2")
+)
+ADMISSION_QUEUE_SIZES = parse_classes(
+    os.environ.get("ADMISSION_QUEUE_SIZES", "auth=8,read=32,write=16,export=2")
+)
+ADMISSION_QUEUE_TIMEOUTS = parse_classes(
+    os.environ.get("ADMISSION_QUEUE_TIMEOUTS", "auth=1,read=1,write=2,export=5")
+)
+# Routes of the export class (heavy reads), matched on the path prefix.
+ADMISSION_EXPORT_PATHS = [
+    path.strip()
+    for path in os.environ.get("ADMISSION_EXPORT_PATHS", "/enterprise/full").split(",")
+    if path.strip()
+]
+# AIMD: a request slower than its class target shrinks the limit by
+# ADMISSION_DECREASE_FACTOR (at most once per target), a faster one grows it by
+# 1/limit, between ADMISSION_MIN_LIMIT and the configured limit.
+ADMISSION_ADAPTIVE = os.environ.get("ADMISSION_ADAPTIVE", "false").lower() == "true"
+ADMISSION_LATENCY_TARGETS = parse_classes(
+    os.environ.get("ADMISSION_LATENCY_TARGETS", "auth=0.5,read=0.25,write=0.5,export=2")
+)
+ADMISSION_DECREASE_FACTOR = float(os.environ.get("ADMISSION_DECREASE_FACTOR", "0.9"))
+ADMISSION_MIN_LIMIT = float(os.environ.get("ADMISSION_MIN_LIMIT", "1"))
@@ -6,12 +6,70 @@ Featuring a large salt and variable number of rounds, it’s currently the defau
 hash for many systems (notably BSD), and has no known weaknesses. 
 
 Font: (https://passlib.readthedocs.io/en/stable/lib/passlib.hash.bcrypt.html)
+
+The schemes and their cost come from the environment (``PASSWORD_SCHEMES``,
+``PASSWORD_BCRYPT_ROUNDS``, ``PASSWORD_ARGON2_*``). Hashes made with another
+scheme or cost still verify, and ``needs_rehash`` flags them so the login
+rewrites them with the current settings.
+
+Logins for unknown emails go through ``dummy_validate``, a verify against a
+precomputed hash, so they take as long as a wrong password.
 """
 
+from functools import cache
+import secrets
+
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+
+from app.metrics.instruments import PASSWORD_HASH_DURATION, PASSWORD_HASH_IN_PROGRESS
+from app.tracing import tracer
+
+from . import settings as st
+
+
+def check_schemes(schemes: list[str]) -> None:
+    """
+    Raises ``ValueError`` for a scheme passlib does not know or has no backend
+    installed for, so the worker fails at startup instead of on the first
+    hash or verify.
+    """
+
+    for scheme in schemes:
+        try:
+            handler = get_crypt_handler(scheme)
+        except KeyError as exc:
+            raise ValueError(f"unknown password scheme {scheme}") from exc
+
+        if hasattr(handler, "has_backend") and not handler.has_backend():
+            raise ValueError(f"password scheme {scheme} has no backend installed")
+
+
+def build_context(
+    schemes: list[str] = st.PASSWORD_SCHEMES,
+    bcrypt_rounds: int = st.PASSWORD_BCRYPT_ROUNDS,
+) -> CryptContext:
+    """
+    Context hashing with the first scheme. Other schemes are deprecated, and
+    the costs are pinned (min = max = default), so any other cost, lower or
+    higher, needs an update.
+    """
+
+    check_schemes(schemes)
+
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__time_cost=st.PASSWORD_ARGON2_TIME_COST,
+        argon2__memory_cost=st.PASSWORD_ARGON2_MEMORY_COST,
+        argon2__parallelism=st.PASSWORD_ARGON2_PARALLELISM,
+    )
 
 
-passord_hash = CryptContext(schemes=["bcrypt"], deprecated="auto")
+passord_hash = build_context()
 
 
 def get_hashed_data(data: str) -> str:
@@ -19,8 +77,38 @@ def get_hashed_data(data: str) -> str:
     Hashes and return str with the configured scheme
     """
 
-    return passord_hash.hash(data)
+    with (
+        tracer.start_as_current_span("password.hash"),
+        PASSWORD_HASH_DURATION.labels("hash").time(),
+        PASSWORD_HASH_IN_PROGRESS.track_inprogress(),
+    ):
+        return passord_hash.hash(data)
 
 
 def validate_hashed_data(data: str, hashed_data: str) -> bool:
-    return passord_hash.verify(data, hashed_data)
+    with (
+        tracer.start_as_current_span("password.verify"),
+        PASSWORD_HASH_DURATION.labels("verify").time(),
+        PASSWORD_HASH_IN_PROGRESS.track_inprogress(),
+    ):
+        return passord_hash.verify(data, hashed_data)
+
+
+def needs_rehash(hashed_data: str) -> bool:
+    """Whether ``hashed_data`` uses another scheme or cost than configured."""
+
+    return passord_hash.needs_update(hashed_data)
+
+
+@cache
+def get_dummy_hash() -> str:
+    """Hash of a random secret, computed once with the configured scheme."""
+
+    return passord_hash.hash(secrets.token_urlsafe(16))
+
+
+def dummy_validate(data: str) -> bool:
+    """Verifies ``data`` against the dummy hash, always False."""
+
+    validate_hashed_data(data, get_dummy_hash())
+    return False
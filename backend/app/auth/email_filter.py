@@ -0,0 +1,193 @@
+"""
+Known emails.
+
+``known_emails`` is a counting Bloom filter of the emails of every user. A
+login whose email the filter does not contain skips the user query and goes
+straight to the dummy verify (``app.auth.data_hash.dummy_validate``), so an
+enumeration flood costs no database work and answers like a wrong password.
+The filter can say an unknown email is known (then the query runs as before),
+never the opposite while it is in sync.
+
+It is loaded at startup and then updated incrementally: inserts, deletes and
+email changes are applied after their commit, and broadcast through the broker
+(``app.messages.broadcast``) to the other workers and pods. It is only trusted
+(``ready``) while the broadcast runs; until then every login queries the
+database. The broadcast is not persisted, so the changes sent while its
+connection is down are lost: the filter is cleared when the connection drops
+and loaded again once it is back.
+"""
+
+from hashlib import blake2b
+import json
+import math
+from threading import Lock
+from typing import Any, Callable
+from uuid import uuid4
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import select
+
+from app.models.user import User
+
+from . import settings as st
+
+
+# Distinguishes the broadcasts of this process, which already applied them.
+ORIGIN = uuid4().hex
+
+_PENDING_KEY = "known_emails"
+
+_MAX_COUNT = 255
+
+
+class CountingBloomFilter:
+    """
+    Bloom filter with 8 bit counters, so items can be removed. A saturated
+    counter is never decremented again, which keeps it free of false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._counters = bytearray(self.size)
+        self._lock = Lock()
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        with self._lock:
+            for position in self._positions(item):
+                if self._counters[position] < _MAX_COUNT:
+                    self._counters[position] += 1
+            self.count += 1
+
+    def remove(self, item: str):
+        positions = self._positions(item)
+
+        with self._lock:
+            if not all(self._counters[position] for position in positions):
+                return
+
+            for position in positions:
+                if self._counters[position] < _MAX_COUNT:
+                    self._counters[position] -= 1
+            self.count -= 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._counters[position] for position in self._positions(item))
+
+    def clear(self):
+        with self._lock:
+            self._counters = bytearray(self.size)
+            self.count = 0
+
+
+class KnownEmails:
+    """The filter of user emails and its synchronisation state."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.filter = CountingBloomFilter(capacity, error_rate)
+        self.ready = False
+        self.on_change: Callable[[list[str], list[str]], None] | None = None
+
+    def might_exist(self, email: str) -> bool:
+        return not self.ready or email in self.filter
+
+    def apply(self, added: list[str], removed: list[str]):
+        for email in added:
+            self.filter.add(email)
+
+        for email in removed:
+            self.filter.remove(email)
+
+    def committed(self, added: list[str], removed: list[str]):
+        self.apply(added, removed)
+
+        if self.on_change is not None:
+            self.on_change(added, removed)
+
+    def load(self, session: Session):
+        """
+        Adds the emails of the users table. The filter is not cleared first:
+        changes broadcast while the query runs are kept, and an email counted
+        twice only makes its removal leave a false positive behind.
+        """
+
+        emails = session.exec(select(User.email)).all()  # type: ignore[attr-defined]
+
+        self.apply(list(emails), [])
+
+    def clear(self):
+        self.ready = False
+        self.filter.clear()
+
+
+known_emails = KnownEmails(
+    st.LOGIN_EMAIL_FILTER_CAPACITY, st.LOGIN_EMAIL_FILTER_ERROR_RATE
+)
+
+
+def encode_changes(added: list[str], removed: list[str]) -> str:
+    return json.dumps({"origin": ORIGIN, "added": added, "removed": removed})
+
+
+def apply_broadcast(message: str):
+    body: dict[str, Any] = json.loads(message)
+
+    if body["origin"] != ORIGIN:
+        known_emails.apply(body["added"], body["removed"])
+
+
+def _pending(target: User) -> dict[str, list[str]] | None:
+    session = object_session(target)
+
+    if session is None:
+        return None
+
+    return session.info.setdefault(_PENDING_KEY, {"added": [], "removed": []})
+
+
+@event.listens_for(User, "after_insert")
+def _add_created_email(_mapper, _connection, target: User):
+    pending = _pending(target)
+    if pending is not None:
+        pending["added"].append(target.email)
+
+
+@event.listens_for(User, "after_update")
+def _replace_changed_email(_mapper, _connection, target: User):
+    history = inspect(target).attrs.email.history
+    pending = _pending(target)
+
+    if pending is None or not history.has_changes():
+        return
+
+    pending["added"].extend(history.added)
+    pending["removed"].extend(history.deleted)
+
+
+@event.listens_for(User, "after_delete")
+def _remove_deleted_email(_mapper, _connection, target: User):
+    pending = _pending(target)
+    if pending is not None:
+        pending["removed"].append(target.email)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_emails(session: Session):
+    changes = session.info.pop(_PENDING_KEY, None)
+
+    if changes and (changes["added"] or changes["removed"]):
+        known_emails.committed(changes["added"], changes["removed"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_emails(session: Session, _previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,143 @@
+"""
+Signing keys and the JWKS document of the service.
+
+Tokens are signed with ``JWT_SECRET_ENCODE_KEY`` and carry the ``kid`` of its
+key in their header. The keys a token may be verified with are
+``JWT_SECRET_DECODE_KEY`` and ``JWT_EXTRA_DECODE_KEYS`` (the keys of the next
+or previous signing key during a rotation), indexed by ``kid``.
+
+With an asymmetric algorithm (RS*, PS*, ES*, EdDSA) the public keys are
+published at ``/.well-known/jwks.json``, so the sibling services verify tokens
+locally with the keys they cached from it. The ``kid`` of a public key is its
+RFC 7638 thumbprint. Secrets of the HS* algorithms are never published: their
+``kid`` is derived with an HMAC and the document has no keys.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import re
+from typing import Any
+
+import jwt
+from jwt.algorithms import HMACAlgorithm
+
+from .settings import (
+    ALGORITHM,
+    JWT_EXTRA_DECODE_KEYS,
+    JWT_SECRET_DECODE_KEY,
+    JWT_SECRET_ENCODE_KEY,
+)
+
+
+# Members of a JWK hashed by its thumbprint, by key type (RFC 7638, 8037).
+_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+_PEM_BLOCK = re.compile(r"-----BEGIN [A-Z ]+-----.+?-----END [A-Z ]+-----", re.S)
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def parse_keys(value: str) -> list[str]:
+    """Splits PEM blocks, or comma separated secrets when there are none."""
+
+    if "-----BEGIN" in value:
+        return _PEM_BLOCK.findall(value)
+
+    return [key.strip() for key in value.split(",") if key.strip()]
+
+
+def thumbprint(jwk: dict[str, Any]) -> str:
+    members = {name: jwk[name] for name in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True)
+
+    return _b64url(hashlib.sha256(canonical.encode("utf-8")).digest())
+
+
+class SigningKeys:
+    """The signing key, the verification keys by ``kid`` and the JWKS."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        encode_key: str,
+        decode_key: str,
+        extra_decode_keys: list[str] | None = None,
+    ):
+        self.algorithm = algorithm
+        self._algorithm = jwt.get_algorithm_by_name(algorithm)
+        self.symmetric = isinstance(self._algorithm, HMACAlgorithm)
+
+        # Parsed once: loading a PEM key costs more than a signature check.
+        self.encode_key = self._algorithm.prepare_key(encode_key)
+        self.kid = self._key_id(self.encode_key)
+        self.decode_keys: dict[str, Any] = {}
+        self.jwks: dict[str, list[dict[str, Any]]] = {"keys": []}
+
+        for key in [decode_key, *(extra_decode_keys or [])]:
+            prepared = self._algorithm.prepare_key(key)
+            kid = self._key_id(prepared)
+
+            if kid in self.decode_keys:
+                continue
+
+            self.decode_keys[kid] = prepared
+
+            if not self.symmetric:
+                self.jwks["keys"].append(
+                    {**self._public_jwk(prepared), "kid": kid, "use": "sig"}
+                )
+
+        self.document = json.dumps(self.jwks, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.document).hexdigest()[:32]}"'
+
+    def _public_jwk(self, key: Any) -> dict[str, Any]:
+        public_key = key.public_key() if hasattr(key, "private_bytes") else key
+
+        return {
+            **self._algorithm.to_jwk(public_key, as_dict=True),
+            "alg": self.algorithm,
+        }
+
+    def _key_id(self, key: Any) -> str:
+        if self.symmetric:
+            return _b64url(hmac.new(key, b"kid", hashlib.sha256).digest()[:16])
+
+        return thumbprint(self._public_jwk(key))
+
+    @property
+    def primary_decode_key(self) -> Any:
+        return next(iter(self.decode_keys.values()))
+
+    def decode_key(self, kid: str) -> Any:
+        try:
+            return self.decode_keys[kid]
+        except KeyError as ex:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid}") from ex
+
+
+# Installed by ``app.auth.jwt_utils.use_signing_keys`` (``create_app``).
+signing_keys: SigningKeys | None = None
+
+
+def get_signing_keys() -> SigningKeys:
+    """The installed keys, else the keys of the environment."""
+
+    global signing_keys  # pylint: disable=global-statement
+
+    if signing_keys is None:
+        signing_keys = SigningKeys(
+            ALGORITHM,
+            JWT_SECRET_ENCODE_KEY,
+            JWT_SECRET_DECODE_KEY,
+            parse_keys(JWT_EXTRA_DECODE_KEYS),
+        )
+
+    return signing_keys
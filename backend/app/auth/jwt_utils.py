@@ -2,28 +2,59 @@
 Create, sign and verify JWT Tokens
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 from typing import Any, Union
+from uuid import uuid4
 
 from fastapi import HTTPException, status
 import jwt
 from jwt.exceptions import MissingRequiredClaimError
 
-from app.auth.settings import (
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    ALGORITHM,
-    JWT_SECRET_DECODE_KEY,
-    JWT_SECRET_ENCODE_KEY,
-)
+from app.auth import jwks
+from app.auth.settings import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.metrics.instruments import JWT_DURATION
+from app.tracing import tracer
 
 DEFAULT_OPTIONS = {
     "iss": "openferp.org",
 }
 
-DEFAULT_ENCODE_CONFIG = {"JWT_KEY": JWT_SECRET_ENCODE_KEY, "JWT_ALGO": ALGORITHM}
+# Filled by ``use_signing_keys``. Tokens with a ``kid`` are verified with its
+# key from ``JWT_KEYS``, the others with ``JWT_KEY``.
+DEFAULT_ENCODE_CONFIG: dict[str, Any] = {}
 
-DEFAULT_DECODE_CONFIG = {"JWT_KEY": JWT_SECRET_DECODE_KEY, "JWT_ALGO": ALGORITHM}
+DEFAULT_DECODE_CONFIG: dict[str, Any] = {}
+
+
+def use_signing_keys(keys: jwks.SigningKeys):
+    """Signs and verifies the tokens with ``keys`` from now on."""
+
+    jwks.signing_keys = keys
+    DEFAULT_ENCODE_CONFIG.update(
+        {"JWT_KEY": keys.encode_key, "JWT_ALGO": keys.algorithm, "JWT_KID": keys.kid}
+    )
+    DEFAULT_DECODE_CONFIG.update(
+        {
+            "JWT_KEY": keys.primary_decode_key,
+            "JWT_ALGO": keys.algorithm,
+            "JWT_KEYS": keys,
+        }
+    )
+
+
+def default_encode_config() -> dict[str, Any]:
+    if not DEFAULT_ENCODE_CONFIG:
+        use_signing_keys(jwks.get_signing_keys())
+
+    return DEFAULT_ENCODE_CONFIG
+
+
+def default_decode_config() -> dict[str, Any]:
+    if not DEFAULT_DECODE_CONFIG:
+        use_signing_keys(jwks.get_signing_keys())
+
+    return DEFAULT_DECODE_CONFIG
 
 
 class JWTValidationError(Exception):
@@ -35,29 +66,40 @@ def create_jwt_token(
     payload: dict,
     expires: int = ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     config: dict[str, Any] | None = None,
+    claims: dict[str, Any] | None = None,
 ) -> str:
     """
     Create a signed token with a defined algorithm and secret
-    for signature. The payload is a dict and the expire time is in minutes
+    for signature. The payload is a dict and the expire time is in minutes.
+    Extra registered or private claims (e.g. ``ver``) go in ``claims``. Every
+    token gets a ``jti``, the handle used to revoke it, and the ``kid`` header
+    of ``config["JWT_KID"]`` when set.
     """
 
     if config is None:
-        config = DEFAULT_ENCODE_CONFIG
+        config = default_encode_config()
 
     current_default_options: dict[str, Union[str, datetime]] = {
         **DEFAULT_OPTIONS,
-        "iat": datetime.now(),
+        "iat": datetime.now(timezone.utc),
+        "jti": uuid4().hex,
     }
 
-    return jwt.encode(
-        {
-            "exp": (datetime.now() + timedelta(seconds=expires)).timestamp(),
-            "sub": str(payload).replace("'", '"'),
-            **current_default_options,
-        },
-        config["JWT_KEY"],
-        config["JWT_ALGO"],
-    )
+    with (
+        tracer.start_as_current_span("jwt.sign"),
+        JWT_DURATION.labels("sign").time(),
+    ):
+        return jwt.encode(
+            {
+                "exp": (datetime.now() + timedelta(seconds=expires)).timestamp(),
+                "sub": str(payload).replace("'", '"'),
+                **current_default_options,
+                **(claims or {}),
+            },
+            config["JWT_KEY"],
+            config["JWT_ALGO"],
+            headers={"kid": config["JWT_KID"]} if config.get("JWT_KID") else None,
+        )
 
 
 def decode_jwt_token(
@@ -70,23 +112,31 @@ def decode_jwt_token(
     """
 
     if config is None:
-        config = DEFAULT_DECODE_CONFIG
+        config = default_decode_config()
 
     decoded_claims: Union[dict[str, Any], None] = None
+    key = config["JWT_KEY"]
 
-    decoded_claims = jwt.decode(
-        token,
-        key=config["JWT_KEY"],
-        algorithms=config["JWT_ALGO"],
-        issuer=DEFAULT_OPTIONS["iss"],
-    )
+    with (
+        tracer.start_as_current_span("jwt.verify"),
+        JWT_DURATION.labels("verify").time(),
+    ):
+        if config.get("JWT_KEYS") is not None:
+            kid = jwt.get_unverified_header(token).get("kid")
+
+            if kid is not None:
+                key = config["JWT_KEYS"].decode_key(kid)
+
+        decoded_claims = jwt.decode(
+            token,
+            key=key,
+            algorithms=config["JWT_ALGO"],
+            issuer=DEFAULT_OPTIONS["iss"],
+        )
 
     if decoded_claims is None:
         raise JWTValidationError()
 
-    print("Claims: ", str(decoded_claims))
-    print("Sub: ", str(decoded_claims["sub"]))
-
     decoded_claims.update({"sub": json.loads(decoded_claims["sub"])})
 
     if abs(
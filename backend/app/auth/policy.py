@@ -0,0 +1,120 @@
+"""
+Authorization policies.
+
+A policy allows a role hierarchy up to a threshold (1 is the owner, lower is
+more privileged) and a set of scopes; the ``All`` scope is always allowed.
+``POLICIES`` declares the policy of each protected route, and is compiled at
+import into ``CompiledPolicy`` objects where the scopes are a bitmask, so a
+check is an integer comparison and a bitwise and.
+
+The policies of the routes acting on another user (``target``) also let a
+caller through when the target's role is not above its own and the target is
+in its scope: the route checks that part once it loaded the target.
+
+Scope names are mapped to bits by ``scope_bit``. The set is closed: it holds
+the default scopes, the only ones an enterprise gets, so a policy naming
+another scope fails at import and a user in another scope passes none.
+"""
+
+from dataclasses import dataclass
+
+from app.models.role import DefaultRole
+from app.models.scope import DefaultScope
+
+
+_SCOPE_BITS: dict[str, int] = {
+    scope.value: 1 << i for i, scope in enumerate(DefaultScope)
+}
+
+ALL_SCOPES_BIT = _SCOPE_BITS[DefaultScope.ALL.value]
+
+
+def scope_bit(name: str) -> int:
+    """The bit of a scope, 0 for a scope no policy can grant."""
+
+    return _SCOPE_BITS.get(name, 0)
+
+
+@dataclass(frozen=True)
+class Policy:
+    """
+    Allows the roles up to ``role`` in hierarchy, in the ``scopes`` (or All).
+    With ``target``, also the callers over the target user.
+    """
+
+    role: DefaultRole
+    scopes: tuple[DefaultScope, ...] = ()
+    target: bool = False
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    max_hierarchy: int
+    scope_mask: int
+    target: bool = False
+
+    def allows(self, hierarchy: int, scope_name: str) -> bool:
+        return hierarchy <= self.max_hierarchy and bool(
+            self.scope_mask & scope_bit(scope_name)
+        )
+
+    def allows_over(
+        self,
+        hierarchy: int,
+        scope_name: str,
+        target_hierarchy: int,
+        target_scope: str,
+    ) -> bool:
+        """
+        Checks a caller acting on a target user, whose role must not be above
+        the caller's and who must be in the caller's scope, unless the policy
+        allows the caller's role or scope by itself.
+        """
+
+        return hierarchy <= max(self.max_hierarchy, target_hierarchy) and (
+            scope_name == target_scope or bool(self.scope_mask & scope_bit(scope_name))
+        )
+
+
+def compile_policy(
+    scopes: tuple[str, ...], max_hierarchy: int, target: bool = False
+) -> CompiledPolicy:
+    """
+    Compiles a policy from scope names and a hierarchy threshold. The owner
+    (hierarchy 1) passes any threshold. Raises ``ValueError`` for a scope
+    outside the closed set.
+    """
+
+    mask = ALL_SCOPES_BIT
+
+    for name in scopes:
+        if name not in _SCOPE_BITS:
+            raise ValueError(f"Unknown scope {name!r}")
+
+        mask |= scope_bit(name)
+
+    return CompiledPolicy(max(max_hierarchy, 1), mask, target)
+
+
+POLICIES: dict[str, Policy] = {
+    "enterprise.read_full": Policy(
+        DefaultRole.COLLABORATOR, (DefaultScope.HUMAN_RESOURCE,)
+    ),
+    "enterprise.update": Policy(DefaultRole.OWNER),
+    "enterprise.delete": Policy(DefaultRole.OWNER),
+    "user.list": Policy(DefaultRole.OWNER),
+    "user.read": Policy(DefaultRole.OWNER, target=True),
+    "user.create": Policy(DefaultRole.OWNER, target=True),
+    # Managers edit any member of their scope, whatever its role.
+    "user.update": Policy(DefaultRole.MANAGER, target=True),
+    "user.delete": Policy(DefaultRole.OWNER, target=True),
+}
+
+COMPILED_POLICIES: dict[str, CompiledPolicy] = {
+    name: compile_policy(
+        tuple(scope.value for scope in policy.scopes),
+        DefaultRole.get_default_hierarchy(policy.role.value),
+        policy.target,
+    )
+    for name, policy in POLICIES.items()
+}
@@ -0,0 +1,231 @@
+"""
+Login throttling.
+
+Each attempt at ``/auth/login`` takes a token from the bucket of the client
+address, then from the bucket of the email, before the user is looked up and
+the password verified: an attempt over either limit is answered with 429 and
+``Retry-After`` without spending any bcrypt time. A successful login refills
+the email bucket, so only repeated failures lock an account out.
+
+Behind a proxy the peer is the proxy for every user. When the peer is one of
+``LOGIN_TRUSTED_PROXIES`` the client address is taken from ``X-Forwarded-For``
+instead: its right-most entry that is not a trusted proxy, the one appended by
+the proxies themselves. A request from a trusted proxy without such an entry
+only counts against its email bucket.
+
+Buckets live in a ``BucketStore``. ``LocalBucketStore`` keeps them in the
+worker (each worker then enforces the limits on its own); a shared store, e.g.
+on Redis, is plugged in with ``LOGIN_RATE_LIMIT_BACKEND=module:factory`` and
+only needs an atomic ``take``.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from importlib import import_module
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+import logging
+from threading import Lock
+from time import monotonic
+from typing import Callable, Protocol
+
+from app.metrics.instruments import LOGIN_THROTTLED
+
+from . import settings as st
+
+
+logger = logging.getLogger(__name__)
+
+
+class BucketStore(Protocol):
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        Takes a token from the bucket ``key``, full when first seen.
+
+        Returns:
+            float: 0 when a token was taken, else the seconds until one is.
+        """
+
+    def reset(self, key: str):
+        """Refills the bucket ``key``."""
+
+    def clear(self):
+        """Refills every bucket."""
+
+
+class LocalBucketStore:
+    """Buckets of this process, the least recently used dropped past max_keys."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_per_second
+
+            self._buckets[key] = (tokens, now)
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+            return wait
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class TrustedProxies:
+    """Addresses, networks and host names of the proxies in front."""
+
+    def __init__(self, proxies: list[str]):
+        self.networks: list[IPv4Network | IPv6Network] = []
+        self.names: set[str] = set()
+
+        for proxy in proxies:
+            try:
+                self.networks.append(ip_network(proxy, strict=False))
+            except ValueError:
+                self.names.add(proxy)
+
+    def __contains__(self, host: str) -> bool:
+        if host in self.names:
+            return True
+
+        try:
+            address = ip_address(host)
+        except ValueError:
+            return False
+
+        return any(address in network for network in self.networks)
+
+
+trusted_proxies = TrustedProxies(st.LOGIN_TRUSTED_PROXIES)
+
+
+def client_address(
+    peer: str | None,
+    forwarded_for: str | None,
+    trusted: TrustedProxies | None = None,
+) -> str | None:
+    """The address the ip bucket is keyed by, None to skip that bucket."""
+
+    trusted = trusted_proxies if trusted is None else trusted
+
+    if peer is None or peer not in trusted:
+        return peer
+
+    for host in reversed((forwarded_for or "").split(",")):
+        host = host.strip()
+
+        if host and host not in trusted:
+            return host
+
+    return None
+
+
+@dataclass(frozen=True)
+class Limit:
+    name: str
+    burst: float
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60
+
+    @property
+    def enabled(self) -> bool:
+        """A limit with a rate of 0 (or less) is off: its bucket would never refill."""
+
+        return self.per_minute > 0
+
+
+class LoginRateLimiter:
+    """Throttles the login attempts by client address and by email."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        ip_limit: Limit,
+        email_limit: Limit,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+        self.enabled = enabled
+
+    def _take(self, limit: Limit, value: str) -> float:
+        if not limit.enabled:
+            return 0.0
+
+        wait = self.store.take(
+            f"login:{limit.name}:{value}", limit.burst, limit.refill_per_second
+        )
+
+        if wait:
+            LOGIN_THROTTLED.labels(limit.name).inc()
+
+        return wait
+
+    def attempt(self, ip: str | None, email: str) -> float:
+        """
+        Counts a login attempt.
+
+        Returns:
+            float: 0 when the attempt may proceed, else the seconds to wait.
+        """
+
+        if not self.enabled:
+            return 0.0
+
+        if ip:
+            wait = self._take(self.ip_limit, ip)
+            if wait:
+                return wait
+
+        return self._take(self.email_limit, email.strip().lower())
+
+    def succeeded(self, email: str):
+        if self.enabled and self.email_limit.enabled:
+            self.store.reset(f"login:{self.email_limit.name}:{email.strip().lower()}")
+
+
+def load_store(spec: str = st.LOGIN_RATE_LIMIT_BACKEND) -> BucketStore:
+    """Builds the store named by ``LOGIN_RATE_LIMIT_BACKEND``."""
+
+    if spec == "local":
+        return LocalBucketStore(st.LOGIN_RATE_LIMIT_MAX_KEYS)
+
+    module, _, attribute = spec.partition(":")
+    factory = getattr(import_module(module), attribute)
+    logger.info("Login rate limit buckets on %s", spec)
+
+    return factory()
+
+
+login_limiter = LoginRateLimiter(
+    load_store(),
+    ip_limit=Limit("ip", st.LOGIN_IP_BURST, st.LOGIN_IP_PER_MINUTE),
+    email_limit=Limit("email", st.LOGIN_EMAIL_BURST, st.LOGIN_EMAIL_PER_MINUTE),
+    enabled=st.LOGIN_RATE_LIMIT_ENABLED,
+)
+
+
+def get_login_limiter() -> LoginRateLimiter:
+    return login_limiter
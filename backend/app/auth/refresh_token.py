@@ -0,0 +1,147 @@
+"""
+Refresh tokens.
+
+A refresh token is a random opaque string, stored as its HMAC with
+``JWT_REFRESH_SECRET_KEY``: the tokens have enough entropy that a keyed hash is
+as safe as bcrypt here, and checking one costs a microsecond. ``create_app``
+installs the key of its settings with ``use_refresh_secret_key``.
+
+``rotate_refresh_token`` exchanges a token for the next one of its family. The
+token is marked used with a conditional update, so of two concurrent
+exchanges only one succeeds. Presenting a used token again means it was copied:
+the whole family is deleted, logging out both the thief and the user.
+"""
+
+from datetime import datetime as dt, timedelta, timezone
+import hashlib
+import hmac
+import logging
+import secrets
+from uuid import uuid4
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, col, select
+
+from app.models.refresh_token import RefreshToken
+
+from .settings import JWT_REFRESH_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is unknown, expired or was already used."""
+
+
+def utcnow() -> dt:
+    return dt.now(timezone.utc).replace(tzinfo=None)
+
+
+secret_key = JWT_REFRESH_SECRET_KEY.encode()
+
+
+def use_refresh_secret_key(key: str):
+    """HMACs the refresh tokens with ``key`` from now on."""
+
+    global secret_key  # pylint: disable=global-statement
+    secret_key = key.encode()
+
+
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(secret_key, token.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_refresh_token(
+    session: Session, user_id: int, family_id: str | None = None
+) -> str:
+    """
+    Adds a refresh token for ``user_id`` to the session, in a new family
+    unless ``family_id`` is given. The caller commits.
+
+    Returns:
+        str: the token, which is not stored anywhere.
+    """
+
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id or uuid4().hex,
+            user_id=user_id,
+            expires_at=utcnow() + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+    )
+
+    return token
+
+
+def revoke_family(session: Session, family_id: str):
+    session.execute(
+        delete(RefreshToken).where(col(RefreshToken.family_id) == family_id)
+    )
+
+
+def revoke_refresh_token(session: Session, token: str, user_id: int):
+    """Deletes the family of ``token`` if it belongs to ``user_id``."""
+
+    stored = session.exec(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token),
+            RefreshToken.user_id == user_id,
+        )
+    ).first()
+
+    if stored is not None:
+        revoke_family(session, stored.family_id)
+
+
+def rotate_refresh_token(session: Session, token: str) -> tuple[int, str]:
+    """
+    Marks ``token`` used and issues the next token of its family. Commits.
+
+    Returns:
+        tuple[int, str]: the user id and the new refresh token.
+
+    Raises:
+        RefreshTokenError: when the token cannot be exchanged.
+    """
+
+    now = utcnow()
+    stored = session.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))
+    ).first()
+
+    if stored is None or stored.expires_at <= now:
+        raise RefreshTokenError()
+
+    marked = session.execute(
+        update(RefreshToken)
+        .where(
+            col(RefreshToken.id) == stored.id,
+            col(RefreshToken.used_at).is_(None),
+        )
+        .values(used_at=now)
+    )
+
+    if marked.rowcount != 1:  # type: ignore[attr-defined]
+        logger.warning(
+            "Refresh token reused, revoking family %s of user %s",
+            stored.family_id,
+            stored.user_id,
+        )
+        revoke_family(session, stored.family_id)
+        session.commit()
+        raise RefreshTokenError()
+
+    # The used tokens are kept until they expire, to detect their reuse.
+    session.execute(
+        delete(RefreshToken).where(
+            col(RefreshToken.user_id) == stored.user_id,
+            col(RefreshToken.expires_at) <= now,
+        )
+    )
+    new_token = issue_refresh_token(session, stored.user_id, stored.family_id)
+    session.commit()
+
+    return stored.user_id, new_token
@@ -0,0 +1,263 @@
+"""
+Access token revocation.
+
+A token is revoked by its ``jti`` (``/auth/logout``) or by a per-user
+"not before" time (password change, logout everywhere): every token of the
+user issued earlier is rejected, and its refresh tokens are deleted. Tokens
+issued earlier within the same second are not covered. ``revocations`` holds
+both in dicts, so ``authenticate_user`` checks a token with two lookups and no
+query.
+
+An entry is only useful until the tokens it revokes expire. Entries are
+scheduled on an expiry wheel, one slot per ``resolution`` seconds, and the
+slots that went by are dropped at most once per slot.
+
+A deleted user's tokens are revoked by a not-before time as well, kept in
+``revoked_user`` since the user row is gone.
+
+Revocations are stored (``revoked_token``, ``user.tokens_not_before``,
+``revoked_user``),
+applied after their commit and broadcast through the broker
+(``app.messages.broadcast``) to the other workers; a starting worker loads
+the ones still in effect.
+"""
+
+from collections import defaultdict
+import json
+from threading import Lock
+from time import time
+from typing import Any, Callable
+
+from sqlalchemy import delete, event, insert, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import col, select
+
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+from app.models.revoked_user import RevokedUser
+from app.models.user import User
+
+from .settings import ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+# Longest lifetime of an access token, after which a not-before entry is moot.
+ACCESS_TOKEN_LIFETIME = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+_PENDING_KEY = "revocations"
+_DELETED_KEY = "revoked_users"
+
+
+class RevocationIndex:
+    """Thread safe index of revoked jtis and per-user not-before times."""
+
+    def __init__(self, resolution: int = 60, clock: Callable[[], float] = time):
+        self.resolution = resolution
+        self.clock = clock
+        self._jtis: dict[str, int] = {}
+        self._not_before: dict[int, int] = {}
+        self._wheel: dict[int, list[tuple[str, Any]]] = defaultdict(list)
+        self._purged_slot = int(clock()) // resolution
+        self._lock = Lock()
+        self.on_change: Callable[[dict[str, int], dict[int, int]], None] | None = None
+
+    def is_revoked(self, jti: str | None, user_id: int, issued_at: int) -> bool:
+        if self.clock() // self.resolution > self._purged_slot:
+            self.purge()
+
+        not_before = self._not_before.get(user_id)
+
+        return (jti is not None and jti in self._jtis) or (
+            not_before is not None and issued_at < not_before
+        )
+
+    def _schedule(self, expires_at: int, kind: str, key: Any):
+        self._wheel[expires_at // self.resolution + 1].append((kind, key))
+
+    def revoke(
+        self,
+        jtis: dict[str, int] | None = None,
+        not_before: dict[int, int] | None = None,
+    ):
+        """
+        Merges revocations: ``jtis`` maps jti to expiry, ``not_before`` user
+        id to not-before time (the latest wins). Times are Unix seconds.
+        """
+
+        with self._lock:
+            for jti, expires_at in (jtis or {}).items():
+                if jti not in self._jtis:
+                    self._jtis[jti] = expires_at
+                    self._schedule(expires_at, "jti", jti)
+
+            for user_id, since in (not_before or {}).items():
+                if since > self._not_before.get(user_id, 0):
+                    self._not_before[user_id] = since
+                    self._schedule(since + ACCESS_TOKEN_LIFETIME, "user", user_id)
+
+    def purge(self):
+        """Drops the entries of the slots that went by."""
+
+        now = int(self.clock())
+
+        with self._lock:
+            current = now // self.resolution
+
+            for slot in range(self._purged_slot + 1, current + 1):
+                for kind, key in self._wheel.pop(slot, []):
+                    if kind == "jti":
+                        if self._jtis.get(key, now + 1) <= now:
+                            del self._jtis[key]
+                    elif self._not_before.get(key, now) + ACCESS_TOKEN_LIFETIME <= now:
+                        del self._not_before[key]
+
+            self._purged_slot = max(self._purged_slot, current)
+
+    def committed(self, jtis: dict[str, int], not_before: dict[int, int]):
+        self.revoke(jtis, not_before)
+
+        if self.on_change is not None:
+            self.on_change(jtis, not_before)
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._not_before)
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+            self._not_before.clear()
+            self._wheel.clear()
+
+    def load(self, session: Session):
+        """Loads the revocations still in effect."""
+
+        now = int(self.clock())
+        jtis = session.exec(  # type: ignore[attr-defined]
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                col(RevokedToken.expires_at) > now
+            )
+        ).all()
+        users = session.exec(  # type: ignore[attr-defined]
+            select(User.id, User.tokens_not_before).where(
+                col(User.tokens_not_before) > now - ACCESS_TOKEN_LIFETIME
+            )
+        ).all()
+        deleted = session.exec(  # type: ignore[attr-defined]
+            select(RevokedUser.user_id, RevokedUser.not_before).where(
+                col(RevokedUser.not_before) > now - ACCESS_TOKEN_LIFETIME
+            )
+        ).all()
+
+        self.revoke(dict(jtis), dict(users) | dict(deleted))
+
+
+revocations = RevocationIndex()
+
+
+def encode_revocations(jtis: dict[str, int], not_before: dict[int, int]) -> str:
+    return json.dumps(
+        {"jtis": list(jtis.items()), "not_before": list(not_before.items())}
+    )
+
+
+def decode_revocations(message: str) -> tuple[dict[str, int], dict[int, int]]:
+    body: dict[str, Any] = json.loads(message)
+
+    return (
+        {str(jti): int(expires_at) for jti, expires_at in body["jtis"]},
+        {int(user_id): int(since) for user_id, since in body["not_before"]},
+    )
+
+
+def _pending(session: Session) -> dict[str, dict]:
+    return session.info.setdefault(_PENDING_KEY, {"jtis": {}, "not_before": {}})
+
+
+def revoke_token(session: Session, jti: str, expires_at: int):
+    """Adds the revocation of a token to the session. The caller commits."""
+
+    session.execute(
+        delete(RevokedToken).where(col(RevokedToken.expires_at) <= int(time()))
+    )
+    session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+    _pending(session)["jtis"][jti] = expires_at
+
+
+def revoke_user_tokens(user: User):
+    """
+    Revokes the access and refresh tokens issued to ``user`` so far, when its
+    session flushes; the other workers learn it after the commit.
+    """
+
+    user.tokens_not_before = int(time())
+
+
+@event.listens_for(User, "before_update")
+def _revoke_on_password_change(_mapper, connection, target: User):
+    state = inspect(target)
+    session = object_session(target)
+
+    if state.attrs.hashed_password.history.has_changes():
+        target.tokens_not_before = int(time())
+
+    if not target.tokens_not_before or not (
+        state.attrs.tokens_not_before.history.has_changes()
+    ):
+        return
+
+    # The refresh tokens would mint new access tokens past the not-before.
+    connection.execute(
+        delete(RefreshToken).where(col(RefreshToken.user_id) == target.id)
+    )
+
+    if session is not None:
+        _pending(session)["not_before"][target.id] = target.tokens_not_before
+
+
+@event.listens_for(User, "after_delete")
+def _revoke_deleted_user(_mapper, _connection, target: User):
+    session = object_session(target)
+
+    if session is None or target.id is None:
+        return
+
+    # No token is issued to the user after the delete, the same second included.
+    not_before = int(time()) + 1
+    session.info.setdefault(_DELETED_KEY, {})[target.id] = not_before
+    _pending(session)["not_before"][target.id] = not_before
+
+
+@event.listens_for(Session, "after_flush")
+def _store_deleted_users(session: Session, _flush_context):
+    deleted: dict[int, int] | None = session.info.pop(_DELETED_KEY, None)
+
+    if not deleted:
+        return
+
+    # One statement each, however many users the flush deleted.
+    session.execute(
+        delete(RevokedUser).where(
+            col(RevokedUser.user_id).in_(deleted)
+            | (col(RevokedUser.not_before) <= int(time()) - ACCESS_TOKEN_LIFETIME)
+        )
+    )
+    session.execute(
+        insert(RevokedUser),
+        [
+            {"user_id": user_id, "not_before": not_before}
+            for user_id, not_before in deleted.items()
+        ],
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_revocations(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+
+    if pending and (pending["jtis"] or pending["not_before"]):
+        revocations.committed(pending["jtis"], pending["not_before"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_revocations(session: Session, _previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_DELETED_KEY, None)
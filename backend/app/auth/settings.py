@@ -8,14 +8,60 @@ REFRESH_TOKEN_EXPIRE_MINUTES = int(
     os.environ.get("JWT_REFRESH_EXPIRE_MINUTES", str(60 * 24 * 2))
 )  # 2 dias
 ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
-JWT_SECRET_ENCODE_KEY: str = (
-    os.environ["JWT_SECRET_ENCODE_KEY"]
-    if os.environ.get("ENVIRONMENT", "") == "PROD"
-    else os.environ["JWT_SECRET_ENCODE_KEY"]
+# Required: checked with the other required variables by app.config.Settings
+# when the application is created, not at import.
+JWT_SECRET_ENCODE_KEY = os.environ.get("JWT_SECRET_ENCODE_KEY", "")
+JWT_SECRET_DECODE_KEY = os.environ.get("JWT_SECRET_DECODE_KEY", "")
+JWT_REFRESH_SECRET_KEY = os.environ.get("JWT_REFRESH_SECRET_KEY", "")
+
+# Keys tokens are also verified with, by their ``kid`` (app.auth.jwks): PEM
+# public keys of the next or previous signing key during a rotation, or comma
+# separated secrets with HS* algorithms.
+JWT_EXTRA_DECODE_KEYS = os.environ.get("JWT_EXTRA_DECODE_KEYS", "")
+# Seconds verifiers may cache /.well-known/jwks.json.
+JWKS_MAX_AGE = int(os.environ.get("JWKS_MAX_AGE", "3600"))
+
+# Login throttling (app.auth.rate_limit): token buckets by client address and
+# by email, refilled at the given rates.
+LOGIN_RATE_LIMIT_ENABLED = (
+    os.environ.get("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
 )
-JWT_SECRET_DECODE_KEY: str = (
-    os.environ["JWT_SECRET_DECODE_KEY"]
-    if os.environ.get("ENVIRONMENT", "") == "PROD"
-    else os.environ["JWT_SECRET_DECODE_KEY"]
+# "local" (per worker) or "module:factory" returning a shared BucketStore.
+LOGIN_RATE_LIMIT_BACKEND = os.environ.get("LOGIN_RATE_LIMIT_BACKEND", "local")
+LOGIN_RATE_LIMIT_MAX_KEYS = int(os.environ.get("LOGIN_RATE_LIMIT_MAX_KEYS", "100000"))
+# Bucket sizes and refill rates; a rate of 0 turns its limit off.
+LOGIN_IP_BURST = float(os.environ.get("LOGIN_IP_BURST", "20"))
+LOGIN_IP_PER_MINUTE = float(os.environ.get("LOGIN_IP_PER_MINUTE", "30"))
+LOGIN_EMAIL_BURST = float(os.environ.get("LOGIN_EMAIL_BURST", "5"))
+LOGIN_EMAIL_PER_MINUTE = float(os.environ.get("LOGIN_EMAIL_PER_MINUTE", "2"))
+# Peers (addresses, networks or host names) whose X-Forwarded-For gives the
+# client address of the ip bucket, e.g. the pod network of the ingress.
+LOGIN_TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in os.environ.get("LOGIN_TRUSTED_PROXIES", "127.0.0.1").split(",")
+    if proxy.strip()
+]
+
+# Filter of the known emails (app.auth.email_filter), sized for this many users
+# at this false positive rate; past the capacity the rate goes up.
+LOGIN_EMAIL_FILTER_CAPACITY = int(
+    os.environ.get("LOGIN_EMAIL_FILTER_CAPACITY", "100000")
 )
-JWT_REFRESH_SECRET_KEY = os.environ["JWT_REFRESH_SECRET_KEY"]
+LOGIN_EMAIL_FILTER_ERROR_RATE = float(
+    os.environ.get("LOGIN_EMAIL_FILTER_ERROR_RATE", "0.01")
+)
+
+# Password hashing (app.auth.data_hash). The first scheme hashes new passwords,
+# the others are only verified; hashes of another scheme or cost are rewritten
+# on the next successful login. argon2 needs argon2-cffi.
+PASSWORD_SCHEMES = [
+    scheme.strip()
+    for scheme in os.environ.get("PASSWORD_SCHEMES", "bcrypt").split(",")
+    if scheme.strip()
+]
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", "12"))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get("PASSWORD_ARGON2_MEMORY_COST", "19456")
+)  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get("PASSWORD_ARGON2_PARALLELISM", "1"))
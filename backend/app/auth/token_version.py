@@ -0,0 +1,146 @@
+"""
+Token versions.
+
+Access tokens carry a snapshot of the user (role, scope, enterprise) and a
+``ver`` claim with the ``user.token_version`` they were issued at. Any change
+to those claims increments the row version. ``token_versions`` is the
+per-process map of the latest version known for each user: when a token is
+older than the map, ``authenticate_user`` reloads the user from the database
+instead of trusting the claims, otherwise the check is a dict lookup.
+
+The map is loaded at startup, updated after each local commit and kept in sync
+between workers by broadcasting the new versions through the broker
+(``app.messages.broadcast``).
+"""
+
+import json
+import sys
+from threading import Lock
+from typing import Any, Callable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import col, select
+
+from app.models.user import User
+
+
+# Attributes copied into the token claims: changing one outdates the tokens.
+CLAIM_ATTRIBUTES = (
+    "username",
+    "email",
+    "full_name",
+    "role_id",
+    "scope_id",
+    "enterprise_id",
+)
+
+# Version recorded for deleted users, so every token they hold is outdated.
+DELETED = sys.maxsize
+
+# Version of the tokens issued before the ``ver`` claim existed.
+DEFAULT_VERSION = 1
+
+_PENDING_KEY = "token_versions"
+
+
+class TokenVersions:
+    """Thread safe map of user id to the latest known token version."""
+
+    def __init__(self):
+        self._versions: dict[int, int] = {}
+        self._lock = Lock()
+        self.on_change: Callable[[dict[int, int]], None] | None = None
+
+    def get(self, user_id: int) -> int | None:
+        return self._versions.get(user_id)
+
+    def is_stale(self, user_id: int, version: int) -> bool:
+        known = self._versions.get(user_id)
+        return known is not None and version < known
+
+    def observe(self, versions: dict[int, int]):
+        """Merges versions learned from commits or other workers (newest wins)."""
+
+        with self._lock:
+            for user_id, version in versions.items():
+                if version > self._versions.get(user_id, 0):
+                    self._versions[user_id] = version
+
+    def set(self, user_id: int, version: int):
+        """Stores the version read from the database, which is authoritative."""
+
+        with self._lock:
+            self._versions[user_id] = version
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+
+    def load(self, session: Session):
+        """Loads the versions of every user whose claims ever changed."""
+
+        rows = session.exec(  # type: ignore[attr-defined]
+            select(User.id, User.token_version).where(
+                col(User.token_version) > DEFAULT_VERSION
+            )
+        ).all()
+
+        self.observe({user_id: version for user_id, version in rows})
+
+    def committed(self, versions: dict[int, int]):
+        self.observe(versions)
+
+        if self.on_change is not None:
+            self.on_change(versions)
+
+
+token_versions = TokenVersions()
+
+
+def encode_versions(versions: dict[int, int]) -> str:
+    return json.dumps({"versions": [[k, v] for k, v in versions.items()]})
+
+
+def decode_versions(message: str) -> dict[int, int]:
+    body: dict[str, Any] = json.loads(message)
+    return {int(user_id): int(version) for user_id, version in body["versions"]}
+
+
+def _pending(target: User) -> dict[int, int] | None:
+    session = object_session(target)
+    return None if session is None else session.info.setdefault(_PENDING_KEY, {})
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(_mapper, _connection, target: User):
+    state = inspect(target)
+
+    if not any(state.attrs[name].history.has_changes() for name in CLAIM_ATTRIBUTES):
+        return
+
+    target.token_version = (target.token_version or DEFAULT_VERSION) + 1
+
+    pending = _pending(target)
+    if pending is not None and target.id is not None:
+        pending[target.id] = target.token_version
+
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(_mapper, _connection, target: User):
+    pending = _pending(target)
+    if pending is not None and target.id is not None:
+        pending[target.id] = DELETED
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_versions(session: Session):
+    versions = session.info.pop(_PENDING_KEY, None)
+
+    if versions:
+        token_versions.committed(versions)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_versions(session: Session, _previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
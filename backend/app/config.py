@@ -0,0 +1,87 @@
+"""
+Settings the application cannot start without.
+
+``Settings.from_env()`` reads them from the environment and validates them
+together, so a misconfigured worker fails at startup with every problem
+listed instead of a ``KeyError`` at the first import that needed one.
+``create_app`` builds the database engines and the signing keys from them.
+
+The tuning variables (pools, timeouts, broker, throttling...) keep their
+defaults in the settings module of their package.
+"""
+
+import os
+from typing import Annotated, Any, Mapping
+
+import jwt
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.auth.jwks import SigningKeys, parse_keys
+from app.db.conn import get_database_url, get_replica_urls
+
+Required = Annotated[str, Field(min_length=1)]
+
+
+class Settings(BaseModel):
+    """Fields are read from the variables of the same name in upper case."""
+
+    model_config = ConfigDict(
+        alias_generator=str.upper, populate_by_name=True, frozen=True
+    )
+
+    api_env: Required
+    db_user: Required
+    db_password: Required
+    db_host: Required
+    db_name: Required
+    db_port: int = 5432
+    db_replica_hosts: list[str] = []
+    jwt_algorithm: str = "HS256"
+    jwt_secret_encode_key: Required
+    jwt_secret_decode_key: Required
+    jwt_refresh_secret_key: Required
+    jwt_extra_decode_keys: str = ""
+
+    @field_validator("db_replica_hosts", mode="before")
+    @classmethod
+    def split_hosts(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [host.strip() for host in value.split(",") if host.strip()]
+
+        return value
+
+    @field_validator("jwt_algorithm")
+    @classmethod
+    def known_algorithm(cls, value: str) -> str:
+        if value == "none" or value not in jwt.algorithms.get_default_algorithms():
+            raise ValueError(f"unsupported JWT algorithm {value}")
+
+        return value
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "Settings":
+        """Raises ``pydantic.ValidationError`` listing every invalid variable."""
+
+        return cls.model_validate(dict(os.environ if environ is None else environ))
+
+    def database_urls(self) -> tuple[str, list[str]]:
+        """The URLs of the primary and of the replicas."""
+
+        credentials = {
+            "user": self.db_user,
+            "password": self.db_password,
+            "name": self.db_name,
+        }
+
+        return (
+            get_database_url(self.db_host, self.db_port, **credentials),
+            get_replica_urls(self.db_replica_hosts, self.db_port, **credentials),
+        )
+
+    def signing_keys(self) -> SigningKeys:
+        return SigningKeys(
+            self.jwt_algorithm,
+            self.jwt_secret_encode_key,
+            self.jwt_secret_decode_key,
+            parse_keys(self.jwt_extra_decode_keys),
+        )
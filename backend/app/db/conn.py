@@ -1,27 +1,120 @@
-"""Module for database setup and utilities using SQLModel and SQLAlchemy."""
+"""Module for database setup and utilities using SQLModel and SQLAlchemy.
+
+The engines are built by ``init_engines``, which the application lifespan
+calls with the validated settings; ``get_db`` builds them from the
+environment if nothing did before. Importing the module connects to nothing.
+"""
+
+from threading import Lock
 
 import sqlalchemy as sa
-from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel import Session, create_engine
 
 from . import settings as st
+from .pool import InstrumentedQueuePool, get_connect_args, get_pool_size
+from .routing import ReplicaRouter
+
+
+def get_database_url(
+    host: str = st.DB_HOST,
+    port: int = st.DB_PORT,
+    user: str = st.DB_USER,
+    password: str = st.DB_PASSWORD,
+    name: str = st.DB_NAME,
+) -> str:
+    """Builds the PostgreSQL URL for a host using the configured credentials."""
+
+    return f"postgresql://{user}:{password}@{host}:{port}/{name}"
+
+
+def get_replica_urls(
+    hosts: list[str] | None = None, port: int = st.DB_PORT, **credentials: str
+) -> list[str]:
+    """Returns one URL per entry of ``hosts`` (default DB_REPLICA_HOSTS)."""
+
+    urls = []
+
+    for entry in st.DB_REPLICA_HOSTS if hosts is None else hosts:
+        host, _, host_port = entry.partition(":")
+        urls.append(
+            get_database_url(host, int(host_port) if host_port else port, **credentials)
+        )
+
+    return urls
+
+
+SQLALCHEMY_DATABASE_URL = get_database_url()
+
 
+def build_engine(url: str) -> sa.Engine:
+    """Creates an engine with the pool configured by the DB_POOL_* variables."""
 
-SQLALCHEMY_DATABASE_URL = (
-    f"postgresql://{st.DB_USER}:{st.DB_PASSWORD}@{st.DB_HOST}:5432/{st.DB_NAME}"
+    pool_size, max_overflow = get_pool_size()
+
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=st.DB_POOL_TIMEOUT,
+        pool_recycle=st.DB_POOL_RECYCLE,
+        pool_pre_ping=st.DB_POOL_PRE_PING,
+        connect_args=get_connect_args(),
+    )
+
+
+engine: sa.Engine | None = None
+
+replica_engines: list[sa.Engine] = []
+
+# Routes to the engines once they are built, to the primary until then.
+replica_router = ReplicaRouter(
+    engine,  # type: ignore[arg-type]
+    replica_engines,
+    read_your_writes_seconds=st.DB_READ_YOUR_WRITES_SECONDS,
+    retry_after_seconds=st.DB_REPLICA_RETRY_SECONDS,
 )
 
+_engines_lock = Lock()
+
+
+def init_engines(
+    url: str | None = None, replica_urls: list[str] | None = None
+) -> sa.Engine:
+    """
+    Builds the primary and replica engines, once per process; the URLs
+    default to the environment. Connections are only opened on use.
+    """
+
+    global engine, replica_engines  # pylint: disable=global-statement
+
+    with _engines_lock:
+        if engine is None:
+            replica_engines = [
+                build_engine(replica_url)
+                for replica_url in (
+                    get_replica_urls() if replica_urls is None else replica_urls
+                )
+            ]
+            engine = build_engine(url or SQLALCHEMY_DATABASE_URL)
+            replica_router.primary = engine
+            replica_router.replicas = replica_engines
+
+    return engine
+
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def get_engine() -> sa.Engine:
+    return engine if engine is not None else init_engines()
 
 
-def create_db():
-    """Creates a new database if it doesn't exist, and removes it if we are in testing mode."""
+def dispose_engines():
+    """Closes the pooled connections of the primary and the replicas."""
 
-    if st.ENV == "test":
-        SQLModel.metadata.drop_all(engine)
+    if engine is not None:
+        engine.dispose()
 
-    # Create tables if they don't exist
-    SQLModel.metadata.create_all(engine)
+    for replica in replica_engines:
+        replica.dispose()
 
 
 def get_db():
@@ -31,7 +124,7 @@ def get_db():
         Session: a new database session
     """
 
-    session = Session(autocommit=False, autoflush=False, bind=engine)
+    session = Session(autocommit=False, autoflush=False, bind=get_engine())
     try:
         yield session
     finally:
@@ -0,0 +1,105 @@
+"""
+Schema migration command.
+
+The application no longer creates or drops tables when it starts. The schema
+is versioned with Alembic (``backend/migrations``) and applied by running this
+module once per deploy, before the API workers start:
+
+    python -m app.db.migrate upgrade            # apply every pending revision
+    python -m app.db.migrate upgrade 0002       # apply up to a revision
+    python -m app.db.migrate downgrade -1       # revert the last revision
+    python -m app.db.migrate stamp 0001         # adopt a create_all database
+    python -m app.db.migrate current            # print the applied revision
+
+With ``API_ENV=test`` the ``reset`` command drops every table and upgrades
+from scratch, replacing the old drop_all/create_all behaviour of test stacks.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection
+
+from . import settings as st
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def get_alembic_config(connection: Connection | None = None) -> Config:
+    """Builds the Alembic configuration, optionally bound to an open connection."""
+
+    config = Config(str(ALEMBIC_INI))
+
+    if connection is not None:
+        config.attributes["connection"] = connection
+        config.attributes["configure_logger"] = False
+
+    return config
+
+
+def upgrade(revision: str = "head", connection: Connection | None = None):
+    command.upgrade(get_alembic_config(connection), revision)
+
+
+def downgrade(revision: str, connection: Connection | None = None):
+    command.downgrade(get_alembic_config(connection), revision)
+
+
+def stamp(revision: str, connection: Connection | None = None):
+    command.stamp(get_alembic_config(connection), revision)
+
+
+def current(connection: Connection | None = None):
+    command.current(get_alembic_config(connection), verbose=True)
+
+
+def reset(connection: Connection | None = None):
+    """Drops the schema and migrates it again. Only allowed in the test environment."""
+
+    if st.ENV != "test":
+        raise RuntimeError("reset is only allowed when API_ENV=test")
+
+    command.downgrade(get_alembic_config(connection), "base")
+    command.upgrade(get_alembic_config(connection), "head")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.db.migrate", description=__doc__.split("\n\n")[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="Apply revisions")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+
+    downgrade_parser = subparsers.add_parser("downgrade", help="Revert revisions")
+    downgrade_parser.add_argument("revision")
+
+    stamp_parser = subparsers.add_parser("stamp", help="Mark a revision as applied")
+    stamp_parser.add_argument("revision")
+
+    subparsers.add_parser("current", help="Show the applied revision")
+    subparsers.add_parser("reset", help="Drop and recreate the schema (test only)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        upgrade(args.revision)
+    elif args.command == "downgrade":
+        downgrade(args.revision)
+    elif args.command == "stamp":
+        stamp(args.revision)
+    elif args.command == "current":
+        current()
+    elif args.command == "reset":
+        reset()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
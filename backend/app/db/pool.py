@@ -0,0 +1,160 @@
+"""
+Connection pool sizing and instrumentation.
+
+``InstrumentedQueuePool`` is a regular SQLAlchemy ``QueuePool`` that records how
+long each checkout waited for a connection. Together with the pool occupancy
+this tells whether requests are queuing on the pool, which is otherwise
+invisible: a saturated pool only shows up as slower handlers.
+"""
+
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from . import settings as st
+
+
+# Upper bounds (seconds) of the checkout wait histogram.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def get_pool_size() -> tuple[int, int]:
+    """
+    Returns the (pool_size, max_overflow) for this worker.
+
+    If a per-pod connection budget is configured it is divided between the
+    workers of the pod, keeping the configured overflow ratio.
+    """
+
+    if st.DB_POD_MAX_CONNECTIONS <= 0:
+        return st.DB_POOL_SIZE, st.DB_MAX_OVERFLOW
+
+    per_worker = max(st.DB_POD_MAX_CONNECTIONS // st.WEB_CONCURRENCY, 1)
+    total = max(st.DB_POOL_SIZE + st.DB_MAX_OVERFLOW, 1)
+    pool_size = max(round(per_worker * st.DB_POOL_SIZE / total), 1)
+
+    return pool_size, max(per_worker - pool_size, 0)
+
+
+def get_connect_args() -> dict[str, Any]:
+    """Driver arguments with the server side timeouts for PostgreSQL connections."""
+
+    options = []
+
+    if st.DB_STATEMENT_TIMEOUT_MS > 0:
+        options.append(f"-c statement_timeout={st.DB_STATEMENT_TIMEOUT_MS}")
+
+    if st.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS > 0:
+        options.append(
+            "-c idle_in_transaction_session_timeout="
+            f"{st.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}"
+        )
+
+    connect_args: dict[str, Any] = {"connect_timeout": st.DB_CONNECT_TIMEOUT}
+
+    if options:
+        connect_args["options"] = " ".join(options)
+
+    return connect_args
+
+
+class PoolStats:
+    """Thread safe accumulator for pool checkout waits."""
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_BUCKETS):
+        self.buckets = buckets
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.bucket_counts = [0] * len(self.buckets)
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.bucket_counts[index] += 1
+                    break
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / observed if observed else 0.0
+                ),
+                "wait_buckets": dict(
+                    zip(map(str, self.buckets), list(self.bucket_counts))
+                ),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records the time spent waiting for each checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.observe(perf_counter() - start, timed_out=True)
+            raise
+
+        self.stats.observe(perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Keep the accumulated stats when the pool is recreated (e.g. dispose()).
+        new_pool = super().recreate()
+        if isinstance(new_pool, InstrumentedQueuePool):
+            new_pool.stats = self.stats
+        return new_pool
+
+
+def get_pool_status(pool: Any) -> dict[str, Any]:
+    """Occupancy and wait statistics for a pool, as plain data."""
+
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    # pylint: disable=protected-access
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+
+    status: dict[str, Any] = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "utilization": checked_out / capacity if capacity > 0 else 0.0,
+    }
+
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.stats.snapshot())
+
+    return status
@@ -0,0 +1,110 @@
+"""
+Read replica routing.
+
+Read-only handlers can be served by one of the configured replicas
+(``DB_REPLICA_HOSTS``). The router picks replicas round robin and falls back to
+the primary when there are none, when every replica failed recently, or when
+the caller wrote to the primary less than ``DB_READ_YOUR_WRITES_SECONDS`` ago,
+so a client always reads its own writes despite replication lag.
+
+The time of a write is known in the worker that handled it, by user, and is
+also handed to the client (``app.middlewares.db_session``), whose next request
+may reach another worker or pod.
+"""
+
+from itertools import count
+from threading import Lock
+from time import monotonic, time
+from typing import Hashable
+
+from sqlalchemy import Engine
+
+
+class ReadYourWrites:
+    """Remembers, per key, the last time something was written to the primary."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._last_write: dict[Hashable, float] = {}
+        self._lock = Lock()
+
+    def record(self, key: Hashable | None):
+        if key is None or self.window_seconds <= 0:
+            return
+
+        now = monotonic()
+
+        with self._lock:
+            self._last_write[key] = now
+
+            # Keep the map bounded by dropping the expired entries now and then.
+            if len(self._last_write) > 1024:
+                expired = now - self.window_seconds
+                self._last_write = {
+                    k: ts for k, ts in self._last_write.items() if ts > expired
+                }
+
+    def is_recent(self, key: Hashable | None) -> bool:
+        if key is None:
+            return False
+
+        last_write = self._last_write.get(key)
+
+        return last_write is not None and monotonic() - last_write < self.window_seconds
+
+    def covers(self, written_at: float | None) -> bool:
+        """Whether a write at ``written_at`` (Unix time) is within the window."""
+
+        # Both ways, so a client cannot hold itself on the primary for good.
+        return written_at is not None and abs(time() - written_at) < self.window_seconds
+
+
+class ReplicaRouter:
+    """Chooses the engine that should serve a read."""
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        read_your_writes_seconds: float = 5.0,
+        retry_after_seconds: float = 30.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.writes = ReadYourWrites(read_your_writes_seconds)
+        self.retry_after_seconds = retry_after_seconds
+        self._unhealthy_until: dict[int, float] = {}
+        self._next = count()
+
+    def record_write(self, key: Hashable | None):
+        self.writes.record(key)
+
+    def mark_unhealthy(self, engine: Engine):
+        self._unhealthy_until[id(engine)] = monotonic() + self.retry_after_seconds
+
+    def is_healthy(self, engine: Engine) -> bool:
+        return self._unhealthy_until.get(id(engine), 0.0) <= monotonic()
+
+    def choose(
+        self, key: Hashable | None = None, written_at: float | None = None
+    ) -> Engine:
+        """
+        Returns a healthy replica, or the primary when none should be used.
+        ``written_at`` is the last write of the client, as it reported it.
+        """
+
+        if (
+            not self.replicas
+            or self.writes.is_recent(key)
+            or self.writes.covers(written_at)
+        ):
+            return self.primary
+
+        start = next(self._next)
+
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self.is_healthy(replica):
+                return replica
+
+        return self.primary
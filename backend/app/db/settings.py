@@ -2,8 +2,43 @@
 
 import os
 
-ENV = os.environ["API_ENV"]
-DB_USER = os.environ["DB_USER"]
-DB_PASSWORD = os.environ["DB_PASSWORD"]
-DB_HOST = os.environ["DB_HOST"]
-DB_NAME = os.environ["DB_NAME"]
+# Required: checked with the other required variables by app.config.Settings
+# when the application is created, not at import.
+ENV = os.environ.get("API_ENV", "")
+DB_USER = os.environ.get("DB_USER", "")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
+DB_HOST = os.environ.get("DB_HOST", "")
+DB_NAME = os.environ.get("DB_NAME", "")
+DB_PORT = int(os.environ.get("DB_PORT", "5432"))
+
+# Connection pool, per worker process. When DB_POD_MAX_CONNECTIONS is set the
+# pool size is derived from it, split between the WEB_CONCURRENCY workers of the
+# pod, so the pod never opens more connections than it was budgeted.
+DB_POD_MAX_CONNECTIONS = int(os.environ.get("DB_POD_MAX_CONNECTIONS", "0"))
+WEB_CONCURRENCY = max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Server side limits applied to every connection (milliseconds, 0 disables).
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(
+    os.environ.get("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000")
+)
+
+# Read replicas: comma separated "host" or "host:port" entries sharing the
+# primary credentials. Reads stick to the primary for a while after a write.
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get("DB_READ_YOUR_WRITES_SECONDS", "5"))
+DB_REPLICA_RETRY_SECONDS = float(os.environ.get("DB_REPLICA_RETRY_SECONDS", "30"))
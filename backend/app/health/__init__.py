@@ -0,0 +1,12 @@
+"""Readiness checks of the worker: database, saturation and broker."""
+
+from . import settings
+from .readiness import (
+    DatabaseCheck,
+    PoolSaturation,
+    Readiness,
+    build_readiness,
+    check_in_flight,
+    check_publisher,
+    consumer_check,
+)
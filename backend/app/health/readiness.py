@@ -0,0 +1,197 @@
+"""
+Readiness of a worker to take traffic.
+
+``Readiness`` runs named checks concurrently, each bounded by a timeout, and
+reuses the result for ``READY_CACHE_SECONDS``: concurrent probes wait for the
+round in progress instead of starting another. A check returns ``None`` when
+healthy, else the reason.
+
+``build_readiness`` checks the database connectivity, the saturation of the
+primary pool and of the worker, and the broker consumer and publisher
+(``READY_REQUIRE_BROKER``).
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import text
+
+from app.db import conn
+from app.db.pool import get_pool_status
+from app.middlewares.metrics import in_flight
+from app.middlewares.send_message import event_sender
+
+from . import settings as st
+
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[], Awaitable[str | None]]
+
+
+class Readiness:
+    def __init__(
+        self,
+        checks: dict[str, Check],
+        cache_seconds: float = st.READY_CACHE_SECONDS,
+        timeout_seconds: float = st.READY_CHECK_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.checks = checks
+        self.cache_seconds = cache_seconds
+        self.timeout_seconds = timeout_seconds
+        self.clock = clock
+        self._result: tuple[bool, dict[str, str]] | None = None
+        self._checked_at = 0.0
+        self._round: asyncio.Task | None = None
+
+    async def _run(self, check: Check) -> str:
+        # pylint: disable=broad-exception-caught
+
+        try:
+            reason = await asyncio.wait_for(check(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            reason = f"no answer within {self.timeout_seconds}s"
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+
+        return reason or "ok"
+
+    async def _check_all(self) -> tuple[bool, dict[str, str]]:
+        names = list(self.checks)
+        reasons = await asyncio.gather(*(self._run(self.checks[n]) for n in names))
+        results = dict(zip(names, reasons))
+        ready = all(reason == "ok" for reason in reasons)
+
+        if not ready:
+            logger.warning("Not ready: %s", results)
+
+        self._result, self._checked_at = (ready, results), self.clock()
+        return ready, results
+
+    async def check(self) -> tuple[bool, dict[str, str]]:
+        """Returns whether the worker is ready and the result of each check."""
+
+        if self._result is not None and (
+            self.clock() - self._checked_at < self.cache_seconds
+        ):
+            return self._result
+
+        if self._round is None or self._round.done():
+            self._round = asyncio.get_running_loop().create_task(self._check_all())
+
+        return await asyncio.shield(self._round)
+
+
+class DatabaseCheck:
+    """Runs ``SELECT 1`` on the primary, in a thread."""
+
+    def __init__(self):
+        self._pending: asyncio.Future | None = None
+
+    @staticmethod
+    def select_one():
+        with conn.get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def __call__(self) -> str | None:
+        # A timed out query keeps its thread; wait for it rather than piling
+        # up threads blocked on an exhausted pool or an unreachable server.
+        if self._pending is not None and not self._pending.done():
+            return "previous check still running"
+
+        self._pending = asyncio.get_running_loop().run_in_executor(
+            None, self.select_one
+        )
+        await asyncio.shield(self._pending)
+        return None
+
+
+class PoolSaturation:
+    """Average checkout wait of the primary pool since the previous check."""
+
+    def __init__(self, max_wait_seconds: float = st.READY_MAX_POOL_WAIT_SECONDS):
+        self.max_wait_seconds = max_wait_seconds
+        self._previous = (0, 0, 0.0)
+
+    async def __call__(self) -> str | None:
+        if conn.engine is None:
+            return None
+
+        status = get_pool_status(conn.engine.pool)
+
+        if "checkouts" not in status:
+            return None
+
+        current = (
+            status["checkouts"],
+            status["timeouts"],
+            status["wait_seconds_total"],
+        )
+        checkouts, timeouts, waited = (
+            now - before for now, before in zip(current, self._previous)
+        )
+        self._previous = current
+
+        if timeouts > 0:
+            return f"{timeouts} checkouts timed out"
+
+        if (
+            self.max_wait_seconds > 0
+            and checkouts > 0
+            and waited / checkouts > self.max_wait_seconds
+        ):
+            return f"checkouts waited {waited / checkouts:.3f}s on average"
+
+        return None
+
+
+async def check_in_flight(max_in_flight: int = st.READY_MAX_IN_FLIGHT) -> str | None:
+    if 0 < max_in_flight < in_flight.count:
+        return f"{in_flight.count} requests in flight"
+
+    return None
+
+
+def consumer_check(state: Any) -> Check:
+    """The task running the broker consumer, set on ``state`` by the lifespan."""
+
+    async def check_consumer() -> str | None:
+        task: asyncio.Task | None = getattr(state, "consumer", None)
+
+        if task is None:
+            return "not started"
+
+        if task.done():
+            return "stopped"
+
+        return None
+
+    return check_consumer
+
+
+async def check_publisher() -> str | None:
+    # No connection yet is fine: it is opened by the first publish.
+    connection = event_sender.connection
+
+    if connection is not None and connection.is_closed:
+        return "connection closed"
+
+    return None
+
+
+def build_readiness(state: Any) -> Readiness:
+    checks: dict[str, Check] = {
+        "database": DatabaseCheck(),
+        "pool": PoolSaturation(),
+        "in_flight": check_in_flight,
+    }
+
+    if st.READY_REQUIRE_BROKER:
+        checks["consumer"] = consumer_check(state)
+        checks["publisher"] = check_publisher
+
+    return Readiness(checks)
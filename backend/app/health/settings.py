@@ -0,0 +1,20 @@
+""" Variables defined by the environment for the readiness probe """
+
+import os
+
+
+# Check results are reused for this long, so frequent probes (one per worker
+# and per probing kubelet or load balancer) cost one round of checks.
+READY_CACHE_SECONDS = float(os.environ.get("READY_CACHE_SECONDS", "1"))
+# A check that did not answer in time counts as failed.
+READY_CHECK_TIMEOUT_SECONDS = float(os.environ.get("READY_CHECK_TIMEOUT_SECONDS", "1"))
+# Saturation: average checkout wait of the primary pool since the previous
+# round of checks, and requests in flight in the worker. 0 disables.
+READY_MAX_POOL_WAIT_SECONDS = float(
+    os.environ.get("READY_MAX_POOL_WAIT_SECONDS", "0.5")
+)
+READY_MAX_IN_FLIGHT = int(os.environ.get("READY_MAX_IN_FLIGHT", "100"))
+# Whether a dead consumer or a closed publisher connection makes the pod not
+# ready. Deployments that serve the HTTP API without a broker opt out with
+# "false".
+READY_REQUIRE_BROKER = os.environ.get("READY_REQUIRE_BROKER", "true").lower() == "true"
@@ -0,0 +1,4 @@
+"""Logging configuration and request correlation."""
+
+from . import settings
+from .setup import configure_logging, get_request_id, request_id_var, shutdown_logging
@@ -0,0 +1,12 @@
+""" Variables defined by the environment for logging """
+
+import os
+
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" for one JSON object per line, "text" for human readable lines.
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+# Fraction of the records below WARNING that are kept (1 keeps them all).
+LOG_SAMPLE_RATE = min(max(float(os.environ.get("LOG_SAMPLE_RATE", "1")), 0.0), 1.0)
+# Records waiting for the writer thread; new records are dropped when full.
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
@@ -0,0 +1,182 @@
+"""
+Application logging.
+
+Every module logs through ``logging.getLogger(__name__)``. ``configure_logging``
+installs a single ``QueueHandler`` on the root logger: the calling thread only
+filters the record and puts it on a bounded queue, while a ``QueueListener``
+thread formats and writes it to stdout. A full queue drops records instead of
+blocking the request.
+
+Records carry the id of the request that produced them (``request_id``), set by
+``app.middlewares.request_id.RequestIdMiddleware``. Records below WARNING can be
+sampled with ``LOG_SAMPLE_RATE``. Hot paths log at DEBUG with lazy ``%``
+arguments so nothing is formatted when the level is INFO.
+"""
+
+import atexit
+import copy
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+import random
+import sys
+from typing import Any
+
+from . import settings as st
+
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with ``extra``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+_listener: QueueListener | None = None
+
+
+def get_request_id() -> str | None:
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds the current request id to the record, in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (
+            record.levelno >= logging.WARNING
+            or self.rate >= 1.0
+            or random.random() < self.rate
+        )
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of erroring."""
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, they may change once the call returns, but
+        # keep the traceback apart so the formatter can place it.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "request_id":
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+def get_formatter(log_format: str = st.LOG_FORMAT) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+
+    return logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+    )
+
+
+def configure_logging(
+    level: str = st.LOG_LEVEL,
+    log_format: str = st.LOG_FORMAT,
+    sample_rate: float = st.LOG_SAMPLE_RATE,
+    queue_size: int = st.LOG_QUEUE_SIZE,
+) -> QueueListener:
+    """
+    Routes the root logger through a non-blocking queue. Calling it again
+    replaces the previous configuration.
+
+    Returns:
+        QueueListener: the started listener writing the records to stdout.
+    """
+
+    global _listener  # pylint: disable=global-statement
+
+    shutdown_logging()
+
+    queue: Queue = Queue(maxsize=queue_size)
+
+    queue_handler = DroppingQueueHandler(queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    queue_handler.addFilter(RequestIdFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(get_formatter(log_format))
+
+    root = logging.getLogger()
+    root.handlers = [
+        handler
+        for handler in root.handlers
+        if not isinstance(handler, DroppingQueueHandler)
+    ]
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    return _listener
+
+
+def shutdown_logging():
+    """Writes the queued records and stops the listener thread."""
+
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
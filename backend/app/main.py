@@ -1,86 +1,264 @@
 """Main module for the FastAPI application.
 
-This module initializes the FastAPI application, database, and includes all the routes.
-It also sets up CORS (Cross-Origin Resource Sharing) to allow requests from specified origins.
+``create_app`` initializes the FastAPI application from the validated
+settings (``app.config.Settings``) and includes all the routes. It also sets
+up CORS (Cross-Origin Resource Sharing) to allow requests from specified origins.
+Importing the module builds nothing: the database engines, the broker
+consumer and the broadcasts are created by the lifespan, and ``app`` (the
+``app.main:app`` of the servers) is created from the environment on first use.
 
-Functions:
-    create_db(): Initializes the database by creating all tables.
+The database schema is not touched here: it is managed by the migrations in
+``backend/migrations`` and applied with ``python -m app.db.migrate upgrade``.
 
 Imports:
     FastAPI: Class to create a new FastAPI instance.
     CORSMiddleware: Middleware for managing CORS.
-    create_db: Function to initialize the database.
     router: FastAPI router containing all application routes. """
 
 import asyncio
+import logging
 
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth.data_hash import get_dummy_hash
+from app.auth.email_filter import apply_broadcast, encode_changes, known_emails
+from app.auth.jwt_utils import use_signing_keys
+from app.auth.refresh_token import use_refresh_secret_key
+from app.auth.revocation import decode_revocations, encode_revocations, revocations
+from app.auth.token_version import decode_versions, encode_versions, token_versions
+from app.config import Settings
+from app.health import build_readiness
+from app.log import configure_logging
+from app.messages.broadcast import InternalBroadcast
+from app.messages.election import run_consumer
 from app.messages.event import UpdateEvent
+from app.messages.settings import BROKER_SHUTDOWN_SECONDS
 from app.messages.subscriber import AsyncListener
+from app.metrics.scaling import ScalingSampler
+from app.middlewares.admission import AdmissionMiddleware
+from app.middlewares.db_session import ReadYourWritesMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.profiling import ProfilingMiddleware
+from app.middlewares.request_id import RequestIdMiddleware
+from app.middlewares.send_message import drain_publishes, join_sender_threads
+from app.middlewares.tracing import TracingMiddleware
+from app.profiling import install_signal_handler
+from app.tracing import configure_tracing
 
-from .db.conn import create_db
-from .db.settings import ENV
+from .db.conn import dispose_engines, get_db, init_engines
+from .router.admin import router as adminRouter
 from .router.enterprise import router as enterpriseRouter
+from .router.jwks import router as jwksRouter
 from .router.liveness import router as liveRouter
 from .router.login import router as loginRouter
+from .router.metrics import router as metricsRouter
+from .router.response import ModelResponse
 from .router.user import router as userRouter
 
 
-create_db()
+logger = logging.getLogger(__name__)
 
+# CORS configuration
+origins = [
+    "http://local.adrianlopes-swe.com.br",
+    "http://app.adrianlopes-swe.com.br",
+    "https://apirh.adrianlopes-swe.com.br",
+    "https://apisell.adrianlopes-swe.com.br",
+    "https://apipt.adrianlopes-swe.com.br",
+    "https://apirh.adrianlopes-swe.com.br:32747",
+    "https://apisell.adrianlopes-swe.com.br:32747",
+    "https://apipt.adrianlopes-swe.com.br:32747",
+    "https://openferp.budibase.app"
+]
+
+test_origins = [
+    "http://localhost:9080",
+    "http://localhost:8080",
+    "http://localhost:3000",
+    "http://localhost:8000",
+]
+
+
+class Messaging:
+    """
+    The RH queue consumer and the broadcasts keeping the token versions, the
+    revocations and the known emails of the workers in sync.
+    """
+
+    def __init__(self):
+        self.external_update_listener = AsyncListener(
+            "external.rh_event", UpdateEvent.process_message
+        )
+
+        self.token_version_broadcast = InternalBroadcast(
+            "token_version",
+            lambda message: token_versions.observe(decode_versions(message)),
+        )
+        token_versions.on_change = lambda versions: (
+            self.token_version_broadcast.publish(encode_versions(versions))
+        )
+
+        self.known_email_broadcast = InternalBroadcast("known_email", apply_broadcast)
+        known_emails.on_change = lambda added, removed: (
+            self.known_email_broadcast.publish(encode_changes(added, removed))
+        )
+        # The changes sent while disconnected are lost, load the users again.
+        self.known_email_broadcast.on_lost = known_emails.clear
+        self.known_email_broadcast.on_restored = lambda: (
+            asyncio.get_running_loop().run_in_executor(
+                None, load_known_emails, self.known_email_broadcast
+            )
+        )
+
+        self.revocation_broadcast = InternalBroadcast(
+            "revocation",
+            lambda message: revocations.revoke(*decode_revocations(message)),
+        )
+        revocations.on_change = lambda jtis, not_before: (
+            self.revocation_broadcast.publish(encode_revocations(jtis, not_before))
+        )
+
+
+def load_token_versions():
+    # pylint: disable=broad-exception-caught
+
+    try:
+        with next(get_db()) as session:
+            token_versions.load(session)
+            revocations.load(session)
+    except Exception as e:
+        logger.warning("Failed to load token versions and revocations: %s", e)
+
+
+def load_known_emails(known_email_broadcast: InternalBroadcast):
+    # pylint: disable=broad-exception-caught
+
+    get_dummy_hash()
+
+    if not known_email_broadcast.connected:
+        logger.warning("Known emails not synchronised, logins query every email")
+        return
 
-external_update_listener = AsyncListener(
-    "external.rh_event", UpdateEvent.process_message
-)
+    known_emails.clear()
+
+    try:
+        with next(get_db()) as session:
+            known_emails.load(session)
+    except Exception as e:
+        logger.warning("Failed to load known emails: %s", e)
+        return
+
+    # Lost while loading, it loads again once restored.
+    known_emails.ready = known_email_broadcast.connected
 
 
 @asynccontextmanager
 async def listener_span(fapi_app: FastAPI, *args, **kwargs):
     # pylint: disable=unused-argument
 
+    settings: Settings = fapi_app.state.settings
     loop = asyncio.get_running_loop()
-    task = loop.create_task(external_update_listener.listen(loop))
+    install_signal_handler(loop)
+    init_engines(*settings.database_urls())
+    messaging = Messaging()
+    await messaging.token_version_broadcast.start(loop)
+    await messaging.revocation_broadcast.start(loop)
+    await loop.run_in_executor(None, load_token_versions)
+    await messaging.known_email_broadcast.start(loop)
+    await loop.run_in_executor(None, load_known_emails, messaging.known_email_broadcast)
+    listener = messaging.external_update_listener
+    task = loop.create_task(
+        run_consumer(lambda: listener.listen(loop), lambda: listener.stopping)
+    )
+    fapi_app.state.consumer = task
+    sampler = ScalingSampler(messaging.external_update_listener)
+    sampler.start()
     yield
-    await task
+    await sampler.stop()
+    await shutdown(messaging, task)
 
 
-app = FastAPI()
-app.include_router(userRouter)
-app.include_router(liveRouter)
-app.include_router(enterpriseRouter)
-app.include_router(loginRouter)
+async def shutdown(messaging: Messaging, consumer: asyncio.Task):
+    """
+    Stops consuming, then waits for the message in hand, the publishes in
+    flight and the sender threads, all within BROKER_SHUTDOWN_SECONDS, and
+    closes the broker and database connections. The server has already
+    drained the HTTP requests (WEB_GRACEFUL_TIMEOUT) when this runs.
+    """
 
-app.router.lifespan_context = listener_span
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + BROKER_SHUTDOWN_SECONDS
 
-# CORS configuration
-origins = [
-    "http://local.adrianlopes-swe.com.br",
-    "http://app.adrianlopes-swe.com.br",
-    "https://apirh.adrianlopes-swe.com.br",
-    "https://apisell.adrianlopes-swe.com.br",
-    "https://apipt.adrianlopes-swe.com.br",
-    "https://apirh.adrianlopes-swe.com.br:32747",
-    "https://apisell.adrianlopes-swe.com.br:32747",
-    "https://apipt.adrianlopes-swe.com.br:32747",
-    "https://openferp.budibase.app"
-]
+    def remaining() -> float:
+        return max(deadline - loop.time(), 0)
+
+    await messaging.external_update_listener.stop(consumer, remaining())
+    await drain_publishes(remaining())
+    await loop.run_in_executor(None, join_sender_threads, remaining())
+    known_emails.ready = False
+    await messaging.token_version_broadcast.stop(remaining())
+    await messaging.revocation_broadcast.stop(remaining())
+    await messaging.known_email_broadcast.stop(remaining())
+    dispose_engines()
+    logger.info("Shutdown complete")
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Builds the application. ``settings`` default to the environment, which
+    raises ``pydantic.ValidationError`` listing every missing or invalid
+    variable. Nothing connects to the database or the broker before the
+    lifespan starts.
+    """
+
+    if settings is None:
+        settings = Settings.from_env()
+
+    configure_logging()
+    configure_tracing()
+    use_signing_keys(settings.signing_keys())
+    use_refresh_secret_key(settings.jwt_refresh_secret_key)
+
+    fapi_app = FastAPI(default_response_class=ModelResponse)
+    fapi_app.state.settings = settings
+    fapi_app.state.readiness = build_readiness(fapi_app.state)
+    fapi_app.include_router(userRouter)
+    fapi_app.include_router(liveRouter)
+    fapi_app.include_router(enterpriseRouter)
+    fapi_app.include_router(loginRouter)
+    fapi_app.include_router(metricsRouter)
+    fapi_app.include_router(adminRouter)
+    fapi_app.include_router(jwksRouter)
+
+    fapi_app.router.lifespan_context = listener_span
+
+    fapi_app.add_middleware(ReadYourWritesMiddleware)
+    fapi_app.add_middleware(ProfilingMiddleware)
+    fapi_app.add_middleware(TracingMiddleware)
+    # Inside the metrics, so the rejected requests are counted as 503s.
+    fapi_app.add_middleware(AdmissionMiddleware)
+    fapi_app.add_middleware(MetricsMiddleware)
+    fapi_app.add_middleware(RequestIdMiddleware)
+    fapi_app.add_middleware(
+        CORSMiddleware,
+        allow_origins=(
+            [*origins, *test_origins] if settings.api_env == "test" else origins
+        ),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID"],
+    )
+
+    return fapi_app
+
+
+def __getattr__(name: str):
+    # ``app`` is built on first use, so importing the module stays cheap.
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
 
-if ENV == "test":
-    origins = [
-        *origins,
-        "http://localhost:9080",
-        "http://localhost:8080",
-        "http://localhost:3000",
-        "http://localhost:8000",
-    ]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,158 @@
+"""
+This module contains the InternalBroadcast class, used to share small pieces of
+state between the workers and pods of the RH service through the broker.
+
+Class InternalBroadcast:
+    Every instance binds its own exclusive, auto-deleted queue to
+    ``rh_internal.<topic>`` on the default exchange, so each worker receives
+    every message, including its own. Other services only listen to
+    ``rh_event.*`` and never see these messages.
+
+    Messages are not persisted: those sent while a worker is disconnected
+    never reach it. ``on_lost`` is called when the connection is lost and
+    ``on_restored`` once it is back, so a worker can stop trusting the state
+    it keeps and load it again.
+
+    Attributes:
+    - topic: The routing key suffix shared by the publishers and listeners.
+    - message_processor: A callable that processes the received messages.
+    - on_lost: Called when the connection closes, optional.
+    - on_restored: Called after a reconnection, optional; may return an
+      awaitable.
+
+    Methods:
+    - publish: Queues a message for publication. Safe to call from any thread,
+      a no-op until the broadcast is started.
+    - start: Connects to the broker and starts publishing and consuming.
+    - stop: Sends what is left in the outbox (up to a timeout), cancels the
+      background tasks and closes the connection.
+"""
+
+import asyncio
+from asyncio import AbstractEventLoop
+import logging
+from os import environ
+from typing import Any, Callable
+
+import aio_pika
+from aio_pika import DeliveryMode, ExchangeType, Message
+
+from app.messages.async_broker import AsyncBroker
+
+
+logger = logging.getLogger(__name__)
+
+
+class InternalBroadcast(AsyncBroker):
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, topic: str, processor: Callable[[str], None]):
+        self.topic = topic
+        self.message_processor = processor
+        self.loop: AbstractEventLoop | None = None
+        self.outbox: asyncio.Queue[str] | None = None
+        self.tasks: list[asyncio.Task] = []
+        self.connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self.on_lost: Callable[[], None] | None = None
+        self.on_restored: Callable[[], Any] | None = None
+
+    @property
+    def routing_key(self) -> str:
+        return f"rh_internal.{self.topic}"
+
+    @property
+    def connected(self) -> bool:
+        return self.connection is not None and self.connection.connected.is_set()
+
+    def watch(self, connection: aio_pika.abc.AbstractRobustConnection):
+        connection.close_callbacks.add(self._lost)
+        connection.reconnect_callbacks.add(self._restored)
+
+    def _lost(self, *_args):
+        if self.on_lost is not None:
+            self.on_lost()
+
+    def _restored(self, *_args) -> Any:
+        return None if self.on_restored is None else self.on_restored()
+
+    def publish(self, message: str):
+        if self.loop is None or self.outbox is None or self.loop.is_closed():
+            return
+
+        self.loop.call_soon_threadsafe(self.outbox.put_nowait, message)
+
+    async def iterate_queue(self, queue: aio_pika.abc.AbstractQueue):
+        # pylint: disable=broad-exception-caught
+
+        try:
+            async with queue.iterator() as queue_iter:
+                async for message in queue_iter:
+                    async with message.process():
+                        try:
+                            self.message_processor(message.body.decode())
+                        except Exception:
+                            logger.exception("Invalid %s message", self.routing_key)
+        finally:
+            # Nothing is received anymore.
+            self._lost()
+
+    async def publish_outbox(self, exchange: aio_pika.abc.AbstractExchange):
+        # pylint: disable=broad-exception-caught
+
+        assert self.outbox is not None
+
+        while True:
+            body = await self.outbox.get()
+            try:
+                await exchange.publish(
+                    Message(body.encode(), delivery_mode=DeliveryMode.NOT_PERSISTENT),
+                    routing_key=self.routing_key,
+                )
+            except Exception as e:
+                logger.warning("Failed to broadcast on %s: %s", self.routing_key, e)
+            finally:
+                self.outbox.task_done()
+
+    async def start(self, loop: AbstractEventLoop):
+        self.loop = loop
+        self.outbox = asyncio.Queue()
+
+        try:
+            self.connection = await self.default_connect_robust(loop)
+            self.watch(self.connection)
+            channel = await self.connection.channel()
+            exchange = await channel.declare_exchange(
+                environ.get("DEFAULT_EXCHANGE", "openferp"),
+                type=ExchangeType.TOPIC,
+                durable=True,
+            )
+
+            queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+            await queue.bind(exchange, routing_key=self.routing_key)
+
+            self.tasks = [
+                loop.create_task(self.iterate_queue(queue)),
+                loop.create_task(self.publish_outbox(exchange)),
+            ]
+        except aio_pika.exceptions.AMQPError as e:
+            logger.error("Failed to start %s broadcast: %s", self.routing_key, e)
+            self.loop = None
+            self.outbox = None
+
+    async def stop(self, timeout: float = 0):
+        if self.outbox is not None and self.tasks and timeout > 0:
+            try:
+                await asyncio.wait_for(self.outbox.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Unsent %s messages dropped", self.routing_key)
+
+        for task in self.tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.loop = None
+
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
@@ -21,28 +21,45 @@ Class AsyncSender:
 
     Attributes:
     - queue_name: The name of the queue to which messages will be sent.
+    - connection: The robust connection shared by the publishes, opened on the
+      first one (and again when the event loop changed).
 
     Methods:
     - default_exchange: Declares the default exchange.
+    - get_exchange: Returns the exchange on the shared connection and channel.
     - publish_to: Publishes a message to a specified route on an exchange.
-    - publish: Connects to the message broker,
-      prepares the message, and publishes it to the specified routes.
+    - publish: Prepares the message and publishes it to the specified routes.
+    - close: Closes the shared connection.
 """
 
+import asyncio
 from asyncio import AbstractEventLoop
 from datetime import datetime as dt, timedelta, timezone
 import json
 from json.decoder import JSONDecodeError
+import logging
 from os import environ
+from time import perf_counter
 from typing import Any
 
 from aio_pika import DeliveryMode, ExchangeType, Message
 import aio_pika
-from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractMessage
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractExchange,
+    AbstractMessage,
+    AbstractRobustConnection,
+)
+from opentelemetry import trace
 import pika
 
 from app.messages.async_broker import AsyncBroker
 from app.messages.settings import BROKER_HOST, BROKER_PASS, BROKER_PORT, BROKER_USER
+from app.metrics.instruments import BROKER_PUBLISH_DURATION, BROKER_PUBLISH_FAILURES
+from app.tracing import inject_context, tracer
+
+
+logger = logging.getLogger(__name__)
 
 
 class SyncSender:
@@ -65,7 +82,7 @@ class SyncSender:
         self.channel.basic_publish(
             exchange="", routing_key=self.queue_name, body=message
         )
-        print(f" [x] Sent '{message}'")
+        logger.debug("Sent message to %s", self.queue_name)
 
     def close_connection(self):
         self.connection.close()
@@ -74,6 +91,10 @@ class SyncSender:
 class AsyncSender(AsyncBroker):
     def __init__(self, queue_name):
         self.queue_name = queue_name
+        self.connection: AbstractRobustConnection | None = None
+        self.exchange: AbstractExchange | None = None
+        self.loop: AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
 
     def default_exchange(self, channel: AbstractChannel):
         return channel.declare_exchange(
@@ -82,53 +103,78 @@ class AsyncSender(AsyncBroker):
             type=ExchangeType.TOPIC,
         )
 
+    async def get_exchange(self, loop: AbstractEventLoop) -> AbstractExchange:
+        if self._lock is None or self.loop is not loop:
+            # Connections and locks belong to the loop they were created on.
+            self.loop = loop
+            self._lock = asyncio.Lock()
+            self.connection = None
+            self.exchange = None
+
+        async with self._lock:
+            if self.exchange is None or self.connection is None:
+                self.connection = await self.default_connect_robust(loop)
+                channel = await self.connection.channel()
+                self.exchange = await self.default_exchange(channel)
+
+            return self.exchange
+
+    async def close(self):
+        connection, self.connection, self.exchange = self.connection, None, None
+
+        if connection is not None and not connection.is_closed:
+            await connection.close()
+
     async def publish_to(
         self, route: str, exchange: AbstractExchange, message: AbstractMessage
     ):
         await exchange.publish(routing_key=f"rh_event.{route}", message=message)
-        print(f"Published on Exchange {exchange.name}, {str(exchange)}")
+        logger.debug("Published rh_event.%s on exchange %s", route, exchange.name)
 
     async def publish(self, message_body: str, loop: AbstractEventLoop):
-        print("Connecting to broker...")
-        try:
-            connection = await self.default_connect_robust(loop)
-
-            print("Returning channel...")
-
-            channel = await connection.channel()
-            body: dict[str, Any] = {}
+        with tracer.start_as_current_span(
+            "rh_event publish",
+            kind=trace.SpanKind.PRODUCER,
+            attributes={
+                "messaging.system": "rabbitmq",
+                "messaging.destination.name": "rh_event",
+            },
+        ) as span:
+            start = perf_counter()
 
             try:
+                exchange = await self.get_exchange(loop)
+                body: dict[str, Any] = {}
+                now = dt.now(tz=timezone(timedelta(0), name="UTC"))
 
-                body = json.loads(message_body)
-                body.update({"origin": "rh"})
-                body.update(
-                    {
-                        "start_date": dt.now(
-                            tz=timezone(timedelta(0), name="UTC")
-                        ).isoformat()
-                    }
-                )
+                try:
 
-                message_body = json.dumps(body)
+                    body = json.loads(message_body)
+                    body.update({"origin": "rh"})
+                    body.update({"start_date": now.isoformat()})
 
-            except (JSONDecodeError, KeyError):
-                print("Invalid JSON message")
-                return connection
+                    message_body = json.dumps(body)
 
-            message = Message(
-                message_body.encode("ascii"),
-                delivery_mode=DeliveryMode.PERSISTENT,
-            )
+                except (JSONDecodeError, KeyError):
+                    logger.warning("Invalid JSON message, not published")
+                    return self.connection
+
+                message = Message(
+                    message_body.encode("ascii"),
+                    delivery_mode=DeliveryMode.PERSISTENT,
+                    timestamp=now,
+                    headers=inject_context(),
+                )
 
-            exchange = await self.default_exchange(channel)
-            print("publishing to queue")
+                for route in ["sells", "pt"]:
+                    await self.publish_to(route, exchange, message)
 
-            for route in ["sells", "pt"]:
-                await self.publish_to(route, exchange, message)
+                BROKER_PUBLISH_DURATION.observe(perf_counter() - start)
 
-            return connection
-        except aio_pika.exceptions.AMQPConnectionError as e:
-            print(f"Failed to connect to broker: ")
-            print(f"Error: {e}")
-            return None
+                return self.connection
+            except aio_pika.exceptions.AMQPConnectionError as e:
+                BROKER_PUBLISH_FAILURES.inc()
+                span.record_exception(e)
+                span.set_status(trace.StatusCode.ERROR)
+                logger.error("Failed to connect to broker: %s", e)
+                return None
@@ -0,0 +1,124 @@
+"""
+Consumer election between the worker processes of a pod.
+
+``run_consumer`` starts the broker consumer right away in ``worker`` mode. In
+``elected`` mode the worker first takes an exclusive ``flock`` on a lock file
+shared by the workers; the others keep retrying, and since the kernel releases
+the lock when its holder exits (a crash or a max-requests restart), one of
+them takes over.
+
+Whichever the mode, the consumer is supervised: when ``listen`` returns or
+fails before the listener is stopped, it is started again after a backoff
+(``BROKER_CONSUMER_RETRY_SECONDS``, doubling up to
+``BROKER_CONSUMER_RETRY_MAX_SECONDS``), so a broker outage does not leave the
+worker without a consumer until it restarts.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import fcntl
+import logging
+import os
+from time import monotonic
+from typing import IO, Any
+
+from app.messages import settings as st
+
+
+logger = logging.getLogger(__name__)
+
+
+class FileLeaderLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._file: IO[str] | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+
+        # The lock is held, and the file open, until release().
+        # pylint: disable-next=consider-using-with
+        file = open(self.path, "a+", encoding="utf-8")
+
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+
+        file.seek(0)
+        file.truncate()
+        file.write(str(os.getpid()))
+        file.flush()
+
+        self._file = file
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+async def supervise(
+    listen: Callable[[], Awaitable[Any]],
+    stopped: Callable[[], bool],
+    retry_seconds: float = st.BROKER_CONSUMER_RETRY_SECONDS,
+    max_retry_seconds: float = st.BROKER_CONSUMER_RETRY_MAX_SECONDS,
+):
+    """Runs ``listen`` again, after a growing delay, until ``stopped()``."""
+
+    delay = retry_seconds
+
+    while True:
+        started = monotonic()
+
+        try:
+            await listen()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Broker consumer failed: %s", e)
+
+        if stopped():
+            return
+
+        if monotonic() - started >= max_retry_seconds:
+            # It ran for a while: a new outage, not the same one.
+            delay = retry_seconds
+
+        logger.warning("Broker consumer stopped, restarting in %.1fs", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_retry_seconds)
+
+
+async def run_consumer(
+    listen: Callable[[], Awaitable[Any]],
+    stopped: Callable[[], bool],
+    mode: str = st.BROKER_CONSUMER_MODE,
+    lock_path: str = st.BROKER_CONSUMER_LOCK,
+    retry_seconds: float = st.BROKER_CONSUMER_ELECTION_SECONDS,
+):
+    """Runs ``listen`` in this worker, once elected when ``mode`` is ``elected``."""
+
+    if mode != "elected":
+        await supervise(listen, stopped)
+        return
+
+    lock = FileLeaderLock(lock_path)
+
+    while not lock.try_acquire():
+        await asyncio.sleep(retry_seconds)
+
+    logger.info("Worker %s elected as the broker consumer", os.getpid())
+
+    try:
+        await supervise(listen, stopped)
+    finally:
+        lock.release()
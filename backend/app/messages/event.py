@@ -23,6 +23,7 @@ Class UpdateEvent:
 
 import datetime
 import json
+import logging
 from typing import Any
 
 from sqlmodel import Session
@@ -35,6 +36,9 @@ from app.models.scope import BaseScope, Scope
 from app.models.user import User
 
 
+logger = logging.getLogger(__name__)
+
+
 class UpdateEvent:
     def __init__(
         self,
@@ -67,17 +71,17 @@ class UpdateEvent:
 
     def update_table(self):
         if self.event_id == "UpdateEnterpise":
-            print("Received UpdateEnterpise event")
+            logger.info("Received UpdateEnterpise event")
             self.update_enterprise()
         if self.event_id == "UpdateUser":
-            print("Received UpdateUser event")
+            logger.info("Received UpdateUser event")
             self.update_user()
 
     def update_enterprise(self):
         # pylint: disable=broad-exception-caught
 
         db: Session | None = None
-        print(f"Start enterprise update: Data -- {self.data}")
+        logger.debug("Start enterprise update: %s", self.data)
         try:
             db = next(get_db())
             with db as session:
@@ -88,18 +92,15 @@ class UpdateEvent:
 
                     for key, value in enterprise_update.model_dump().items():
                         if hasattr(enterprise, key):
-                            print(f"Setting {key} to {value}")
                             setattr(enterprise, key, value)
 
-                    print("Updating enterprise...")
                     session.add(enterprise)
                     session.commit()
 
                 else:
-                    print(f'Enterprise with id {self.data["id"]} not found')
-        except Exception as e:
-
-            print("Messaging error: ", str(e))
+                    logger.warning("Enterprise with id %s not found", self.data["id"])
+        except Exception:
+            logger.exception("Failed to process UpdateEnterpise event")
             if db:
                 db.rollback()
                 db.close()
@@ -137,27 +138,23 @@ class UpdateEvent:
         role: Role | None = None
         scope: Scope | None = None
 
-        print(f"Start User update: Data -- {self.data}")
+        logger.debug("Start user update: %s", self.data)
 
         try:
             if self.data["enterprise_id"] is None or self.data["user_id"] is None:
-                print("Enterprise or user id not provided")
+                logger.warning("Enterprise or user id not provided")
                 return
 
-            print("Parsed enterprise and user data...")
             db = next(get_db())
 
             with db as session:
-                print("Interacting with the database...")
-
                 role = self.role_search(session)
                 scope = self.scope_search(session)
 
-                print("finding user...")
                 db_user = session.get(User, self.data["user_id"])
 
                 if db_user is None:
-                    print(f'User with id {self.data["user_id"]} not found')
+                    logger.warning("User with id %s not found", self.data["user_id"])
                     return
 
                 if role:
@@ -180,12 +177,11 @@ class UpdateEvent:
                 if "full_name" in self.data:
                     db_user.full_name = self.data["full_name"]
 
-                print("Updating user...")
                 session.add(db_user)
                 session.commit()
 
-        except Exception as e:
-            print("Messaging Error :", str(e))
+        except Exception:
+            logger.exception("Failed to process UpdateUser event")
 
             if db:
                 db.rollback()
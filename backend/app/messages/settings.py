@@ -6,3 +6,23 @@ BROKER_HOST=str(re.sub(r'\n', '', environ.get("BROKER_HOST", "my-rabbit")))
 BROKER_USER=str(re.sub(r'\n', '', environ.get("BROKER_USER", "guest")))
 BROKER_PORT=int(re.sub(r'\n', '', environ.get("BROKER_PORT", "5672")))
 BROKER_PASS=str(re.sub(r'\n', '', environ.get("BROKER_PASS", "guest")))
+
+# "worker": every worker process consumes the RH queue (competing consumers).
+# "elected": only the worker holding BROKER_CONSUMER_LOCK consumes, the others
+# retry the lock every BROKER_CONSUMER_ELECTION_SECONDS and take over when the
+# consuming worker exits.
+BROKER_CONSUMER_MODE = environ.get("BROKER_CONSUMER_MODE", "worker").lower()
+BROKER_CONSUMER_LOCK = environ.get("BROKER_CONSUMER_LOCK", "/tmp/rh-consumer.lock")
+BROKER_CONSUMER_ELECTION_SECONDS = float(
+    environ.get("BROKER_CONSUMER_ELECTION_SECONDS", "5")
+)
+# A consumer that stopped (broker unreachable, connection or channel lost) is
+# restarted after BROKER_CONSUMER_RETRY_SECONDS, doubled after each failed run
+# up to BROKER_CONSUMER_RETRY_MAX_SECONDS.
+BROKER_CONSUMER_RETRY_SECONDS = float(environ.get("BROKER_CONSUMER_RETRY_SECONDS", "1"))
+BROKER_CONSUMER_RETRY_MAX_SECONDS = float(
+    environ.get("BROKER_CONSUMER_RETRY_MAX_SECONDS", "30")
+)
+# Time the shutdown gives the consumer, the publishes in flight and the sender
+# threads, after the HTTP requests were drained.
+BROKER_SHUTDOWN_SECONDS = float(environ.get("BROKER_SHUTDOWN_SECONDS", "10"))
@@ -11,39 +11,98 @@ Class AsyncListener:
     - message_processor: A callable that processes the messages.
 
     Methods:
+    - process: Runs the message_processor on a message in a span continuing the
+      publisher's trace, recording the consumer lag and processing time.
     - callback: Processes a message using the message_processor.
     - iterate_queue: Iterates over the messages in the queue and processes them using 
       the message_processor.
     - listen: Connects to the message broker, declares the exchange and queue, 
       binds the queue to the exchange, and starts iterating over the queue.
+      Returns when the connection fails or the iteration ends; run_consumer
+      calls it again unless the listener is stopping.
+    - backlog: Number of messages waiting in the queue, for the autoscaling.
+    - stop: Stops consuming (prefetched messages go back to the queue), lets
+      the message being processed finish and closes the connection.
 """
 
+import asyncio
+from datetime import datetime, timezone
+import logging
 from os import environ
+from time import perf_counter
 from typing import Callable
 
 import aio_pika
+from opentelemetry import trace
 
 from app.messages.async_broker import AsyncBroker
+from app.metrics.instruments import CONSUMER_LAG, CONSUMER_PROCESSING_DURATION
+from app.tracing import extract_context, tracer
+
+
+logger = logging.getLogger(__name__)
 
 
 class AsyncListener(AsyncBroker):
     def __init__(self, queue_name, processor: Callable[[str], None]):
         self.queue_name = queue_name
         self.message_processor = processor
+        self.connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self.queue: aio_pika.abc.AbstractQueue | None = None
+        self.queue_iter: aio_pika.abc.AbstractQueueIterator | None = None
+        self.stopping = False
+
+    def process(self, message: aio_pika.abc.AbstractIncomingMessage):
+        if message.timestamp is not None:
+            published = message.timestamp
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+
+            CONSUMER_LAG.labels(self.queue_name).observe(
+                max((datetime.now(timezone.utc) - published).total_seconds(), 0.0)
+            )
+
+        start = perf_counter()
+        result = "error"
+
+        try:
+            with tracer.start_as_current_span(
+                f"{self.queue_name} process",
+                context=extract_context(message.headers),
+                kind=trace.SpanKind.CONSUMER,
+                attributes={
+                    "messaging.system": "rabbitmq",
+                    "messaging.source.name": self.queue_name,
+                },
+            ):
+                self.message_processor(message.body.decode())
+            result = "ok"
+        finally:
+            CONSUMER_PROCESSING_DURATION.labels(self.queue_name, result).observe(
+                perf_counter() - start
+            )
 
     async def callback(self, message: aio_pika.abc.AbstractIncomingMessage):
         async with message.process():
-            self.message_processor(message.body.decode())
+            self.process(message)
 
     async def iterate_queue(self, queue: aio_pika.abc.AbstractQueue):
         async with queue.iterator() as queue_iter:
+            self.queue_iter = queue_iter
             async for message in queue_iter:
                 async with message.process():
-                    self.message_processor(message.body.decode())
+                    self.process(message)
+
+                if self.stopping:
+                    break
 
     async def listen(self, loop):
+        if self.connection is not None and not self.connection.is_closed:
+            # Left open by a previous run, which ended without a stop().
+            await self.connection.close()
+
         try:
-            connection = await self.default_connect_robust(loop)
+            connection = self.connection = await self.default_connect_robust(loop)
             channel = await connection.channel()
             exchange = await channel.declare_exchange(
                 environ.get("DEFAULT_EXCHANGE", "openferp"),
@@ -51,12 +110,54 @@ class AsyncListener(AsyncBroker):
                 durable=True,
             )
 
-            queue = await channel.declare_queue("rhevents/rh", durable=True)
+            queue = self.queue = await channel.declare_queue(
+                "rhevents/rh", durable=True
+            )
             await queue.bind(exchange, routing_key=self.queue_name)
             await self.iterate_queue(queue)
 
             return connection
         except aio_pika.exceptions.AMQPError as e:
-            print(f"Failed to connect to broker: ")
-            print(f"Error: {e}")
+            logger.error("Failed to connect to broker: %s", e)
             return None
+        finally:
+            self.queue = self.queue_iter = None
+
+    async def backlog(self, timeout: float) -> int | None:
+        """Messages ready in the queue, redeclared to read its count."""
+
+        if self.queue is None or self.stopping:
+            return None
+
+        result = await self.queue.declare(timeout=timeout)
+        return result.message_count
+
+    async def stop(self, task: asyncio.Task | None, timeout: float):
+        """
+        Stops consuming and waits up to ``timeout`` seconds for ``task`` (the
+        one running ``listen``) to finish the message in hand; cancels it after.
+        """
+
+        self.stopping = True
+
+        if self.queue_iter is None and task is not None:
+            # Still connecting or waiting to be elected, nothing in hand.
+            task.cancel()
+        elif self.queue_iter is not None:
+            try:
+                # Cancels the consumer and requeues the prefetched messages.
+                await asyncio.wait_for(self.queue_iter.close(), timeout)
+            except (asyncio.TimeoutError, aio_pika.exceptions.AMQPError) as e:
+                logger.warning(
+                    "Failed to cancel the %s consumer: %s", self.queue_name, e
+                )
+
+        if task is not None:
+            _, pending = await asyncio.wait({task}, timeout=timeout)
+            if pending:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        if self.connection is not None and not self.connection.is_closed:
+            await self.connection.close()
+        self.connection = None
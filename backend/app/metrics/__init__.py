@@ -0,0 +1,4 @@
+"""Prometheus metrics: instruments, SQL timing and exposition."""
+
+from . import db, instruments
+from .exposition import register_collector, render_metrics
@@ -0,0 +1,80 @@
+"""
+SQL statement metrics.
+
+Listeners on every ``Engine`` time each statement. While an HTTP request is
+being handled, ``track_queries`` also accumulates the count and time of the
+statements it runs, which the metrics middleware reports per route. Sync
+handlers run in a thread pool with a copy of the request context, so they
+update the same accumulator.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+
+from sqlalchemy import Engine, event
+
+from .instruments import DB_QUERY_DURATION
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+_request_queries: ContextVar[QueryStats | None] = ContextVar(
+    "request_queries", default=None
+)
+
+_START_KEY = "rh_query_start"
+
+# Label values for the statement kinds, anything else is reported as "other".
+_OPERATIONS = {"select", "insert", "update", "delete", "with", "begin", "commit"}
+
+
+def statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement else ""
+    return operation if operation in _OPERATIONS else "other"
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Accumulates the statements executed in the current context."""
+
+    stats = QueryStats()
+    token = _request_queries.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_queries.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault(_START_KEY, []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, _cursor, statement, _parameters, _context, _executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+
+    elapsed = perf_counter() - starts.pop()
+    DB_QUERY_DURATION.labels(statement_operation(statement)).observe(elapsed)
+
+    stats = _request_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _failed_query(context):
+    if context.connection is not None:
+        starts = context.connection.info.get(_START_KEY)
+        if starts:
+            starts.pop()
@@ -0,0 +1,46 @@
+"""
+Metrics exposition.
+
+With a single process the default registry is served. When the workers run
+under a process manager with ``PROMETHEUS_MULTIPROC_DIR`` set, the values
+written by every worker to that directory are aggregated instead, so any
+worker can answer the scrape. Collectors added with ``register_collector``
+(per-process state such as the connection pools) describe the worker that
+answers.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.registry import Collector
+
+
+_collectors: list[Collector] = []
+
+
+def register_collector(collector: Collector):
+    _collectors.append(collector)
+
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        REGISTRY.register(collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Returns the exposition payload and its content type."""
+
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+
+    for collector in _collectors:
+        registry.register(collector)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
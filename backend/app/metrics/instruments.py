@@ -0,0 +1,155 @@
+"""
+Prometheus instruments of the RH service.
+
+All metrics are created here, on the default registry, so their names and
+labels are defined in one place. Instrumented code imports the instrument it
+needs; it never creates metrics itself.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Seconds. Fine grained at the low end, where most requests and queries are.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# bcrypt takes tens to hundreds of milliseconds depending on the rounds.
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "rh_http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_QUERY_DURATION = Histogram(
+    "rh_db_query_duration_seconds",
+    "Time spent executing a single SQL statement.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "rh_db_queries_per_request",
+    "SQL statements executed while handling an HTTP request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "rh_db_time_per_request_seconds",
+    "Time spent in SQL statements while handling an HTTP request.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "rh_password_hash_duration_seconds",
+    "Time spent hashing or verifying passwords.",
+    ["operation"],
+    buckets=HASH_BUCKETS,
+)
+
+JWT_DURATION = Histogram(
+    "rh_jwt_duration_seconds",
+    "Time spent signing or verifying JWTs.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+BROKER_PUBLISH_DURATION = Histogram(
+    "rh_broker_publish_duration_seconds",
+    "Time to connect and publish an event to the broker.",
+    buckets=LATENCY_BUCKETS,
+)
+
+BROKER_PUBLISH_FAILURES = Counter(
+    "rh_broker_publish_failures",
+    "Events that could not be published.",
+)
+
+CONSUMER_LAG = Histogram(
+    "rh_consumer_lag_seconds",
+    "Time between an event being published and this service consuming it.",
+    ["queue"],
+    buckets=LAG_BUCKETS,
+)
+
+CONSUMER_PROCESSING_DURATION = Histogram(
+    "rh_consumer_processing_duration_seconds",
+    "Time to process a consumed event, by result.",
+    ["queue", "result"],
+    buckets=LATENCY_BUCKETS,
+)
+
+LOGIN_THROTTLED = Counter(
+    "rh_login_throttled",
+    "Login attempts rejected by the rate limiter, by bucket.",
+    ["bucket"],
+)
+
+ADMISSION_REJECTED = Counter(
+    "rh_admission_rejected",
+    "Requests answered 503 by the admission control, by route class and reason.",
+    ["route_class", "reason"],
+)
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "rh_admission_queue_wait_seconds",
+    "Time an admitted request waited for a slot, by route class.",
+    ["route_class"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Autoscaling signals (app.metrics.scaling). With several workers the gauges
+# are combined over the live workers of the pod: sums for the amounts of
+# work, maxima for the delays and the shared queue.
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "rh_http_requests_in_flight",
+    "Requests being handled.",
+    multiprocess_mode="livesum",
+)
+
+EVENT_LOOP_LAG = Gauge(
+    "rh_event_loop_lag_seconds",
+    "Delay of the event loop in running a scheduled callback.",
+    multiprocess_mode="livemax",
+)
+
+DB_POOL_RECENT_WAIT = Gauge(
+    "rh_db_pool_recent_wait_seconds",
+    "Average checkout wait of the primary pool over the last sampling interval.",
+    multiprocess_mode="livemax",
+)
+
+CONSUMER_BACKLOG = Gauge(
+    "rh_consumer_backlog_messages",
+    "Messages ready in the consumed queue, not yet delivered.",
+    ["queue"],
+    multiprocess_mode="livemax",
+)
+
+PASSWORD_HASH_IN_PROGRESS = Gauge(
+    "rh_password_hash_in_progress",
+    "Password hashes and verifications running.",
+    multiprocess_mode="livesum",
+)
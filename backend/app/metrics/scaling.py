@@ -0,0 +1,126 @@
+"""
+Autoscaling signals.
+
+``ScalingSampler`` runs on the event loop of each worker and keeps the gauges
+a HorizontalPodAutoscaler scales on (through prometheus-adapter, see
+``k8s/hpa.yaml``) up to date:
+
+- ``rh_http_requests_in_flight``: requests being handled;
+- ``rh_event_loop_lag_seconds``: how late the sampler wakes up, the time a
+  ready callback waits for the loop;
+- ``rh_db_pool_recent_wait_seconds``: average checkout wait of the primary
+  pool since the previous sample;
+- ``rh_consumer_backlog_messages``: messages waiting in the consumed queue.
+
+``rh_password_hash_in_progress`` is kept by ``app.auth.data_hash`` itself.
+The gauges are point in time values, unlike the histograms they complement,
+so the adapter needs no rate window to read them.
+"""
+
+import asyncio
+import logging
+
+import aio_pika
+
+from app.db import conn
+from app.db.pool import get_pool_status
+from app.messages.subscriber import AsyncListener
+from app.middlewares.metrics import in_flight
+
+from . import settings as st
+from .instruments import (
+    CONSUMER_BACKLOG,
+    DB_POOL_RECENT_WAIT,
+    EVENT_LOOP_LAG,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScalingSampler:
+    def __init__(
+        self,
+        listener: AsyncListener | None = None,
+        interval: float = st.SCALING_SAMPLE_SECONDS,
+        backlog_interval: float = st.SCALING_BACKLOG_SECONDS,
+    ):
+        self.listener = listener
+        self.interval = interval
+        self.backlog_interval = backlog_interval
+        self._previous_wait = (0, 0.0)
+        self._backlog_at = float("-inf")
+        self._backlog: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+
+    def recent_pool_wait(self) -> float:
+        if conn.engine is None:
+            return 0.0
+
+        status = get_pool_status(conn.engine.pool)
+
+        if "checkouts" not in status:
+            return 0.0
+
+        current = (
+            status["checkouts"] + status["timeouts"],
+            status["wait_seconds_total"],
+        )
+        observed, waited = (
+            now - before for now, before in zip(current, self._previous_wait)
+        )
+        self._previous_wait = current
+
+        return waited / observed if observed > 0 else 0.0
+
+    def sample(self, lag: float):
+        EVENT_LOOP_LAG.set(lag)
+        HTTP_REQUESTS_IN_FLIGHT.set(in_flight.count)
+        DB_POOL_RECENT_WAIT.set(self.recent_pool_wait())
+
+    async def sample_backlog(self):
+        if self.listener is None:
+            return
+
+        try:
+            count = await self.listener.backlog(timeout=self.backlog_interval)
+        except (asyncio.TimeoutError, aio_pika.exceptions.AMQPError) as e:
+            logger.debug("Failed to read the consumer backlog: %s", e)
+            return
+
+        if count is not None:
+            CONSUMER_BACKLOG.labels(self.listener.queue_name).set(count)
+
+    def _backlog_due(self, now: float) -> bool:
+        return (
+            self.listener is not None
+            and self.backlog_interval > 0
+            and now - self._backlog_at >= self.backlog_interval
+            and (self._backlog is None or self._backlog.done())
+        )
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.sample(max(now - expected, 0.0))
+
+            # In its own task, so a slow broker does not delay the samples.
+            if self._backlog_due(now):
+                self._backlog_at = now
+                self._backlog = loop.create_task(self.sample_backlog())
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        tasks = [task for task in (self._task, self._backlog) if task is not None]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
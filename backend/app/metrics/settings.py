@@ -0,0 +1,11 @@
+""" Variables defined by the environment for the autoscaling signals """
+
+import os
+
+
+# The sampler wakes up every SCALING_SAMPLE_SECONDS: the lateness of the wake
+# up is the event loop lag, and the in-flight requests and the recent pool
+# wait are read at the same time.
+SCALING_SAMPLE_SECONDS = float(os.environ.get("SCALING_SAMPLE_SECONDS", "1"))
+# The consumer backlog costs a broker round trip, read less often. 0 disables.
+SCALING_BACKLOG_SECONDS = float(os.environ.get("SCALING_BACKLOG_SECONDS", "15"))
@@ -0,0 +1,77 @@
+"""
+Admission control middleware.
+
+Classifies each request (``app.admission.route_class``) and runs it under the
+concurrency limiter of its class. A request that finds the queue full, or
+waits longer than the queue timeout, is answered 503 with ``Retry-After``
+before it reaches the database pool or the password hashing threads.
+"""
+
+from math import ceil
+from time import perf_counter
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.admission import ConcurrencyLimiter, Rejected, build_limiters, route_class
+from app.admission import settings as st
+from app.metrics.instruments import ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED
+
+
+class AdmissionMiddleware:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: dict[str, ConcurrencyLimiter] | None = None,
+        enabled: bool = st.ADMISSION_ENABLED,
+    ):
+        self.app = app
+        self.limiters = build_limiters() if limiters is None else limiters
+        self.enabled = enabled
+
+    async def reject(self, send: Send, error: Rejected):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(max(ceil(error.retry_after), 1)).encode()),
+                ],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b'{"detail":"Service overloaded, retry later"}',
+            }
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limiter = None
+
+        if self.enabled and scope["type"] == "http":
+            name = route_class(scope["method"], scope["path"])
+            limiter = self.limiters.get(name) if name is not None else None
+
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+
+        try:
+            await limiter.acquire()
+        except Rejected as e:
+            ADMISSION_REJECTED.labels(name, e.reason).inc()
+            await self.reject(send, e)
+            return
+
+        admitted = perf_counter()
+        ADMISSION_QUEUE_WAIT.labels(name).observe(admitted - start)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(perf_counter() - admitted)
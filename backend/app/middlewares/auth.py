@@ -1,21 +1,61 @@
 """Authentication and authorization middleware for FastAPI application."""
 
-from typing import Annotated, Any
+import logging
+from typing import Annotated, Any, Callable
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
 from app.auth.jwt_utils import JWTValidationError, decode_jwt_token
-from app.models.user import UserRead
+from app.auth.policy import COMPILED_POLICIES
+from app.auth.revocation import revocations
+from app.auth.token_version import DEFAULT_VERSION, token_versions
+from app.db.conn import get_db
+from app.models.user import User, UserRead
 from app.models.scope import DefaultScope
 
 
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+def load_current_user(user_id: int) -> UserRead | None:
+    """
+    Reads the user from the primary database and records its token version.
+
+    Args:
+        user_id (int): The ID of the user to load.
+
+    Returns:
+        UserRead | None: The user as currently stored, or None if it was deleted.
+    """
+
+    with next(get_db()) as session:
+        user = session.get(User, user_id)
+
+        if user is None or not user.role or not user.scope or not user.enterprise:
+            return None
+
+        token_versions.set(user_id, user.token_version)
+
+        return UserRead(
+            **user.model_dump(),
+            role=user.role.model_dump(),
+            scope=user.scope.model_dump(),
+            enterprise=user.enterprise.model_dump(),
+        )
+
+
 def authenticate_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserRead:
     """
     Authenticates the user based on the provided token.
 
+    Revoked tokens (``revocations``, by ``jti`` or issued before the user's
+    not-before time) are rejected. The claims are trusted unless the user
+    changed since the token was issued (its ``ver`` claim is behind
+    ``token_versions``), in which case the user is read again from the
+    database.
+
     Args:
         token (str): The JWT token used for authentication.
 
@@ -42,9 +82,21 @@ def authenticate_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserRead
         if user is None or len(user) <= 0:
             raise credentials_exception
 
-        print(user)
         token_data = UserRead(**user)
 
+        if revocations.is_revoked(
+            payload.get("jti"), token_data.id, payload.get("iat", 0)
+        ):
+            raise credentials_exception
+
+        if token_versions.is_stale(token_data.id, payload.get("ver", DEFAULT_VERSION)):
+            current_user = load_current_user(token_data.id)
+
+            if current_user is None:
+                raise credentials_exception
+
+            return current_user
+
         return token_data
     except PyJWTError as ex:
         raise credentials_exception from ex
@@ -73,27 +125,77 @@ def authorize_user(
     if operation_scopes is None:
         operation_scopes = [DefaultScope.ALL.value]
 
-    print("Hierarchies: ", user.role.hierarchy)
-    print("Scopes: ", user.scope.name)
-    print("Check hier", user.role.hierarchy > operation_hierarchy_order)
-    print(
-        "Check scope",
-        user.scope.name != DefaultScope.ALL and user.scope.name not in operation_scopes,
+    allowed = (
+        user.role.hierarchy == 1 or user.role.hierarchy <= operation_hierarchy_order
+    ) and (
+        user.scope.name == DefaultScope.ALL.value or user.scope.name in operation_scopes
     )
 
-    if (
-        user.role.hierarchy != 1 and user.role.hierarchy > operation_hierarchy_order
-    ) or (
-        user.scope.name != DefaultScope.ALL.value
-        and user.scope.name not in operation_scopes
-    ):
-
+    if not allowed or (custom_checks is not None and not custom_checks):
+        logger.debug(
+            "User %s denied: hierarchy %s (required %s), scope %s (required %s)",
+            user.id,
+            user.role.hierarchy,
+            operation_hierarchy_order,
+            user.scope.name,
+            operation_scopes,
+        )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User does not have permission to access this resource",
         )
 
-    if custom_checks != None and not custom_checks:
+    return user
+
+
+def require_policy(name: str) -> Callable[[UserRead], UserRead]:
+    """
+    Returns a dependency authorizing the request against the policy ``name``
+    of ``app.auth.policy.POLICIES``, e.g.
+    ``@router.get("/", dependencies=[Depends(require_policy("user.list"))])``.
+    """
+
+    policy = COMPILED_POLICIES[name]
+
+    if policy.target:
+        raise ValueError(f"Policy {name} needs the target, use authorize_target")
+
+    def authorize(user: UserRead = Depends(authenticate_user)) -> UserRead:
+        if not policy.allows(user.role.hierarchy, user.scope.name):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User does not have permission to access this resource",
+            )
+
+        return user
+
+    return authorize
+
+
+def authorize_target(
+    name: str, user: UserRead, target_hierarchy: int, target_scope: str
+) -> UserRead:
+    """
+    Authorizes ``user`` to act on a user of role hierarchy ``target_hierarchy``
+    in scope ``target_scope``, against the policy ``name`` of
+    ``app.auth.policy.POLICIES``. The caller checks the target belongs to the
+    user's enterprise.
+    """
+
+    policy = COMPILED_POLICIES[name]
+
+    if not policy.allows_over(
+        user.role.hierarchy, user.scope.name, target_hierarchy, target_scope
+    ):
+        logger.debug(
+            "User %s denied %s: hierarchy %s (target %s), scope %s (target %s)",
+            user.id,
+            name,
+            user.role.hierarchy,
+            target_hierarchy,
+            user.scope.name,
+            target_scope,
+        )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User does not have permission to access this resource",
@@ -0,0 +1,156 @@
+"""
+Database session dependencies that route reads to the replicas.
+
+``get_read_db`` is meant for read-only handlers: it opens the session on the
+replica chosen by ``app.db.conn.replica_router`` and falls back to the primary
+session when no replica should (or could) be used. ``get_write_db`` yields the
+primary session and, after each commit, marks the authenticated user as a
+recent writer so their next reads stay on the primary until the replicas
+caught up.
+
+The mark is kept by the worker, and ``ReadYourWritesMiddleware`` also hands
+it to the client in the ``rh_last_write`` cookie, which expires with the
+window: the next request of the client reads from the primary whichever
+worker or pod it reaches.
+"""
+
+from collections.abc import Iterator
+from contextvars import ContextVar
+import math
+from time import time
+
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.conn import get_db, replica_router
+from app.middlewares.auth import authenticate_user
+from app.models.user import UserRead
+
+
+LAST_WRITE_COOKIE = "rh_last_write"
+
+
+class LastWrite:
+    """The time the request committed a write, if it did."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.at: float | None = None
+
+
+last_write_var: ContextVar[LastWrite | None] = ContextVar("last_write", default=None)
+
+
+class ReadYourWritesMiddleware:
+    """Sets ``rh_last_write`` on the responses of the requests that wrote."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        window = replica_router.writes.window_seconds
+
+        if scope["type"] != "http" or window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        last_write = LastWrite()
+
+        async def send_with_last_write(message: Message):
+            if message["type"] == "http.response.start" and last_write.at is not None:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={last_write.at:.3f}; "
+                    f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        token = last_write_var.set(last_write)
+        try:
+            await self.app(scope, receive, send_with_last_write)
+        finally:
+            last_write_var.reset(token)
+
+
+def client_last_write(request: Request) -> float | None:
+    """The time of the client's last write, from its ``rh_last_write`` cookie."""
+
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_read_db(
+    request: Request,
+    primary_session: Session = Depends(get_db),
+    identified_user: UserRead = Depends(authenticate_user),
+) -> Iterator[Session]:
+    """
+    Gets a session for read-only work, bound to a replica when possible.
+
+    Yields:
+        Session: a replica session, or the primary session as fallback
+    """
+
+    bind = replica_router.choose(
+        identified_user.id if identified_user else None, client_last_write(request)
+    )
+
+    if bind is replica_router.primary:
+        yield primary_session
+        return
+
+    session = Session(autocommit=False, autoflush=False, bind=bind)
+
+    try:
+        # Check the replica out now, so an unreachable one is skipped before
+        # the handler runs instead of failing the request.
+        session.connection()
+    except OperationalError:
+        session.close()
+        replica_router.mark_unhealthy(bind)
+        yield primary_session
+        return
+
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def get_write_db(
+    session: Session = Depends(get_db),
+    identified_user: UserRead = Depends(authenticate_user),
+) -> Iterator[Session]:
+    """
+    Gets the primary session and records the user's writes for read-your-writes.
+
+    Yields:
+        Session: the primary database session
+    """
+
+    user_id = identified_user.id if identified_user else None
+    last_write = last_write_var.get()
+
+    def record_write(_session: Session):
+        replica_router.record_write(user_id)
+
+        if last_write is not None:
+            last_write.at = time()
+
+    event.listen(session, "after_commit", record_write)
+
+    try:
+        yield session
+    finally:
+        event.remove(session, "after_commit", record_write)
@@ -0,0 +1,69 @@
+"""
+HTTP metrics middleware.
+
+Records the latency of every request by method, route template (e.g.
+``/users/{user_id}``, never the raw path, to keep the label set bounded) and
+status code, plus the number of SQL statements it ran and the time they took.
+``in_flight`` counts the requests being handled by the worker.
+"""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.db import track_queries
+from app.metrics.instruments import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+)
+
+
+class InFlight:
+    """Requests in flight in the worker, only updated on its event loop."""
+
+    def __init__(self):
+        self.count = 0
+
+
+in_flight = InFlight()
+
+
+def route_template(scope: Scope) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        in_flight.count += 1
+
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                in_flight.count -= 1
+                route = route_template(scope)
+
+                HTTP_REQUEST_DURATION.labels(
+                    scope["method"], route, str(status_code)
+                ).observe(perf_counter() - start)
+                DB_QUERIES_PER_REQUEST.labels(route).observe(queries.count)
+                DB_TIME_PER_REQUEST.labels(route).observe(queries.seconds)
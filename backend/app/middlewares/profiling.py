@@ -0,0 +1,61 @@
+"""
+Profiling middleware.
+
+Lets ``app.profiling.profiler`` decide whether a request is profiled and, once
+the response is sent, writes the stacks of the kept profiles (sampled or slow
+requests) per route template in the default executor, off the event loop.
+"""
+
+import asyncio
+import logging
+from time import perf_counter
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.log import request_id_var
+from app.middlewares.metrics import route_template
+from app.profiling import profiler
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile, sampled = profiler.start()
+
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            seconds = perf_counter() - start
+
+            if profiler.finish(profile, sampled, seconds):
+                route = f"{scope['method']} {route_template(scope)}"
+                future = asyncio.get_running_loop().run_in_executor(
+                    None,
+                    profiler.write,
+                    profile,
+                    route,
+                    seconds,
+                    request_id_var.get() or "none",
+                )
+                future.add_done_callback(_log_write_error)
+
+
+def _log_write_error(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Failed to write profile: %s", future.exception())
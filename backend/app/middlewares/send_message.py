@@ -2,31 +2,102 @@
 This module contains middleware for sending messages. It is part of the backend application of the sec-microservice-rh project.
 
 The middleware defined here can be used to send messages to other parts of the application or to external services. This can be useful for logging, notifications, or inter-service communication.
+
+Publishes go through one ``AsyncSender`` per worker, sharing its connection.
+They are tracked until done, and threads of the sync sender until they exit,
+so the shutdown can wait for them (``drain_publishes``,
+``join_sender_threads``) instead of dropping events.
 """
 
 import asyncio
 from collections.abc import Coroutine
+import logging
 import threading
+from time import monotonic
+from typing import Any, Callable
 
 from app.messages.client import AsyncSender, SyncSender
-from typing import Any, Callable
 
 
-def run_sender(sender: SyncSender, message):
-    sender.send_message(message)
+logger = logging.getLogger(__name__)
+
+event_sender = AsyncSender(queue_name="rh_event.#")
+
+_pending_publishes: set[asyncio.Task] = set()
+_sender_threads: set[threading.Thread] = set()
+
+
+def run_sender(message: str):
+    try:
+        sender = SyncSender(queue_name="rh_event.#")
+        try:
+            sender.send_message(message)
+        finally:
+            sender.close_connection()
+    finally:
+        _sender_threads.discard(threading.current_thread())
 
 
 async def send_async_message_loop(message: str) -> None:
-    print("Creating task...")
-    loop = asyncio.get_event_loop()
-    sender = AsyncSender(queue_name="rh_event.#")
-    task = loop.create_task(sender.publish(message, loop))
-    await task
+    logger.debug("Creating publish task")
+    loop = asyncio.get_running_loop()
+    task = loop.create_task(event_sender.publish(message, loop))
+    _pending_publishes.add(task)
+    task.add_done_callback(_pending_publishes.discard)
+
+    # A cancelled request (client gone) must not cancel its event.
+    await asyncio.shield(task)
 
 
 def send_async_message(message: str) -> None:
-    sender = SyncSender(queue_name="rh_event.#")
-    threading.Thread(target=run_sender, args=(sender, message)).start()
+    thread = threading.Thread(target=run_sender, args=(message,), name="sync-sender")
+    _sender_threads.add(thread)
+    thread.start()
+
+
+async def drain_publishes(timeout: float) -> int:
+    """
+    Waits up to ``timeout`` seconds for the publishes in flight, then closes
+    the sender connection.
+
+    Returns:
+        int: the publishes cancelled because they did not finish in time.
+    """
+
+    loop = asyncio.get_running_loop()
+    pending = {task for task in _pending_publishes if task.get_loop() is loop}
+
+    if pending:
+        _, pending = await asyncio.wait(pending, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+
+        if pending:
+            logger.warning("Cancelled %s unfinished publishes", len(pending))
+
+    await event_sender.close()
+    return len(pending)
+
+
+def join_sender_threads(timeout: float) -> int:
+    """
+    Waits up to ``timeout`` seconds for the sync sender threads.
+
+    Returns:
+        int: the threads still running.
+    """
+
+    deadline = monotonic() + timeout
+
+    for thread in list(_sender_threads):
+        thread.join(max(deadline - monotonic(), 0))
+
+    alive = len(_sender_threads)
+    if alive:
+        logger.warning("%s sender threads still running at shutdown", alive)
+
+    return alive
 
 
 def get_async_message_sender() -> Callable[[str], None]:
@@ -34,5 +105,4 @@ def get_async_message_sender() -> Callable[[str], None]:
 
 
 def get_async_message_sender_on_loop() -> Callable[[str], Coroutine[Any, Any, None]]:
-    print("Returning function")
     return send_async_message_loop
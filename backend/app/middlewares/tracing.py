@@ -0,0 +1,54 @@
+"""
+Tracing middleware.
+
+Opens a server span for every HTTP request, continuing the trace of the caller
+when the request carries a ``traceparent`` header. The span is named after the
+route template once routing is done, e.g. ``PUT /users/{user_id}``.
+"""
+
+from opentelemetry import trace
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middlewares.metrics import route_template
+from app.tracing import extract_context, is_tracing_enabled, tracer
+
+
+class TracingMiddleware:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not is_tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=extract_context(headers),
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            },
+        ) as span:
+
+            async def send_with_status(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(trace.StatusCode.ERROR)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                span.update_name(f"{scope['method']} {route}")
+                span.set_attribute("http.route", route)
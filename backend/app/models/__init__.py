@@ -1,3 +1,3 @@
 """Models package."""
 
-from . import enterprise, role, scope, user
+from . import enterprise, refresh_token, revoked_token, revoked_user, role, scope, user
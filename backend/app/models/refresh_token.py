@@ -0,0 +1,42 @@
+"""
+This module defines the RefreshToken model.
+
+Only an HMAC of each refresh token is stored. Tokens are rotated: exchanging
+one marks it used and issues the next of the same family, so a used token
+presented again reveals a copy and revokes the whole family.
+"""
+
+from datetime import datetime as dt
+from typing import Optional
+
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlmodel import Field
+
+from app.db.base import BaseIDModel
+
+
+class RefreshToken(BaseIDModel, table=True):
+    """
+    Represents an issued refresh token.
+
+    Attributes:
+        token_hash (str): HMAC-SHA256 of the token, hex encoded.
+        family_id (str): Shared by the tokens rotated from the same login.
+        user_id (int): ID of the user the token belongs to.
+        expires_at (datetime): Expiry, naive UTC.
+        used_at (datetime, optional): When the token was exchanged, naive UTC.
+    """
+
+    __tablename__ = "refresh_token"
+    token_hash: str = Field(unique=True, index=True, nullable=False)
+    family_id: str = Field(index=True, nullable=False)
+    user_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("user.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        )
+    )
+    expires_at: dt = Field(nullable=False)
+    used_at: Optional[dt] = Field(default=None, nullable=True)
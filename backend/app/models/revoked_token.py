@@ -0,0 +1,22 @@
+"""
+This module defines the RevokedToken model.
+
+Access tokens revoked before their expiry (a logout), by ``jti``. Rows are
+useless once the token expired and are deleted then.
+"""
+
+from sqlmodel import Field, SQLModel
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    Represents a revoked access token.
+
+    Attributes:
+        jti (str): The ``jti`` claim of the token.
+        expires_at (int): The ``exp`` claim of the token, Unix time.
+    """
+
+    __tablename__ = "revoked_token"
+    jti: str = Field(primary_key=True)
+    expires_at: int = Field(nullable=False, index=True)
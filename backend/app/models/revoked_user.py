@@ -0,0 +1,23 @@
+"""
+This module defines the RevokedUser model.
+
+The not-before time of a deleted user, whose ``user.tokens_not_before`` went
+with its row. Rows are useless once the tokens issued before it expired and
+are deleted then.
+"""
+
+from sqlmodel import Field, SQLModel
+
+
+class RevokedUser(SQLModel, table=True):
+    """
+    Represents the revoked tokens of a deleted user.
+
+    Attributes:
+        user_id (int): The ID the user had.
+        not_before (int): Tokens issued before it are rejected, Unix time.
+    """
+
+    __tablename__ = "revoked_user"
+    user_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    not_before: int = Field(nullable=False, index=True)
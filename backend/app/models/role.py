@@ -32,6 +32,7 @@ class BaseRole(SQLModel):
         foreign_key="enterprise.id",
         description="The enterprise to which the scope belongs.",
         nullable=True,
+        index=True,
     )
 
     @classmethod
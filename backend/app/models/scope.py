@@ -39,6 +39,7 @@ class BaseScope(SQLModel):
         foreign_key="enterprise.id",
         description="The enterprise to which the scope belongs.",
         nullable=True,
+        index=True,
     )
 
     @classmethod
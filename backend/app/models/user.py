@@ -5,6 +5,7 @@ from typing import Optional, Tuple
 
 from pydantic import EmailStr
 from sqlalchemy import String, UniqueConstraint
+from sqlalchemy.orm import joinedload
 from sqlmodel import Column, Field, Relationship, SQLModel, and_, col, select
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
@@ -102,6 +103,9 @@ class User(BaseIDModel, BaseUser, table=True):
         role (Role, optional): Role object associated with the user.
         scope (Scope, optional): Scope object associated with the user.
         enterprise (Enterprise, optional): Enterprise object associated with the user.
+        token_version (int): Incremented whenever a claim of the user's tokens changes.
+        tokens_not_before (int, optional): Tokens issued before this Unix time
+            are revoked; set when the password changes or on a logout everywhere.
     """
 
     __tablename__ = "user"
@@ -113,15 +117,37 @@ class User(BaseIDModel, BaseUser, table=True):
         description="Timestamp of when the user was registered.",
         default_factory=lambda: dt.now(timezone.utc),
     )
-    role_id: Optional[int] = Field(default=None, foreign_key="role.id")
-    scope_id: Optional[int] = Field(default=None, foreign_key="scope.id")
+    role_id: Optional[int] = Field(default=None, foreign_key="role.id", index=True)
+    scope_id: Optional[int] = Field(default=None, foreign_key="scope.id", index=True)
     role: Optional[Role] = Relationship(back_populates="users")
     scope: Optional[Scope] = Relationship(back_populates="users")
     enterprise: Optional[Enterprise] = Relationship(back_populates="users")
-    enterprise_id: int | None = Field(foreign_key="enterprise.id", nullable=False)
+    enterprise_id: int | None = Field(
+        foreign_key="enterprise.id", nullable=False, index=True
+    )
+    token_version: int = Field(
+        default=1,
+        description="Version of the claims carried by the user's tokens.",
+        sa_column_kwargs={"server_default": "1"},
+    )
+    tokens_not_before: Optional[int] = Field(
+        default=None,
+        description="Unix time before which the user's tokens are revoked.",
+        nullable=True,
+    )
+
+    @classmethod
+    def with_relations(cls) -> SelectOfScalar:
+        """Selects users with their role, scope and enterprise in the same query."""
+
+        return select(User).options(
+            joinedload(User.role),
+            joinedload(User.scope),
+            joinedload(User.enterprise),
+        )
 
     def get_all(self) -> SelectOfScalar:
-        return select(User).where(User.enterprise_id == self.enterprise_id)
+        return User.with_relations().where(User.enterprise_id == self.enterprise_id)
 
 
 class UserCreate(BaseUser):
@@ -146,6 +172,16 @@ class UserRead(BaseUser):
     enterprise: "EnterpriseRelation"
 
 
+class UserMember(BaseUser):
+    """Represents a user listed with its enterprise, without credentials."""
+
+    id: int
+    created_at: dt
+    enterprise_id: int | None = None
+    role_id: Optional[int] = None
+    scope_id: Optional[int] = None
+
+
 class UserUpdate(SQLModel):
     """Represents a user update request."""
 
@@ -0,0 +1,11 @@
+"""Request profiling: runtime switch, sampling policy and the stack sampler."""
+
+from . import settings
+from .profiler import (
+    ProfilingState,
+    RequestProfiler,
+    install_signal_handler,
+    profiler,
+    route_folder,
+)
+from .sampler import Profile, StackSampler
@@ -0,0 +1,117 @@
+"""
+Request profiling.
+
+``profiler`` holds the runtime switch and the policy: when enabled, a
+``sample_rate`` fraction of the requests and every request slower than
+``slow_seconds`` is profiled by the stack sampler, and the collapsed stacks
+are written under ``PROFILING_DIR/<method>_<route>/`` (e.g.
+``GET_enterprise_full``) as ``<timestamp>-<duration>ms-<request id>.folded``,
+ready for ``flamegraph.pl`` or speedscope. Only the newest
+``PROFILING_MAX_FILES`` files are kept per route.
+
+The switch is per worker process: ``PUT /admin/profiling`` changes the worker
+that serves it, ``SIGUSR2`` the worker that receives it.
+"""
+
+from dataclasses import asdict, dataclass
+import logging
+from pathlib import Path
+import random
+import re
+import signal
+import time
+
+from . import settings as st
+from .sampler import Profile, StackSampler
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfilingState:
+    enabled: bool = st.PROFILING_ENABLED
+    sample_rate: float = st.PROFILING_SAMPLE_RATE
+    slow_seconds: float = st.PROFILING_SLOW_SECONDS
+
+
+class RequestProfiler:
+    def __init__(self, directory: str, max_files: int, interval: float):
+        self.state = ProfilingState()
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.sampler = StackSampler(interval)
+
+    def configure(self, **changes) -> ProfilingState:
+        for name, value in changes.items():
+            if value is not None:
+                setattr(self.state, name, value)
+
+        logger.info("Profiling settings: %s", asdict(self.state))
+        return self.state
+
+    def toggle(self):
+        self.configure(enabled=not self.state.enabled)
+
+    def start(self) -> tuple[Profile | None, bool]:
+        """
+        Starts profiling a request when the policy asks for it.
+
+        Returns:
+            tuple[Profile | None, bool]: the profile (None when the request is
+            not profiled) and whether it was sampled regardless of duration.
+        """
+
+        state = self.state
+
+        if not state.enabled:
+            return None, False
+
+        sampled = random.random() < state.sample_rate
+
+        if not sampled and state.slow_seconds <= 0:
+            return None, False
+
+        return self.sampler.subscribe(), sampled
+
+    def finish(self, profile: Profile, sampled: bool, seconds: float) -> bool:
+        """Stops ``profile`` and tells whether it must be written."""
+
+        self.sampler.unsubscribe(profile)
+        slow = 0 < self.state.slow_seconds <= seconds
+
+        return (sampled or slow) and profile.samples > 0
+
+    def write(self, profile: Profile, route: str, seconds: float, request_id: str):
+        folder = self.directory / route_folder(route)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        name = f"{time.time_ns() // 1_000_000}-{seconds * 1000:.0f}ms-{request_id}"
+        (folder / f"{name}.folded").write_text(profile.folded(), encoding="utf-8")
+
+        files = sorted(folder.glob("*.folded"))
+
+        for old in files[: max(len(files) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+
+
+def route_folder(route: str) -> str:
+    """``GET /users/{user_id}`` -> ``GET_users_user_id``."""
+
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "unmatched"
+
+
+profiler = RequestProfiler(
+    st.PROFILING_DIR, st.PROFILING_MAX_FILES, st.PROFILING_INTERVAL_SECONDS
+)
+
+
+def install_signal_handler(loop) -> bool:
+    """Toggles profiling on SIGUSR2, when the platform and thread allow it."""
+
+    try:
+        loop.add_signal_handler(signal.SIGUSR2, profiler.toggle)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        return False
+
+    return True
@@ -0,0 +1,110 @@
+"""
+Stack sampling profiler.
+
+While at least one request is being profiled a background thread reads the
+stack of every thread (``sys._current_frames``) each ``interval`` seconds and
+adds it, collapsed as ``outer;...;inner``, to the ``Profile`` of each of those
+requests. Sampling costs the profiled requests nothing beyond the GIL the
+sampler briefly holds, and it follows the work into the thread pool that runs
+sync handlers. Threads idling in a lock, queue or selector wait are skipped.
+
+Concurrent requests share the samples taken while they overlap, so a profile
+shows what the worker was doing during the request, which is what explains a
+latency spike.
+"""
+
+from collections import Counter
+import os
+import sys
+import threading
+from types import FrameType
+
+
+# Innermost frames in these modules mean the thread is waiting for work.
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+class Profile:
+    """Collapsed stacks sampled while a request was in flight."""
+
+    def __init__(self):
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def folded(self) -> str:
+        """Returns the stacks in the collapsed format read by flamegraph tools."""
+
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+def collapse(frame: FrameType | None) -> str:
+    names = []
+
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+def _is_idle(frame: FrameType) -> bool:
+    return os.path.basename(frame.f_code.co_filename) in _IDLE_FILES
+
+
+class StackSampler:
+    """Samples the process stacks for the profiles currently subscribed."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._wakeup = threading.Event()
+
+    def subscribe(self) -> Profile:
+        profile = Profile()
+
+        with self._lock:
+            self._profiles.add(profile)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+
+        return profile
+
+    def unsubscribe(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def sample(self):
+        """Adds the current stacks to every subscribed profile."""
+
+        own = threading.get_ident()
+        stacks = [
+            collapse(frame)
+            for ident, frame in sys._current_frames().items()  # pylint: disable=protected-access
+            if ident != own and not _is_idle(frame)
+        ]
+
+        with self._lock:
+            for profile in self._profiles:
+                profile.samples += 1
+                profile.stacks.update(stacks)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+
+            self.sample()
+            self._wakeup.wait(self.interval)
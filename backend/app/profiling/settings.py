@@ -0,0 +1,22 @@
+""" Variables defined by the environment for request profiling """
+
+import os
+
+
+# Profiling starts switched off; it is turned on at runtime through
+# PUT /admin/profiling or SIGUSR2 (which toggles it in the receiving worker).
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+# Fraction of requests profiled whatever their duration.
+PROFILING_SAMPLE_RATE = min(
+    max(float(os.environ.get("PROFILING_SAMPLE_RATE", "0.01")), 0.0), 1.0
+)
+# Requests slower than this are profiled too, 0 disables the threshold.
+PROFILING_SLOW_SECONDS = float(os.environ.get("PROFILING_SLOW_SECONDS", "1"))
+PROFILING_INTERVAL_SECONDS = float(
+    os.environ.get("PROFILING_INTERVAL_SECONDS", "0.005")
+)
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "50"))
+# Token expected in the X-Admin-Token header of /admin/profiling, which is
+# not served at all while it is empty.
+PROFILING_ADMIN_TOKEN = os.environ.get("PROFILING_ADMIN_TOKEN", "")
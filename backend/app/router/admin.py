@@ -0,0 +1,79 @@
+"""
+Operational endpoints, left out of the OpenAPI schema.
+
+``/admin/profiling`` reads and changes the request profiling switch of the
+worker serving the call. The endpoints are only served when
+``PROFILING_ADMIN_TOKEN`` is set, and require it in the ``X-Admin-Token``
+header.
+"""
+
+from dataclasses import asdict
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from pydantic import BaseModel, Field
+
+from app.profiling import profiler
+from app.profiling.settings import PROFILING_ADMIN_TOKEN
+from app.router.response import ModelResponse
+
+
+def require_admin_token(x_admin_token: str | None = Header(default=None)):
+    if not PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token.encode(), PROFILING_ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token"
+        )
+
+
+router = APIRouter(
+    prefix="/admin",
+    include_in_schema=False,
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+class ProfilingUpdate(BaseModel):
+    """Fields left out keep their current value."""
+
+    enabled: bool | None = None
+    sample_rate: float | None = Field(default=None, ge=0, le=1)
+    slow_seconds: float | None = Field(default=None, ge=0)
+
+
+@router.get("/profiling")
+async def get_profiling() -> ModelResponse:
+    """
+    Reports the profiling settings of this worker.
+
+    Returns:
+        ModelResponse: enabled, sample_rate and slow_seconds.
+    """
+
+    return ModelResponse(
+        {
+            "status": 200,
+            "message": "Profiling settings",
+            "data": asdict(profiler.state),
+        }
+    )
+
+
+@router.put("/profiling")
+async def update_profiling(update: ProfilingUpdate) -> ModelResponse:
+    """
+    Switches profiling on or off and tunes which requests are profiled.
+
+    Returns:
+        ModelResponse: the settings now in use.
+    """
+
+    state = profiler.configure(**update.model_dump())
+
+    return ModelResponse(
+        {"status": 200, "message": "Profiling updated", "data": asdict(state)}
+    )
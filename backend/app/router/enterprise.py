@@ -1,14 +1,16 @@
 """Routes to manage enterprise resources, workers and roles."""
 
-import json
+import logging
 from typing import Any, Callable, Coroutine
 
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, selectinload
+from sqlmodel import select
 
 from app.auth.data_hash import get_hashed_data
 from app.db.conn import get_db
-from app.middlewares.auth import authenticate_user, authorize_user
+from app.middlewares.auth import authenticate_user, require_policy
+from app.middlewares.db_session import get_read_db, get_write_db
 from app.middlewares.send_message import get_async_message_sender_on_loop
 from app.models.enterprise import (
     BaseEnterprise,
@@ -20,7 +22,14 @@ from app.models.enterprise import (
 )
 from app.models.role import DefaultRole, DefaultRoleSchema, Role, RoleRelation
 from app.models.scope import DefaultScope, DefaultScopeSchema, Scope, ScopeRelation
-from app.models.user import FirstUserCreate, User, UserRead, UserResponse
+from app.models.user import (
+    FirstUserCreate,
+    User,
+    UserMember,
+    UserRead,
+    UserResponse,
+)
+from app.router.response import ModelResponse
 from app.router.utils import (
     EnterpriseCreateEvent,
     EnterpriseDeleteEvent,
@@ -30,6 +39,8 @@ from app.router.utils import (
     UserCreateEvent,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/enterprise", tags=["Enterprise"])
 
 
@@ -101,7 +112,7 @@ async def create_enterprise(
     send_message: Callable[[str], Coroutine[Any, Any, None]] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Create a new enterprise.
 
@@ -160,7 +171,9 @@ async def create_enterprise(
             scope=ScopeRelation(**new_user.scope.model_dump()),
         )
 
-        print(f"Signup User: {user_read.model_dump_json()}")
+        logger.info(
+            "Enterprise %s created with owner %s", new_enterprise.id, user_read.id
+        )
 
         await send_message(
             EnterpriseCreateEvent(
@@ -174,18 +187,20 @@ async def create_enterprise(
 
         await send_message(UserCreateEvent(data=user_read).model_dump_json())
 
-        return UserResponse(
-            status=200,
-            message="Enterprise created",
-            data=user_read,
+        return ModelResponse(
+            UserResponse(
+                status=200,
+                message="Enterprise created",
+                data=user_read,
+            )
         )
 
 
 @router.get("/", response_model=EnterpriseResponse)
 def get_enterprise(
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_read_db),
     identified_user: UserRead = Depends(authenticate_user),
-) -> EnterpriseResponse:
+) -> ModelResponse:
     """
     Get your enterprise
 
@@ -205,18 +220,20 @@ def get_enterprise(
         if enterprise is None:
             raise HTTPException(status_code=404, detail="Enterprise not found")
 
-        return EnterpriseResponse(
-            status=200,
-            message="Enterprise retrieved",
-            data=enterprise,
+        return ModelResponse(
+            EnterpriseResponse(
+                status=200,
+                message="Enterprise retrieved",
+                data=enterprise,
+            )
         )
 
 
-@router.get("/full")
+@router.get("/full", dependencies=[Depends(require_policy("enterprise.read_full"))])
 def get_full_enterprise(
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_read_db),
     identified_user: UserRead = Depends(authenticate_user),
-) -> Response:
+) -> ModelResponse:
     """
     Get the full enterprise model if the user is an owner or manager.
 
@@ -231,16 +248,16 @@ def get_full_enterprise(
     if identified_user is None:
         raise HTTPException(status_code=403, detail="Unauthorized user")
 
-    authorize_user(
-        user=identified_user,
-        operation_scopes=[DefaultScope.ALL.value, DefaultScope.HUMAN_RESOURCE.value],
-        operation_hierarchy_order=(
-            DefaultRole.get_default_hierarchy(DefaultRole.COLLABORATOR.value)
-        ),
-    )
-
     with db_session as session:
-        enterprise = session.get(Enterprise, identified_user.enterprise_id)
+        enterprise = session.scalars(
+            select(Enterprise)
+            .where(Enterprise.id == identified_user.enterprise_id)
+            .options(
+                selectinload(Enterprise.users),
+                selectinload(Enterprise.roles),
+                selectinload(Enterprise.scopes),
+            )
+        ).first()
 
         if (
             enterprise is None
@@ -250,50 +267,35 @@ def get_full_enterprise(
         ):
             raise HTTPException(status_code=404, detail="Enterprise not found")
 
-        resp = {
-            "status": 200,
-            "message": "Enterprise retrieved",
-            "data": {
-                "users": list(
-                    map(
-                        lambda user: json.loads(user.model_dump_json()),
-                        enterprise.users,
-                    )
-                ),
-                "roles": list(
-                    map(
-                        lambda role: json.loads(role.model_dump_json()),
-                        enterprise.roles,
-                    )
-                ),
-                "scopes": list(
-                    map(
-                        lambda scope: json.loads(scope.model_dump_json()),
-                        enterprise.scopes,
-                    )
-                ),
-                **enterprise.model_dump(),
-            },
-        }
-
-        print("Enterprise Full:", str(resp))
-
-        return Response(
-            status_code=200,
-            media_type="application/json",
-            content=json.dumps(resp),
+        return ModelResponse(
+            {
+                "status": 200,
+                "message": "Enterprise retrieved",
+                "data": {
+                    "users": [
+                        UserMember.model_validate(user) for user in enterprise.users
+                    ],
+                    "roles": enterprise.roles,
+                    "scopes": enterprise.scopes,
+                    **enterprise.model_dump(),
+                },
+            }
         )
 
 
-@router.put("/", response_model=EnterpriseResponse)
+@router.put(
+    "/",
+    response_model=EnterpriseResponse,
+    dependencies=[Depends(require_policy("enterprise.update"))],
+)
 async def update_enterprise(
     enterprise: EnterpriseUpdate,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     identified_user: UserRead = Depends(authenticate_user),
     send_message: Callable[[str], Coroutine[Any, Any, None]] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> EnterpriseResponse:
+) -> ModelResponse:
     """
     Update an enterprise.
 
@@ -308,14 +310,6 @@ async def update_enterprise(
     if identified_user is None:
         raise HTTPException(status_code=403, detail="Unauthorized user")
 
-    authorize_user(
-        user=identified_user,
-        operation_scopes=[DefaultScope.ALL.value],
-        operation_hierarchy_order=(
-            DefaultRole.get_default_hierarchy(DefaultRole.OWNER.value)
-        ),
-    )
-
     with db_session as session:
         db_enterprise = session.get(Enterprise, identified_user.enterprise_id)
 
@@ -342,12 +336,14 @@ async def update_enterprise(
                 ).model_dump_json(exclude_unset=True, exclude_none=True)
             )
 
-            return EnterpriseResponse(
-                status=200,
-                message="Enterprise updated",
-                data=EnterpriseRelation(
-                    **db_enterprise.model_dump(),
-                ),
+            return ModelResponse(
+                EnterpriseResponse(
+                    status=200,
+                    message="Enterprise updated",
+                    data=EnterpriseRelation(
+                        **db_enterprise.model_dump(),
+                    ),
+                )
             )
 
         raise HTTPException(
@@ -355,14 +351,14 @@ async def update_enterprise(
         )
 
 
-@router.delete("/")
+@router.delete("/", dependencies=[Depends(require_policy("enterprise.delete"))])
 async def delete_enterprise(
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     identified_user: UserRead = Depends(authenticate_user),
     send_message: Callable[[str], Coroutine[Any, Any, None]] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> Response:
+) -> ModelResponse:
     """
     Delete an enterprise.
 
@@ -376,16 +372,18 @@ async def delete_enterprise(
     if identified_user is None:
         raise HTTPException(status_code=403, detail="Unauthorized user")
 
-    authorize_user(
-        user=identified_user,
-        operation_scopes=[DefaultScope.ALL.value],
-        operation_hierarchy_order=(
-            DefaultRole.get_default_hierarchy(DefaultRole.OWNER.value)
-        ),
-    )
-
     with db_session as session:
-        db_enterprise = session.get(Enterprise, identified_user.enterprise_id)
+        # Load what the delete cascades through up front, instead of one
+        # query per role and scope.
+        db_enterprise = session.scalars(
+            select(Enterprise)
+            .where(Enterprise.id == identified_user.enterprise_id)
+            .options(
+                selectinload(Enterprise.users),
+                selectinload(Enterprise.roles).selectinload(Role.users),
+                selectinload(Enterprise.scopes).selectinload(Scope.users),
+            )
+        ).first()
 
         if db_enterprise is None:
             raise HTTPException(status_code=404, detail="Enterprise not found")
@@ -406,8 +404,4 @@ async def delete_enterprise(
             ).model_dump_json()
         )
 
-        return Response(
-            status_code=200,
-            media_type="application/json",
-            content=json.dumps({"message": "Enterprise deleted", "status": 200}),
-        )
+        return ModelResponse({"message": "Enterprise deleted", "status": 200})
@@ -0,0 +1,44 @@
+"""
+JWKS endpoint.
+
+``GET /.well-known/jwks.json`` serves the public keys tokens are verified
+with (``app.auth.jwks``). The document only changes with a deploy, so it is
+built once and may be cached by the verifiers for ``JWKS_MAX_AGE`` seconds
+and revalidated with its ETag.
+"""
+
+from fastapi import APIRouter, Header, Response, status
+
+from app.auth.jwks import get_signing_keys
+from app.auth.settings import JWKS_MAX_AGE
+
+router = APIRouter(tags=["Auth"])
+
+CACHE_CONTROL = (
+    f"public, max-age={JWKS_MAX_AGE}, "
+    f"stale-while-revalidate={JWKS_MAX_AGE}, stale-if-error={JWKS_MAX_AGE * 24}"
+)
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(if_none_match: str | None = Header(default=None)) -> Response:
+    """
+    Publishes the token verification keys.
+
+    Returns:
+        Response: The JWK set, or 304 when the client has it.
+    """
+
+    signing_keys = get_signing_keys()
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": signing_keys.etag}
+
+    if if_none_match is not None and signing_keys.etag in (
+        tag.strip() for tag in if_none_match.split(",")
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=signing_keys.document,
+        media_type="application/jwk-set+json",
+        headers=headers,
+    )
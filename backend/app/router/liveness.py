@@ -4,7 +4,13 @@ FastAPI router for handling User operations.
 This module contains endpoints for creating, retrieving, updating, and deleting users.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, status
+
+from app.db.conn import get_engine, replica_router
+from app.db.pool import get_pool_status
+from app.health import Readiness
+
+from .response import ModelResponse
 
 router = APIRouter(prefix="/check")
 
@@ -12,10 +18,55 @@ router = APIRouter(prefix="/check")
 @router.get("/")
 async def liveness():
     """
-    Checks liveness
+    Checks liveness: the worker answers. Dependencies are left to ``/ready``,
+    so an outage of the database does not restart every pod.
 
     Returns:
         dict: Successful or Unsuccessful message.
     """
 
     return {"message": "Success"}
+
+
+@router.get("/ready")
+async def readiness(request: Request) -> ModelResponse:
+    """
+    Checks readiness: the database answers, the pool and the worker are not
+    saturated and the broker consumer and publisher are up. The result is
+    cached for READY_CACHE_SECONDS.
+
+    Returns:
+        ModelResponse: The result of each check, with 503 when one failed.
+    """
+
+    checker: Readiness = request.app.state.readiness
+    ready, checks = await checker.check()
+
+    return ModelResponse(
+        {"ready": ready, "checks": checks},
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
+
+
+@router.get("/pool")
+async def pool_status():
+    """
+    Reports the database connection pool occupancy and checkout waits
+    for this worker, for the primary and each read replica.
+
+    Returns:
+        dict: Pool size, connections in use, utilization and wait statistics.
+    """
+
+    return {
+        **get_pool_status(get_engine().pool),
+        "replicas": [
+            {
+                "healthy": replica_router.is_healthy(replica),
+                **get_pool_status(replica.pool),
+            }
+            for replica in replica_router.replicas
+        ],
+    }
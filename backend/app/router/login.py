@@ -1,61 +1,235 @@
 """
 Login route for the OPENFerp Enterprise access. It generates 
 a JWT token for the user to access the API.
+
+Logins also return a refresh token, exchanged at ``/auth/refresh`` for new
+tokens without verifying the password again (``app.auth.refresh_token``).
+``/auth/logout`` revokes them (``app.auth.revocation``).
+
+A password hash made with an outdated scheme or cost is rewritten after the
+response is sent (``rehash_password``), so changing the hashing settings
+needs no migration.
 """
 
 import json
+import logging
+from math import ceil
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    status,
+)
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import Connection, Engine, update
 from sqlmodel import SQLModel, Session, select
 
-from app.auth.data_hash import validate_hashed_data
-from app.auth.jwt_utils import create_jwt_token
+from app.auth.data_hash import (
+    dummy_validate,
+    get_hashed_data,
+    needs_rehash,
+    validate_hashed_data,
+)
+from app.auth.email_filter import known_emails
+from app.auth.jwt_utils import create_jwt_token, decode_jwt_token
+from app.auth.rate_limit import LoginRateLimiter, client_address, get_login_limiter
+from app.auth.refresh_token import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from app.auth.revocation import revoke_token, revoke_user_tokens
 from app.db.conn import get_db
+from app.middlewares.auth import authenticate_user, oauth2_scheme
 from app.models.user import User, UserRead
 
 
 class Token(SQLModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshRequest(SQLModel):
+    refresh_token: str
+
+
+class LogoutRequest(SQLModel):
+    refresh_token: str | None = None
+    everywhere: bool = False
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
+def create_access_token(user: User) -> str:
+    return create_jwt_token(
+        json.loads(
+            UserRead(
+                **user.model_dump(),
+                enterprise=user.enterprise,
+                scope=user.scope,
+                role=user.role,
+            ).model_dump_json(exclude_none=True, exclude_unset=True)
+        ),
+        claims={"ver": user.token_version},
+    )
+
+
+def rehash_password(
+    bind: Engine | Connection, user_id: int, old_hash: str, password: str
+):
+    """Stores a new hash of ``password`` unless the hash changed meanwhile."""
+
+    with Session(bind) as session:
+        session.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)  # type: ignore
+            .values(hashed_password=get_hashed_data(password))
+        )
+        session.commit()
+
+    logger.info("Rehashed the password of user %s", user_id)
+
+
+# A plain function: FastAPI runs it in the threadpool, so the password verify
+# (100 ms and more of bcrypt) does not block the event loop.
 @router.post("/login", response_model=Token)
-async def login_for_access_token(
-    login_req: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+def login_for_access_token(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    login_req: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    limiter: LoginRateLimiter = Depends(get_login_limiter),
 ):
+    retry_after = limiter.attempt(
+        client_address(
+            request.client.host if request.client else None,
+            request.headers.get("x-forwarded-for"),
+        ),
+        login_req.username,
+    )
+
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(ceil(retry_after))},
+        )
 
     with db as session:
-        user = session.exec(
-            select(User).where(User.email == login_req.username)
-        ).first()
+        user = None
+
+        if known_emails.might_exist(login_req.username):
+            user = session.exec(
+                select(User).where(User.email == login_req.username)
+            ).first()
 
-        if not user:
+        # Unknown emails verify against a dummy hash: same time, same answer.
+        validated_pass = (
+            validate_hashed_data(login_req.password, user.hashed_password)
+            if user
+            else dummy_validate(login_req.password)
+        )
+
+        if not user or not validated_pass:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+                status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
             )
 
-        validated_pass = validate_hashed_data(login_req.password, user.hashed_password)
+        limiter.succeeded(login_req.username)
+
+        if needs_rehash(user.hashed_password):
+            background_tasks.add_task(
+                rehash_password,
+                session.get_bind(),
+                user.id,
+                user.hashed_password,
+                login_req.password,
+            )
+
+        access_token = create_access_token(user)
+        refresh_token = issue_refresh_token(session, user.id)  # type: ignore
+        session.commit()
+
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "refresh_token": refresh_token,
+        }
+
 
-        if not validated_pass:
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_req: RefreshRequest, db: Session = Depends(get_db)
+):
+    """
+    Exchanges a refresh token for a new access token and the next refresh
+    token. A refresh token works once; presenting it again revokes every
+    token rotated from the same login.
+    """
+
+    with db as session:
+        try:
+            user_id, refresh_token = rotate_refresh_token(
+                session, refresh_req.refresh_token
+            )
+        except RefreshTokenError as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect username or password",
-            )
+                detail="Invalid refresh token",
+            ) from e
 
-        access_token = create_jwt_token(
-            json.loads(
-                UserRead(
-                    **user.model_dump(),
-                    enterprise=user.enterprise,
-                    scope=user.scope,
-                    role=user.role
-                ).model_dump_json(exclude_none=True, exclude_unset=True)
+        user = session.exec(User.with_relations().where(User.id == user_id)).first()
+
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
             )
-        )
 
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {
+            "access_token": create_access_token(user),
+            "token_type": "bearer",
+            "refresh_token": refresh_token,
+        }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_req: LogoutRequest | None = None,
+    token: str = Depends(oauth2_scheme),
+    identified_user: UserRead = Depends(authenticate_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Revokes the access token of the request and, if given, the refresh token
+    rotated from the same login. With ``everywhere`` every token the user was
+    issued so far is revoked.
+    """
+
+    logout_req = logout_req or LogoutRequest()
+    claims = decode_jwt_token(token) or {}
+
+    with db as session:
+        if claims.get("jti"):
+            revoke_token(session, claims["jti"], int(claims["exp"]))
+
+        if logout_req.refresh_token:
+            revoke_refresh_token(session, logout_req.refresh_token, identified_user.id)
+
+        if logout_req.everywhere:
+            user = session.get(User, identified_user.id)
+
+            if user is not None:
+                revoke_user_tokens(user)
+                session.add(user)
+
+        session.commit()
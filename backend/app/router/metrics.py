@@ -0,0 +1,38 @@
+"""
+Prometheus scrape endpoint.
+
+``GET /metrics`` serves the request, SQL, pool, password hashing, JWT and
+broker metrics in the Prometheus text format.
+"""
+
+from fastapi import APIRouter, Response
+
+from app.db.conn import get_engine, replica_router
+from app.metrics import register_collector, render_metrics
+from app.metrics.collectors import PoolCollector
+
+router = APIRouter(tags=["Metrics"])
+
+
+def get_pools():
+    yield "primary", get_engine().pool
+
+    for index, replica in enumerate(replica_router.replicas):
+        yield f"replica{index}", replica.pool
+
+
+register_collector(PoolCollector(get_pools))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Exposes the metrics of the service.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+
+    payload, content_type = render_metrics()
+
+    return Response(content=payload, media_type=content_type)
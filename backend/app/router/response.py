@@ -0,0 +1,21 @@
+"""
+JSON response class shared by every router.
+
+``ModelResponse`` renders its content with pydantic-core's serializer, which
+writes models, lists and dicts straight to JSON bytes. When a handler returns
+a ``ModelResponse`` FastAPI sends it as is: the declared ``response_model`` is
+still used for the OpenAPI schema, but the model built by the handler is not
+validated and encoded a second time.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ModelResponse(JSONResponse):
+    """JSON response for pydantic/SQLModel models and plain JSON data."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
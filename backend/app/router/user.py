@@ -6,19 +6,23 @@ This module contains endpoints for creating, retrieving, updating, and deleting
 
 from collections.abc import Callable, Coroutine
 from datetime import datetime
-import json
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, col, or_, select
 from sqlmodel.sql.expression import SelectOfScalar
 
 from app.auth.data_hash import get_hashed_data
-from app.db.conn import get_db
-from app.middlewares.auth import authenticate_user, authorize_user
+from app.middlewares.auth import (
+    authenticate_user,
+    authorize_target,
+    require_policy,
+)
+from app.middlewares.db_session import get_read_db, get_write_db
 from app.middlewares.send_message import get_async_message_sender_on_loop
 from app.models.enterprise import EnterpriseRelation
-from app.models.role import BaseRole, DefaultRole, Role, RoleRelation
-from app.models.scope import BaseScope, DefaultScope, Scope, ScopeRelation
+from app.models.role import BaseRole, Role, RoleRelation
+from app.models.scope import BaseScope, Scope, ScopeRelation
 from app.models.user import (
     User,
     UserCreate,
@@ -29,6 +33,7 @@ from app.models.user import (
     UserUpdateMe,
 )
 
+from .response import ModelResponse
 from .utils import (
     UserCreateEvent,
     UserDeleteEvent,
@@ -38,6 +43,8 @@ from .utils import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/users")
 
 
@@ -101,12 +108,12 @@ def __query_scope_role_by_name(
 @router.post("/", response_model=UserResponse, status_code=201)
 async def create_user(
     user: UserCreate,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     identified_user: UserRead = Depends(authenticate_user),
     send_message: Callable[[str], Coroutine] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Create a new user.
 
@@ -134,10 +141,8 @@ async def create_user(
                 detail="Invalid Scope or Role for the Enterprise",
             )
 
-        authorized_user = authorize_user(
-            user=identified_user,
-            operation_scopes=[scope.name],
-            operation_hierarchy_order=role.hierarchy,
+        authorized_user = authorize_target(
+            "user.create", identified_user, role.hierarchy, scope.name
         )
         if authorized_user is not None:
             try:
@@ -159,12 +164,11 @@ async def create_user(
                 if not db_user.role or not db_user.scope or not db_user.enterprise:
                     raise HTTPException(status_code=500, detail="User creation failed")
 
-                print(
-                    "User created: ",
-                    db_user.username,
+                logger.info(
+                    "User %s created with role %s and scope %s",
+                    db_user.id,
                     db_user.role.name,
                     db_user.scope.name,
-                    db_user.enterprise.name,
                 )
 
                 role = RoleRelation(**db_user.role.model_dump())
@@ -184,14 +188,17 @@ async def create_user(
                     ).model_dump_json()
                 )
 
-                return UserResponse(
-                    status=201,
-                    message="User created",
-                    data=user_read,
+                return ModelResponse(
+                    UserResponse(
+                        status=201,
+                        message="User created",
+                        data=user_read,
+                    ),
+                    status_code=201,
                 )
 
             except Exception as exc:
-                print(exc)
+                logger.exception("User creation failed")
                 raise HTTPException(status_code=500, detail="Unknown error") from exc
 
         else:
@@ -201,7 +208,7 @@ async def create_user(
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     current_user: UserRead = Depends(authenticate_user),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Get the current authenticated user.
 
@@ -218,10 +225,12 @@ async def get_current_user(
             detail="User not found during authentication",
         )
 
-    return UserResponse(
-        status=200,
-        message="Current user retrieved",
-        data=current_user,
+    return ModelResponse(
+        UserResponse(
+            status=200,
+            message="Current user retrieved",
+            data=current_user,
+        )
     )
 
 
@@ -229,11 +238,11 @@ async def get_current_user(
 async def update_current_user(
     user: UserUpdateMe,
     current_user: UserRead = Depends(authenticate_user),
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     send_message: Callable[[str], Coroutine] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Update the current authenticated user.
 
@@ -248,7 +257,7 @@ async def update_current_user(
 
     if current_user is not None:
         with db_session as session:
-            print("User identified for UPDATE: ", current_user.id)
+            logger.debug("Updating current user %s", current_user.id)
 
             from_db = session.get(User, current_user.id)
 
@@ -305,25 +314,18 @@ async def update_current_user(
                     ).model_dump_json()
                 )
 
-            return resp
+            return ModelResponse(resp)
     else:
-        print(
-            f'User not found None={
-                current_user is None
-                } ID={
-                    current_user.id if current_user.id is not None else ""
-                }',
-            current_user,
-        )
+        logger.info("Current user not found during update")
         raise HTTPException(status_code=404, detail="User not found")
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_read_db),
     identified_user: UserRead = Depends(authenticate_user),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Get a user by their ID.
 
@@ -339,7 +341,7 @@ async def get_user(
 
     with db_session as session:
         user = session.exec(
-            select(User)
+            User.with_relations()
             .where(col(User.id) == user_id)
             .where(col(User.enterprise_id) == identified_user.enterprise_id)
         ).first()
@@ -350,26 +352,30 @@ async def get_user(
         if not user.role or not user.scope or not user.enterprise:
             raise HTTPException(status_code=500, detail="User creation failed")
 
-        authorize_user(
-            user=identified_user,
-            operation_scopes=[user.scope.name],
-            operation_hierarchy_order=user.role.hierarchy,
+        authorize_target(
+            "user.read", identified_user, user.role.hierarchy, user.scope.name
         )
 
         role = RoleRelation(**user.role.model_dump())
         scope = ScopeRelation(**user.scope.model_dump())
         enterprise = EnterpriseRelation(**user.enterprise.model_dump())
 
-    return UserResponse(
-        status=200,
-        message="User retrieved",
-        data=UserRead(
-            **user.model_dump(), role=role, scope=scope, enterprise=enterprise
-        ),
+    return ModelResponse(
+        UserResponse(
+            status=200,
+            message="User retrieved",
+            data=UserRead(
+                **user.model_dump(), role=role, scope=scope, enterprise=enterprise
+            ),
+        )
     )
 
 
-@router.get("/", response_model=UserListResponse)
+@router.get(
+    "/",
+    response_model=UserListResponse,
+    dependencies=[Depends(require_policy("user.list"))],
+)
 async def get_all_users(
     scope_names: str | None = None,
     scope_ids: str | None = None,
@@ -377,9 +383,9 @@ async def get_all_users(
     usernames: str | None = None,
     role_ids: str | None = None,
     emails: str | None = None,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_read_db),
     identified_user: UserRead = Depends(authenticate_user),
-) -> UserListResponse:
+) -> ModelResponse:
     # pylint: disable=too-many-statements,too-many-arguments,too-many-branches,too-many-locals
 
     """
@@ -437,8 +443,7 @@ async def get_all_users(
         query = id_user.get_all()
 
         if roles or scopes:
-            print("Scopes to search", scopes)
-            print("Roles to search", roles)
+            logger.debug("Filtering users by scopes %s and roles %s", scopes, roles)
             res = session.exec(
                 identified_user.query_scopes_roles(
                     list(map(lambda x: x.id, roles if roles else [])),
@@ -447,7 +452,6 @@ async def get_all_users(
             ).all()
 
             if res is None or len(res) < 0:
-                print(f"Scopes and roles filter {res}")
                 raise HTTPException(
                     status_code=404,
                     detail="Roles and Scopes not found for this enterprise",
@@ -497,17 +501,6 @@ async def get_all_users(
         if users is None:
             raise HTTPException(status_code=404, detail="Users not found")
 
-        authorized_user = authorize_user(
-            user=identified_user,
-            operation_scopes=[DefaultScope.ALL.value],
-            operation_hierarchy_order=(
-                DefaultRole.get_default_hierarchy(DefaultRole.OWNER.value)
-            ),
-        )
-
-        if authorized_user is None:
-            raise HTTPException(status_code=403, detail="Unauthorized user")
-
         user_list: list[UserRead] = []
 
         for user in users:
@@ -524,10 +517,12 @@ async def get_all_users(
                 )
             )
 
-        return UserListResponse(
-            status=200,
-            message="Users retrieved",
-            data=user_list,
+        return ModelResponse(
+            UserListResponse(
+                status=200,
+                message="Users retrieved",
+                data=user_list,
+            )
         )
 
 
@@ -535,12 +530,12 @@ async def get_all_users(
 async def update_user(
     user_id: int,
     user: UserUpdate,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     identified_user: UserRead = Depends(authenticate_user),
     send_message: Callable[[str], Coroutine] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> UserResponse:
+) -> ModelResponse:
     """
     Update a user.
 
@@ -604,20 +599,8 @@ async def update_user(
         if identified_user.scope is None or identified_user.role is None:
             raise HTTPException(status_code=403, detail="Unauthorized user")
 
-        authorize_user(
-            user=identified_user,
-            operation_scopes=[db_user.scope.name],
-            operation_hierarchy_order=max(
-                DefaultRole.get_default_hierarchy(DefaultRole.MANAGER.value),
-                db_user.role.hierarchy
-            ),
-            custom_checks=(
-                identified_user.scope.name == DefaultScope.ALL.value
-                or (
-                    db_user.scope.name == identified_user.scope.name
-                    or (scope.name == identified_user.scope.name if scope else False)
-                )
-            ),
+        authorize_target(
+            "user.update", identified_user, db_user.role.hierarchy, db_user.scope.name
         )
 
         if role:
@@ -678,22 +661,24 @@ async def update_user(
                 ).model_dump_json()
             )
 
-        return UserResponse(
-            status=200,
-            message="User updated",
-            data=user_read,
+        return ModelResponse(
+            UserResponse(
+                status=200,
+                message="User updated",
+                data=user_read,
+            )
         )
 
 
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: int,
-    db_session: Session = Depends(get_db),
+    db_session: Session = Depends(get_write_db),
     identified_user: UserRead = Depends(authenticate_user),
     send_message: Callable[[str], Coroutine] = Depends(
         get_async_message_sender_on_loop
     ),
-) -> Response:
+) -> ModelResponse:
     """
     Delete a user.
 
@@ -720,10 +705,8 @@ async def delete_user(
         if db_user.enterprise is None or db_user.scope is None or db_user.role is None:
             raise HTTPException(status_code=500, detail="User creation failed")
 
-        authorize_user(
-            user=identified_user,
-            operation_scopes=[db_user.scope.name],
-            operation_hierarchy_order=db_user.role.hierarchy,
+        authorize_target(
+            "user.delete", identified_user, db_user.role.hierarchy, db_user.scope.name
         )
 
         session.delete(db_user)
@@ -741,8 +724,4 @@ async def delete_user(
             ).model_dump_json()
         )
 
-    return Response(
-        status_code=200,
-        content=json.dumps({"status": 200, "message": "User deleted"}),
-        media_type="application/json",
-    )
+    return ModelResponse({"status": 200, "message": "User deleted"})
@@ -0,0 +1,186 @@
+"""
+Production launcher.
+
+    python -m app.server
+
+Runs the API under gunicorn with uvicorn workers (uvloop and httptools), and
+no reloader. Unless ``WEB_CONCURRENCY`` is set, the worker count follows the
+CPU quota of the container's cgroup (falling back to the CPUs the process may
+run on), times ``WEB_WORKERS_PER_CPU``, so throughput scales with the pod's
+CPU limit. Workers are recycled after ``WEB_MAX_REQUESTS`` requests (plus a
+random jitter, so they do not restart together) and get
+``WEB_GRACEFUL_TIMEOUT`` seconds to finish their requests on shutdown. The
+worker count is exported as ``WEB_CONCURRENCY`` before the workers fork, so
+they split the pod's connection budget (``DB_POD_MAX_CONNECTIONS``) by it.
+
+With more than one worker, ``PROMETHEUS_MULTIPROC_DIR`` is pointed at a fresh
+directory when not set, so ``/metrics`` aggregates every worker. Each worker
+runs the broker consumer, or only the elected one (``BROKER_CONSUMER_MODE``).
+"""
+
+import math
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+
+BIND = os.environ.get("WEB_BIND", "0.0.0.0:80")
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "0"))
+WORKERS_PER_CPU = float(os.environ.get("WEB_WORKERS_PER_CPU", "1"))
+MAX_WORKERS = int(os.environ.get("WEB_MAX_WORKERS", "16"))
+# Above the idle timeout of the proxies in front, so they close first.
+KEEPALIVE = int(os.environ.get("WEB_KEEPALIVE", "75"))
+TIMEOUT = int(os.environ.get("WEB_TIMEOUT", "60"))
+GRACEFUL_TIMEOUT = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+MAX_REQUESTS = int(os.environ.get("WEB_MAX_REQUESTS", "10000"))
+MAX_REQUESTS_JITTER = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", "1000"))
+BACKLOG = int(os.environ.get("WEB_BACKLOG", "2048"))
+FORWARDED_ALLOW_IPS = os.environ.get("WEB_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def cpu_quota(cgroup_root: Path = CGROUP_ROOT) -> float | None:
+    """CPUs allowed by the cgroup (v2 ``cpu.max`` or v1 CFS quota), None if unlimited."""
+
+    cpu_max = _read(cgroup_root / "cpu.max")
+
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        if quota == "max" or not period:
+            return None
+        return int(quota) / int(period)
+
+    quota = _read(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+    period = _read(cgroup_root / "cpu" / "cpu.cfs_period_us")
+
+    if quota is None or period is None or int(quota) <= 0:
+        return None
+
+    return int(quota) / int(period)
+
+
+def available_cpus(cgroup_root: Path = CGROUP_ROOT) -> float:
+    quota = cpu_quota(cgroup_root)
+
+    if quota is not None:
+        return quota
+
+    try:
+        return float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return float(os.cpu_count() or 1)
+
+
+def worker_count(
+    cpus: float,
+    per_cpu: float = WORKERS_PER_CPU,
+    maximum: int = MAX_WORKERS,
+    override: int = WEB_CONCURRENCY,
+) -> int:
+    if override > 0:
+        return override
+
+    return max(1, min(maximum, math.ceil(cpus * per_cpu)))
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker on uvloop/httptools that lets requests finish on shutdown."""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "timeout_graceful_shutdown": GRACEFUL_TIMEOUT,
+    }
+
+
+def child_exit(_server, worker):
+    """Drops the metrics of a dead worker from the multiprocess directory."""
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # pylint: disable=import-outside-toplevel
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def prepare_metrics_dir(workers: int):
+    """Uses an empty multiprocess directory for the metrics of the workers."""
+
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+    if directory is None:
+        if workers <= 1:
+            return
+        directory = tempfile.mkdtemp(prefix="rh-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def export_worker_count(workers: int):
+    """Sets ``WEB_CONCURRENCY``, read by the workers' settings when they start."""
+
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+
+def get_config(cpus: float | None = None) -> dict[str, Any]:
+    workers = worker_count(available_cpus() if cpus is None else cpus)
+
+    return {
+        "bind": BIND,
+        "workers": workers,
+        "worker_class": "app.server.Worker",
+        "keepalive": KEEPALIVE,
+        "timeout": TIMEOUT,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS_JITTER,
+        "backlog": BACKLOG,
+        "forwarded_allow_ips": FORWARDED_ALLOW_IPS,
+        "child_exit": child_exit,
+        "accesslog": None,
+    }
+
+
+class Server(BaseApplication):
+    # pylint: disable=abstract-method
+
+    def __init__(self, options: dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # pylint: disable=import-outside-toplevel
+        from app.main import create_app
+
+        return create_app()
+
+
+def main():
+    config = get_config()
+    export_worker_count(config["workers"])
+    prepare_metrics_dir(config["workers"])
+    Server(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""OpenTelemetry tracing: setup, tracer and context propagation helpers."""
+
+from . import db, settings
+from .setup import (
+    configure_tracing,
+    extract_context,
+    inject_context,
+    is_tracing_enabled,
+    shutdown_tracing,
+    tracer,
+)
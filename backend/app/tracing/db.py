@@ -0,0 +1,54 @@
+"""
+SQL statement spans.
+
+Every statement executed by any engine gets a client span, child of the
+request or event span being processed. Nothing is done while tracing is off.
+"""
+
+from opentelemetry import trace
+from sqlalchemy import Engine, event
+
+from app.metrics.db import statement_operation
+
+from .setup import is_tracing_enabled, tracer
+
+
+_SPANS_KEY = "rh_query_spans"
+
+# Statements are recorded as sent, with placeholders instead of values.
+MAX_STATEMENT_LENGTH = 2048
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_span(conn, _cursor, statement, _parameters, _context, _executemany):
+    if not is_tracing_enabled():
+        return
+
+    span = tracer.start_span(
+        f"db {statement_operation(statement)}",
+        kind=trace.SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        },
+    )
+    conn.info.setdefault(_SPANS_KEY, []).append(span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_span(conn, _cursor, _statement, _parameters, _context, _executemany):
+    spans = conn.info.get(_SPANS_KEY)
+    if spans:
+        spans.pop().end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_span(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get(_SPANS_KEY) if connection is not None else None
+
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(trace.StatusCode.ERROR)
+        span.end()
@@ -0,0 +1,14 @@
+""" Variables defined by the environment for tracing """
+
+import os
+
+
+# "none" disables tracing, "console" writes spans to stdout, "file" appends
+# them as JSON lines to TRACING_FILE and "otlp" sends them to an OTLP/HTTP
+# collector (needs the opentelemetry-exporter-otlp-proto-http package).
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.environ.get("TRACING_FILE", "traces.jsonl")
+TRACING_SAMPLE_RATIO = min(
+    max(float(os.environ.get("TRACING_SAMPLE_RATIO", "1")), 0.0), 1.0
+)
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "sec-microservice-rh")
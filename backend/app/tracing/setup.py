@@ -0,0 +1,134 @@
+"""
+Tracing setup.
+
+Spans are created with ``tracer`` around the HTTP handlers, SQL statements,
+password hashing, JWT handling and the broker publish/consume paths. Until
+``configure_tracing`` installs an SDK provider (``TRACING_EXPORTER`` other than
+``none``) the OpenTelemetry API hands out non-recording spans, so the
+instrumentation costs next to nothing when tracing is off.
+
+The W3C trace context travels in the HTTP headers and in the AMQP message
+headers (``inject_context``/``extract_context``), so a trace continues from a
+request to the events it publishes and from an incoming event to the queries
+it runs.
+"""
+
+import atexit
+import logging
+from typing import Any, Mapping, MutableMapping
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from . import settings as st
+
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("app")
+
+_provider: TracerProvider | None = None
+
+
+def is_tracing_enabled() -> bool:
+    return _provider is not None
+
+
+def _span_json_line(span: ReadableSpan) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def get_exporter(name: str = st.TRACING_EXPORTER) -> SpanExporter | None:
+    """Builds the exporter selected by ``TRACING_EXPORTER``."""
+
+    if name == "console":
+        return ConsoleSpanExporter(formatter=_span_json_line)
+
+    if name == "file":
+        # pylint: disable=consider-using-with
+        return ConsoleSpanExporter(
+            out=open(st.TRACING_FILE, "a", encoding="utf-8"),
+            formatter=_span_json_line,
+        )
+
+    if name == "otlp":
+        try:
+            # pylint: disable=import-outside-toplevel
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError:
+            logger.warning(
+                "TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http"
+            )
+            return None
+
+        return OTLPSpanExporter()
+
+    return None
+
+
+def configure_tracing(
+    exporter: SpanExporter | None = None,
+    sample_ratio: float = st.TRACING_SAMPLE_RATIO,
+) -> TracerProvider | None:
+    """
+    Installs the global tracer provider when an exporter is configured.
+
+    Returns:
+        TracerProvider | None: the provider, or None when tracing stays off.
+    """
+
+    global _provider  # pylint: disable=global-statement
+
+    if _provider is not None:
+        return _provider
+
+    exporter = exporter or get_exporter()
+
+    if exporter is None:
+        return None
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": st.SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    trace.set_tracer_provider(_provider)
+    atexit.register(shutdown_tracing)
+
+    return _provider
+
+
+def shutdown_tracing():
+    """Exports the pending spans."""
+
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def inject_context(carrier: MutableMapping[str, Any] | None = None) -> dict[str, Any]:
+    """Returns ``carrier`` with the headers of the current trace context."""
+
+    carrier = dict(carrier or {})
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: Mapping[str, Any] | None) -> context.Context:
+    """Returns the trace context carried by message or request headers."""
+
+    return propagate.extract(
+        {
+            key: value.decode() if isinstance(value, bytes) else str(value)
+            for key, value in (carrier or {}).items()
+        }
+    )
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the RH API.
+
+``bench.load`` seeds a database and drives the HTTP endpoints at a fixed
+concurrency, reporting latency percentiles and throughput and failing when
+they regress against a stored baseline. Run from ``backend``:
+
+    python -m bench.load --enterprises 10 --users 50 --concurrency 16
+"""
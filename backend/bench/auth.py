@@ -0,0 +1,233 @@
+"""
+Micro-benchmarks of the authentication primitives.
+
+Times ``get_hashed_data``/``validate_hashed_data`` for several bcrypt costs,
+``create_jwt_token``/``decode_jwt_token`` and ``authenticate_user`` for each
+signing algorithm and key size, the ``UserRead`` construction done from the
+token claims and ``authorize_user``. Every call is timed separately, through
+the same code (and instrumentation) the API runs:
+
+    python -m bench.auth --rounds 10,12 --algorithms HS256,RS256,ES256
+
+The report has the same shape as the ``bench.load`` one, ``rps`` being calls
+per second, so ``--baseline``/``--threshold`` work the same way.
+"""
+
+import argparse
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+import secrets
+import sys
+from time import perf_counter
+from typing import Any
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.auth import data_hash, jwt_utils
+from app.middlewares.auth import authenticate_user, authorize_user
+from app.models.user import UserRead
+
+from .report import add_report_arguments, finish, summarize
+
+
+PASSWORD = "bench-password"
+
+ALGORITHMS = ("HS256", "RS256", "ES256", "EdDSA")
+
+CLAIMS = {
+    "id": 1,
+    "username": "bench",
+    "email": "bench@bench.example.com",
+    "full_name": "Bench User",
+    "created_at": datetime(2024, 1, 1).isoformat(),
+    "enterprise_id": 1,
+    "role": {"id": 1, "name": "Owner", "hierarchy": 1, "enterprise_id": 1},
+    "scope": {"id": 1, "name": "All", "enterprise_id": 1},
+    "enterprise": {
+        "id": 1,
+        "name": "Bench",
+        "accountable_email": "owner@bench.example.com",
+        "activity_type": "Benchmark",
+    },
+}
+
+
+def signing_keys(algorithm: str, rsa_bits: int) -> tuple[Any, Any]:
+    """Returns a fresh (encode, decode) key pair for ``algorithm``."""
+
+    if algorithm == "HS256":
+        secret = secrets.token_urlsafe(32)
+        return secret, secret
+
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=rsa_bits)
+    elif algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported algorithm {algorithm}")
+
+    return key, key.public_key()
+
+
+def measure(call: Callable[[], Any], iterations: int) -> dict[str, Any]:
+    """Runs ``call`` ``iterations`` times (after one warm-up call) and summarizes."""
+
+    call()
+    latencies = []
+
+    start = perf_counter()
+    for _ in range(iterations):
+        began = perf_counter()
+        call()
+        latencies.append(perf_counter() - began)
+
+    return summarize(latencies, 0, perf_counter() - start, digits=6)
+
+
+@contextmanager
+def bcrypt_rounds(rounds: int) -> Iterator[None]:
+    saved = data_hash.passord_hash
+    data_hash.passord_hash = data_hash.build_context(["bcrypt"], bcrypt_rounds=rounds)
+    try:
+        yield
+    finally:
+        data_hash.passord_hash = saved
+
+
+@contextmanager
+def decode_config(config: dict[str, Any]) -> Iterator[None]:
+    """Makes ``authenticate_user`` verify tokens with ``config``."""
+
+    saved = dict(jwt_utils.default_decode_config())
+    jwt_utils.DEFAULT_DECODE_CONFIG.update(config)
+    try:
+        yield
+    finally:
+        jwt_utils.DEFAULT_DECODE_CONFIG.update(saved)
+
+
+def bench_bcrypt(rounds: list[int], iterations: int) -> dict[str, Any]:
+    results = {}
+
+    for cost in rounds:
+        with bcrypt_rounds(cost):
+            hashed = data_hash.get_hashed_data(PASSWORD)
+
+            results[f"bcrypt.hash[{cost}]"] = measure(
+                lambda: data_hash.get_hashed_data(PASSWORD), iterations
+            )
+            results[f"bcrypt.verify[{cost}]"] = measure(
+                # pylint: disable=cell-var-from-loop
+                lambda: data_hash.validate_hashed_data(PASSWORD, hashed),
+                iterations,
+            )
+
+    return results
+
+
+def bench_jwt(
+    algorithms: list[str], rsa_bits: list[int], iterations: int
+) -> dict[str, Any]:
+    # pylint: disable=cell-var-from-loop
+    results = {}
+    variants = [
+        (algorithm, bits if algorithm == "RS256" else None)
+        for algorithm in algorithms
+        for bits in (rsa_bits if algorithm == "RS256" else [0])
+    ]
+
+    for algorithm, bits in variants:
+        name = f"{algorithm}-{bits}" if bits else algorithm
+        encode_key, decode_key = signing_keys(algorithm, bits or 0)
+        encode = {"JWT_KEY": encode_key, "JWT_ALGO": algorithm}
+        decode = {"JWT_KEY": decode_key, "JWT_ALGO": algorithm}
+
+        token = jwt_utils.create_jwt_token(CLAIMS, config=encode, claims={"ver": 1})
+
+        results[f"jwt.create[{name}]"] = measure(
+            lambda: jwt_utils.create_jwt_token(
+                CLAIMS, config=encode, claims={"ver": 1}
+            ),
+            iterations,
+        )
+        results[f"jwt.decode[{name}]"] = measure(
+            lambda: jwt_utils.decode_jwt_token(token, config=decode), iterations
+        )
+
+        with decode_config(decode):
+            results[f"authenticate_user[{name}]"] = measure(
+                lambda: authenticate_user(token), iterations
+            )
+
+    return results
+
+
+def bench_claims(iterations: int) -> dict[str, Any]:
+    user = UserRead(**CLAIMS)
+
+    return {
+        "user_read": measure(lambda: UserRead(**CLAIMS), iterations),
+        "authorize_user": measure(lambda: authorize_user(user, ["All"], 1), iterations),
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "config": {
+            "rounds": args.rounds,
+            "algorithms": args.algorithms,
+            "rsa_bits": args.rsa_bits,
+            "iterations": args.iterations,
+            "bcrypt_iterations": args.bcrypt_iterations,
+        },
+        "results": {
+            **bench_bcrypt(args.rounds, args.bcrypt_iterations),
+            **bench_jwt(args.algorithms, args.rsa_bits, args.iterations),
+            **bench_claims(args.iterations),
+        },
+    }
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.auth", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--rounds", type=_int_list, default=[10, 12], help="bcrypt costs"
+    )
+    parser.add_argument(
+        "--algorithms",
+        type=lambda value: value.split(","),
+        default=["HS256", "RS256", "ES256"],
+        help=f"comma separated subset of {','.join(ALGORITHMS)}",
+    )
+    parser.add_argument(
+        "--rsa-bits", type=_int_list, default=[2048, 3072], help="RS256 key sizes"
+    )
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--bcrypt-iterations", type=int, default=10, help="calls per bcrypt cost"
+    )
+    add_report_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+
+    unknown = set(args.algorithms) - set(ALGORITHMS)
+    if unknown:
+        raise SystemExit(f"Unsupported algorithms: {', '.join(sorted(unknown))}")
+
+    return finish(run(args), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Load test of the HTTP API.
+
+Seeds ``--enterprises`` enterprises with ``--users`` users each, then drives
+login, ``/users/me``, the filtered ``/users/`` listing, ``/enterprise/full``
+and ``PUT /users/{user_id}`` one scenario after the other, each at a fixed
+concurrency, and reports p50/p95/p99 latency and requests per second.
+
+By default the application runs in-process (ASGI, no network, broker events
+discarded) on a throw-away SQLite database, so runs are reproducible on any
+machine. ``--database-url`` seeds another (empty) database instead, and
+``--base-url`` sends the requests to a running server that uses it.
+
+With ``--baseline`` the run is compared to a stored report and the command
+exits with status 1 when a scenario regressed by more than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import count
+from pathlib import Path
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any
+
+import httpx
+from sqlalchemy import Engine
+from sqlmodel import create_engine
+
+from app.db import conn
+from app.db.migrate import upgrade
+
+from .report import add_report_arguments, finish, summarize
+from .seed import SeededEnterprise, seed
+
+
+PASSWORD = "bench-password"
+
+SCENARIOS = ("login", "users_me", "users_filtered", "enterprise_full", "update_user")
+
+# A request of a scenario: method, URL and keyword arguments of httpx.request.
+Request = tuple[str, str, dict[str, Any]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    requests: int
+    build: Callable[[int], Request]
+
+
+def create_bench_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        return create_engine(
+            url, connect_args={"check_same_thread": False, "timeout": 30}
+        )
+
+    return conn.build_engine(url)
+
+
+@contextmanager
+def bound_app(engine: Engine) -> Iterator[Any]:
+    """
+    Yields the application using ``engine``, discarding broker events and
+    without login throttling.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from app.auth.rate_limit import (
+        LocalBucketStore,
+        LoginRateLimiter,
+        get_login_limiter,
+        login_limiter,
+    )
+    from app.main import app
+    from app.middlewares.send_message import get_async_message_sender_on_loop
+
+    async def discard(_message: str):
+        pass
+
+    saved = (conn.engine, conn.replica_router.primary, conn.replica_router.replicas)
+    overrides = dict(app.dependency_overrides)
+    conn.engine = engine
+    conn.replica_router.primary = engine
+    conn.replica_router.replicas = []
+    app.dependency_overrides[get_async_message_sender_on_loop] = lambda: discard
+    # Every scenario request comes from the same client, measure the handler.
+    unthrottled = LoginRateLimiter(
+        LocalBucketStore(),
+        login_limiter.ip_limit,
+        login_limiter.email_limit,
+        enabled=False,
+    )
+    app.dependency_overrides[get_login_limiter] = lambda: unthrottled
+
+    try:
+        yield app
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(overrides)
+        conn.engine, conn.replica_router.primary, conn.replica_router.replicas = saved
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict[str, str]:
+    response = await client.post(
+        "/auth/login", data={"username": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def build_scenarios(
+    enterprises: list[SeededEnterprise],
+    headers: list[dict[str, str]],
+    requests: int,
+    login_requests: int,
+) -> list[Scenario]:
+    """Builds the scenarios; requests rotate over the seeded enterprises."""
+
+    emails = [email for enterprise in enterprises for email in enterprise.emails]
+    members = [
+        (index, member_id)
+        for index, enterprise in enumerate(enterprises)
+        for member_id in enterprise.member_ids
+    ]
+
+    def get(url: str) -> Callable[[int], Request]:
+        return lambda i: ("GET", url, {"headers": headers[i % len(headers)]})
+
+    def update_member(i: int) -> Request:
+        index, member_id = members[i % len(members)]
+        return (
+            "PUT",
+            f"/users/{member_id}",
+            {"headers": headers[index], "json": {"full_name": f"Bench User {i}"}},
+        )
+
+    scenarios = [
+        Scenario(
+            "login",
+            login_requests,
+            lambda i: (
+                "POST",
+                "/auth/login",
+                {"data": {"username": emails[i % len(emails)], "password": PASSWORD}},
+            ),
+        ),
+        Scenario("users_me", requests, get("/users/me")),
+        Scenario(
+            "users_filtered",
+            requests,
+            get("/users/?role_names=Collaborator&scope_names=Sells"),
+        ),
+        Scenario("enterprise_full", requests, get("/enterprise/full")),
+    ]
+
+    if members:
+        scenarios.append(Scenario("update_user", requests, update_member))
+
+    return scenarios
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> dict[str, Any]:
+    """Sends ``requests`` requests from ``concurrency`` concurrent workers."""
+
+    latencies: list[float] = []
+    errors = 0
+    tickets = count()
+
+    async def worker():
+        nonlocal errors
+
+        while (ticket := next(tickets)) < requests:
+            method, url, kwargs = scenario.build(ticket)
+            start = perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(perf_counter() - start)
+
+            if response.status_code >= 400:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, perf_counter() - start)
+
+
+async def drive(
+    client: httpx.AsyncClient, enterprises: list[SeededEnterprise], args
+) -> dict[str, Any]:
+    headers = [
+        await login(client, enterprise.owner_email) for enterprise in enterprises
+    ]
+    results = {}
+
+    for scenario in build_scenarios(
+        enterprises, headers, args.requests, args.login_requests
+    ):
+        if scenario.name not in args.scenarios:
+            continue
+
+        await run_scenario(client, scenario, args.warmup, args.concurrency)
+        results[scenario.name] = await run_scenario(
+            client, scenario, scenario.requests, args.concurrency
+        )
+
+    return results
+
+
+async def _drive_with(
+    client: httpx.AsyncClient, enterprises: list[SeededEnterprise], args
+) -> dict[str, Any]:
+    async with client:
+        return await drive(client, enterprises, args)
+
+
+def run(args) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{Path(directory) / 'bench.db'}"
+        engine = create_bench_engine(url)
+
+        with engine.connect() as connection:
+            upgrade(connection=connection)
+            connection.commit()
+
+        enterprises = seed(engine, args.enterprises, args.users, PASSWORD)
+
+        try:
+            if args.base_url:
+                client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+                results = asyncio.run(_drive_with(client, enterprises, args))
+            else:
+                with bound_app(engine) as app:
+                    client = httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app=app),
+                        base_url="http://bench",
+                        timeout=60,
+                    )
+                    results = asyncio.run(_drive_with(client, enterprises, args))
+        finally:
+            engine.dispose()
+
+    return {
+        "config": {
+            "enterprises": args.enterprises,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "target": args.base_url or "in-process",
+        },
+        "results": results,
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.load", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("--enterprises", type=int, default=5)
+    parser.add_argument("--users", type=int, default=20, help="users per enterprise")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument(
+        "--login-requests",
+        type=int,
+        default=20,
+        help="requests of the login scenario, each one runs bcrypt",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=5, help="unmeasured requests per scenario"
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"comma separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--database-url", help="empty database to seed")
+    parser.add_argument("--base-url", help="server to load instead of the app")
+    add_report_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+
+    if args.users < 1:
+        raise SystemExit("--users must be at least 1, the enterprise owner")
+
+    return finish(run(args), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
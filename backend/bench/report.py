@@ -0,0 +1,160 @@
+"""
+Latency summaries and baseline comparison shared by the benchmarks.
+
+A report is a JSON document ``{"config": {...}, "results": {name: summary}}``
+where each summary holds the request count, errors, requests per second and
+the p50/p95/p99 latencies in milliseconds. A report saved with
+``--save-baseline`` is the reference later runs are compared against.
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+import sys
+from typing import Any
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 when empty)."""
+
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(
+    latencies: list[float], errors: int, elapsed: float, digits: int = 3
+) -> dict[str, Any]:
+    """
+    Summarizes the latencies (seconds) of a run lasting ``elapsed`` seconds,
+    with the percentiles in milliseconds rounded to ``digits`` decimals.
+    """
+
+    summary: dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(latencies, pct) * 1000, digits)
+
+    return summary
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    Lists the regressions of ``current`` against ``baseline``.
+
+    A result regresses when its p95 or p99 grew, or its requests per second
+    shrank, by more than ``threshold`` (0.2 = 20%), or when it failed requests
+    the baseline did not. Results missing from either report are ignored.
+    """
+
+    regressions = []
+
+    for name, result in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+
+        for key in ("p95_ms", "p99_ms"):
+            if reference[key] > 0 and result[key] > reference[key] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {key} {result[key]} > {reference[key]} "
+                    f"(+{result[key] / reference[key] - 1:.0%})"
+                )
+
+        if reference["rps"] > 0 and result["rps"] < reference["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: rps {result['rps']} < {reference['rps']} "
+                f"({result['rps'] / reference['rps'] - 1:.0%})"
+            )
+
+        if result.get("errors", 0) > reference.get("errors", 0):
+            regressions.append(
+                f"{name}: {result['errors']} errors, baseline had {reference['errors']}"
+            )
+
+    return regressions
+
+
+def load_report(path: str | Path) -> dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def save_report(report: dict[str, Any], path: str | Path):
+    Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def format_table(report: dict[str, Any]) -> str:
+    """Renders the results as a plain text table."""
+
+    header = f"{'name':<32}{'requests':>10}{'errors':>8}{'rps':>12}" + "".join(
+        f"{f'p{pct} ms':>11}" for pct in PERCENTILES
+    )
+    lines = [header]
+
+    for name, result in report["results"].items():
+        lines.append(
+            f"{name:<32}{result['requests']:>10}{result['errors']:>8}"
+            f"{result['rps']:>12}"
+            + "".join(f"{result[f'p{pct}_ms']:>11}" for pct in PERCENTILES)
+        )
+
+    return "\n".join(lines)
+
+
+def add_report_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="tolerated relative regression, 0.2 = 20%%",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store the report as --baseline"
+    )
+
+
+def finish(report: dict[str, Any], args: argparse.Namespace) -> int:
+    """
+    Prints and stores the report, then checks it against the baseline.
+
+    Returns:
+        int: the exit status, 1 when the report regressed.
+    """
+
+    print(format_table(report))
+
+    if args.output:
+        save_report(report, args.output)
+
+    if not args.baseline:
+        return 0
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        return 0
+
+    regressions = compare(report, load_report(args.baseline), args.threshold)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    if regressions:
+        return 1
+
+    print(json.dumps({"baseline": args.baseline, "regressions": 0}))
+    return 0
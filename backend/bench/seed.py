@@ -0,0 +1,93 @@
+"""
+Seeds the benchmark data set.
+
+Every enterprise gets the default roles and scopes, an owner with the ``All``
+scope and ``users - 1`` managers/collaborators spread over the other scopes.
+The password is hashed once and shared by every user, so seeding a large data
+set does not spend minutes in bcrypt.
+"""
+
+from dataclasses import dataclass, field
+from itertools import cycle
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app.auth.data_hash import get_hashed_data
+from app.models.enterprise import Enterprise
+from app.models.role import DefaultRole
+from app.models.scope import DefaultScope
+from app.models.user import User
+from app.router.enterprise import fill_roles_scopes
+
+
+EMAIL_DOMAIN = "bench.example.com"
+
+
+@dataclass
+class SeededEnterprise:
+    id: int
+    owner_email: str
+    emails: list[str] = field(default_factory=list)
+    member_ids: list[int] = field(default_factory=list)
+
+
+def seed(
+    engine: Engine, enterprises: int, users: int, password: str
+) -> list[SeededEnterprise]:
+    """Creates ``enterprises`` enterprises with ``users`` users each."""
+
+    hashed_password = get_hashed_data(password)
+    member_roles = cycle([DefaultRole.MANAGER, DefaultRole.COLLABORATOR])
+    member_scopes = cycle(
+        [DefaultScope.SELLS, DefaultScope.HUMAN_RESOURCE, DefaultScope.PATRIMONIAL]
+    )
+    seeded = []
+
+    with Session(engine) as session:
+        for index in range(enterprises):
+            enterprise = fill_roles_scopes(
+                Enterprise(
+                    name=f"Bench {index}",
+                    accountable_email=f"owner{index}@{EMAIL_DOMAIN}",
+                    activity_type="Benchmark",
+                )
+            )
+            session.add(enterprise)
+            session.commit()
+            session.refresh(enterprise)
+
+            roles = {role.name: role.id for role in enterprise.roles or []}
+            scopes = {scope.name: scope.id for scope in enterprise.scopes or []}
+            members = []
+
+            for number in range(users):
+                owner = number == 0
+                role = DefaultRole.OWNER if owner else next(member_roles)
+                scope = DefaultScope.ALL if owner else next(member_scopes)
+
+                members.append(
+                    User(
+                        username=f"user{number}.e{index}",
+                        email=f"user{number}.e{index}@{EMAIL_DOMAIN}",
+                        full_name=f"Bench User {number}",
+                        hashed_password=hashed_password,
+                        role_id=roles[role.value],
+                        scope_id=scopes[scope.value],
+                        enterprise_id=enterprise.id,
+                    )
+                )
+
+            session.add_all(members)
+            session.commit()
+
+            seeded.append(
+                SeededEnterprise(
+                    id=enterprise.id,
+                    owner_email=members[0].email,
+                    emails=[member.email for member in members],
+                    member_ids=[member.id for member in members[1:]],
+                )
+            )
+
+    return seeded
@@ -0,0 +1,92 @@
+"""
+Alembic environment for the RH service.
+
+Migrations run against the database configured by the DB_* environment
+variables unless a connection (``config.attributes["connection"]``) or an
+explicit ``sqlalchemy.url`` option is provided, which is how the test suite
+and ``app.db.migrate`` drive it.
+"""
+
+# pylint: disable=no-member
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from sqlmodel import SQLModel
+
+from app.db.conn import SQLALCHEMY_DATABASE_URL
+from app.models import (  # pylint: disable=unused-import
+    enterprise,
+    refresh_token,
+    revoked_token,
+    revoked_user,
+    role,
+    scope,
+    user,
+)
+
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+
+def get_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout without a database connection."""
+
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations with a live connection."""
+
+    connection = config.attributes.get("connection")
+
+    if connection is not None:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = engine_from_config(
+        {"sqlalchemy.url": get_url()},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as conn:
+        context.configure(
+            connection=conn,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,108 @@
+"""Initial schema: enterprise, role, scope and user.
+
+Matches the tables previously created by ``SQLModel.metadata.create_all``.
+Databases created that way should be stamped with this revision
+(``python -m app.db.migrate stamp 0001``) instead of upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+# pylint: disable=no-member,invalid-name
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "enterprise",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "accountable_email", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("activity_type", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_enterprise_id"), "enterprise", ["id"], unique=False)
+
+    op.create_table(
+        "role",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("hierarchy", sa.Integer(), nullable=False),
+        sa.Column("enterprise_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["enterprise_id"], ["enterprise.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", "enterprise_id"),
+    )
+    op.create_index(op.f("ix_role_id"), "role", ["id"], unique=False)
+    op.create_index(op.f("ix_role_name"), "role", ["name"], unique=False)
+
+    op.create_table(
+        "scope",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("enterprise_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["enterprise_id"], ["enterprise.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", "enterprise_id"),
+    )
+    op.create_index(op.f("ix_scope_id"), "scope", ["id"], unique=False)
+    op.create_index(op.f("ix_scope_name"), "scope", ["name"], unique=False)
+
+    op.create_table(
+        "user",
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("full_name", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "hashed_password", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("role_id", sa.Integer(), nullable=True),
+        sa.Column("scope_id", sa.Integer(), nullable=True),
+        sa.Column("enterprise_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["enterprise_id"], ["enterprise.id"]),
+        sa.ForeignKeyConstraint(["role_id"], ["role.id"]),
+        sa.ForeignKeyConstraint(["scope_id"], ["scope.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("username", "enterprise_id"),
+    )
+    op.create_index(op.f("ix_user_id"), "user", ["id"], unique=False)
+    op.create_index(op.f("ix_user_email"), "user", ["email"], unique=True)
+    op.create_index(op.f("ix_user_username"), "user", ["username"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_username"), table_name="user")
+    op.drop_index(op.f("ix_user_email"), table_name="user")
+    op.drop_index(op.f("ix_user_id"), table_name="user")
+    op.drop_table("user")
+
+    op.drop_index(op.f("ix_scope_name"), table_name="scope")
+    op.drop_index(op.f("ix_scope_id"), table_name="scope")
+    op.drop_table("scope")
+
+    op.drop_index(op.f("ix_role_name"), table_name="role")
+    op.drop_index(op.f("ix_role_id"), table_name="role")
+    op.drop_table("role")
+
+    op.drop_index(op.f("ix_enterprise_id"), table_name="enterprise")
+    op.drop_table("enterprise")
@@ -0,0 +1,57 @@
+"""Index the foreign keys used to list users, roles and scopes by enterprise.
+
+The indexes are built with ``CREATE INDEX CONCURRENTLY`` on PostgreSQL so the
+tables stay writable while the migration runs. Concurrent index builds cannot
+run inside a transaction, hence the autocommit blocks.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+
+# pylint: disable=no-member,invalid-name
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_user_enterprise_id", "user", "enterprise_id"),
+    ("ix_user_role_id", "user", "role_id"),
+    ("ix_user_scope_id", "user", "scope_id"),
+    ("ix_role_enterprise_id", "role", "enterprise_id"),
+    ("ix_scope_enterprise_id", "scope", "enterprise_id"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
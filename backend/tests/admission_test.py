@@ -0,0 +1,143 @@
+""" Tests for the admission control """
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.admission import ConcurrencyLimiter, Rejected, route_class
+from app.middlewares.admission import AdmissionMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_waiters_get_the_released_slots_in_order():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1, queue_size=2, queue_timeout=1)
+        order = []
+
+        await limiter.acquire()
+
+        async def wait(name: str):
+            await limiter.acquire()
+            order.append(name)
+
+        waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+
+        with pytest.raises(Rejected) as exc_info:
+            await limiter.acquire()
+        assert exc_info.value.reason == "queue full"
+
+        limiter.release()
+        await asyncio.sleep(0.01)
+        assert order == ["first"] and limiter.in_use == 1
+
+        limiter.release()
+        await asyncio.gather(*waiters)
+        assert order == ["first", "second"] and limiter.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_deadline():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1, queue_size=4, queue_timeout=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(Rejected) as exc_info:
+            await limiter.acquire()
+
+        assert exc_info.value.reason == "queue timeout"
+        assert limiter.queued == 0
+
+        limiter.release()
+        assert limiter.in_use == 0
+
+    asyncio.run(scenario())
+
+
+def test_aimd_limit():
+    clock = FakeClock()
+    limiter = ConcurrencyLimiter(
+        10, queue_size=0, queue_timeout=1, latency_target=0.5, min_limit=2, clock=clock
+    )
+
+    limiter.in_use = 2
+    limiter.release(1.0)
+    limiter.release(1.0)
+    # One decrease per target period.
+    assert limiter.limit == pytest.approx(9)
+
+    for _ in range(20):
+        clock.now += 1
+        limiter.in_use += 1
+        limiter.release(1.0)
+    assert limiter.limit == 2
+
+    limiter.in_use = 1
+    limiter.release(0.1)
+    assert limiter.limit == pytest.approx(2.5)
+
+    for _ in range(200):
+        limiter.in_use += 1
+        limiter.release(0.1)
+    assert limiter.limit == 10
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("POST", "/auth/login", "auth"),
+        ("GET", "/enterprise/full", "export"),
+        ("GET", "/users/1", "read"),
+        ("PUT", "/users/me", "write"),
+        ("GET", "/check/ready", None),
+        ("GET", "/metrics", None),
+        ("GET", "/.well-known/jwks.json", None),
+    ],
+)
+def test_route_classes(method: str, path: str, expected: str | None):
+    assert route_class(method, path) == expected
+
+
+def test_overload_is_answered_503():
+    release = asyncio.Event()
+
+    async def handler(scope, receive, send):
+        # pylint: disable=unused-argument
+
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    limiters = {"read": ConcurrencyLimiter(1, queue_size=0, queue_timeout=2)}
+    app = AdmissionMiddleware(handler, limiters=limiters, enabled=True)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            first = asyncio.create_task(client.get("/users/1"))
+            await asyncio.sleep(0.01)
+
+            rejected = await client.get("/users/2")
+            exempt = asyncio.create_task(client.get("/check/ready"))
+            release.set()
+
+            return rejected, await first, await exempt
+
+    rejected, first, exempt = asyncio.run(scenario())
+
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "2"
+    assert first.status_code == exempt.status_code == 200
+    assert limiters["read"].in_use == 0
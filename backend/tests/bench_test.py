@@ -0,0 +1,96 @@
+""" Tests for the load test harness """
+
+import json
+from pathlib import Path
+
+from app.auth import jwt_utils
+from bench import auth, load
+from bench.report import compare, percentile, summarize
+
+
+def _report(p95: float, p99: float, rps: float, errors: int = 0):
+    return {
+        "results": {
+            "users_me": {"p95_ms": p95, "p99_ms": p99, "rps": rps, "errors": errors}
+        }
+    }
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(value) for value in range(1, 101)]
+
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2)
+
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["rps"] == 2
+    assert summary["p50_ms"] == 20
+    assert summary["p99_ms"] == 40
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _report(p95=10, p99=20, rps=100)
+
+    assert not compare(_report(p95=11, p99=23, rps=85), baseline, 0.2)
+
+    regressions = compare(_report(p95=13, p99=20, rps=70, errors=2), baseline, 0.2)
+
+    assert len(regressions) == 3
+    assert regressions[0].startswith("users_me: p95_ms")
+
+
+def test_load_run_against_baseline(tmp_path: Path):
+    output = tmp_path / "report.json"
+    baseline = tmp_path / "baseline.json"
+    argv = [
+        "--enterprises=1",
+        "--users=2",
+        "--concurrency=2",
+        "--requests=4",
+        "--login-requests=1",
+        "--warmup=0",
+        f"--baseline={baseline}",
+    ]
+
+    assert load.main([*argv, f"--output={output}", "--save-baseline"]) == 0
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert set(report["results"]) == set(load.SCENARIOS)
+    assert all(result["errors"] == 0 for result in report["results"].values())
+    # A generous threshold keeps the comparison itself from being flaky.
+    assert load.main([*argv, "--threshold=100"]) == 0
+
+
+def test_auth_benchmarks_cover_each_primitive(tmp_path: Path):
+    output = tmp_path / "auth.json"
+    decode_config = dict(jwt_utils.DEFAULT_DECODE_CONFIG)
+
+    status = auth.main(
+        [
+            "--rounds=4",
+            "--algorithms=HS256,RS256,ES256",
+            "--rsa-bits=2048",
+            "--iterations=5",
+            "--bcrypt-iterations=2",
+            f"--output={output}",
+        ]
+    )
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+
+    assert status == 0
+    assert {"bcrypt.hash[4]", "bcrypt.verify[4]", "user_read", "authorize_user"} <= set(
+        results
+    )
+    for name in ("HS256", "RS256-2048", "ES256"):
+        assert results[f"authenticate_user[{name}]"]["requests"] == 5
+    # The benchmarks swap the module configuration, it must be restored.
+    assert jwt_utils.DEFAULT_DECODE_CONFIG == decode_config
@@ -9,6 +9,11 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel, Session
 
+from app.auth.data_hash import get_hashed_data
+from app.auth.email_filter import known_emails
+from app.auth.rate_limit import login_limiter
+from app.auth.revocation import revocations
+from app.auth.token_version import token_versions
 from app.db.conn import get_db
 from app.main import app
 from app.middlewares.auth import authenticate_user
@@ -18,6 +23,8 @@ from app.models.role import DefaultRole, DefaultRoleSchema, Role, RoleRelation
 from app.models.scope import DefaultScope, DefaultScopeSchema, Scope, ScopeRelation
 from app.models.user import User, UserRead
 
+from .utils import statement_budget
+
 # SQLite database URL for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -53,6 +60,34 @@ def override_get_async_message_sender_on_loop():
     return test_sender_on_loop
 
 
+@pytest.fixture(autouse=True)
+def reset_token_versions():
+    """
+    Versions and revocations committed by a test are rolled back with its
+    data, forget them.
+    """
+
+    token_versions.clear()
+    revocations.clear()
+    yield
+    token_versions.clear()
+    revocations.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_known_emails():
+    known_emails.clear()
+    yield
+    known_emails.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_login_limiter():
+    login_limiter.store.clear()
+    yield
+    login_limiter.store.clear()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a new database session with a rollback at the end of the test."""
@@ -112,11 +147,24 @@ def test_client(db_session: Session):
     app.dependency_overrides[get_async_message_sender_on_loop] = (
         override_get_async_message_sender_on_loop
     )
+    # Requests authenticate with real tokens, whatever a previous test overrode.
+    app.dependency_overrides.pop(authenticate_user, None)
 
     with TestClient(app) as test_client_override:
         yield test_client_override
 
 
+@pytest.fixture
+def query_budget(db_session: Session):
+    # pylint: disable=redefined-outer-name
+    """
+    Returns ``statement_budget`` bound to the test connection, e.g.
+    ``with query_budget(3): client.get(...)`` fails above three statements.
+    """
+
+    return lambda budget: statement_budget(db_session.connection(), budget)
+
+
 @pytest.fixture(scope="function")
 def enterprise_role_scope(db_session: Session) -> dict[str, Any]:
     # pylint: disable=redefined-outer-name
@@ -189,6 +237,19 @@ def create_default_user(db_session: Session, enterprise_role_scope: dict[str, An
     return {"user": user, **enterprise_role_scope}
 
 
+@pytest.fixture(scope="function")
+def user_with_password(db_session: Session, create_default_user: dict[str, Any]):
+    # pylint: disable=redefined-outer-name
+    """The default user, with "secret" as password."""
+
+    user: User = create_default_user["user"]
+    user.hashed_password = get_hashed_data("secret")
+    db_session.add(user)
+    db_session.commit()
+
+    return user
+
+
 @pytest.fixture(scope="function")
 def test_client_authenticated_default(
     db_session: Session, create_default_user: dict[str, Any]
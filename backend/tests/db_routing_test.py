@@ -0,0 +1,152 @@
+""" Tests for the read replica routing """
+
+from time import time
+from typing import Any
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+from app.db import conn
+from app.db.routing import ReplicaRouter
+from app.middlewares import db_session as db_session_middleware
+from app.models.user import User
+
+
+def _engine(url: str = "sqlite:///:memory:"):
+    return create_engine(
+        url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+def test_router_without_replicas_uses_primary():
+    primary = _engine()
+    router = ReplicaRouter(primary, [])
+
+    assert router.choose(1) is primary
+    assert router.choose(None) is primary
+
+
+def test_router_round_robin_over_replicas():
+    primary, first, second = _engine(), _engine(), _engine()
+    router = ReplicaRouter(primary, [first, second])
+
+    chosen = [router.choose(1) for _ in range(4)]
+
+    assert chosen == [first, second, first, second]
+
+
+def test_router_sticks_to_primary_after_write():
+    primary, replica = _engine(), _engine()
+    router = ReplicaRouter(primary, [replica], read_your_writes_seconds=60)
+
+    router.record_write(1)
+
+    assert router.choose(1) is primary
+    assert router.choose(2) is replica
+    assert router.choose(None) is replica
+
+
+def test_router_skips_unhealthy_replicas():
+    primary, first, second = _engine(), _engine(), _engine()
+    router = ReplicaRouter(primary, [first, second], retry_after_seconds=60)
+
+    router.mark_unhealthy(first)
+    assert {router.choose(1) for _ in range(4)} == {second}
+
+    router.mark_unhealthy(second)
+    assert router.choose(1) is primary
+
+
+def test_read_db_falls_back_to_primary(
+    monkeypatch: pytest.MonkeyPatch,
+    test_client_authenticated_default: TestClient,
+    create_default_user: dict[str, Any],
+):
+    user: User = create_default_user["user"]
+    broken_replica = _engine("sqlite:////nonexistent/dir/replica.db")
+    router = ReplicaRouter(conn.engine, [broken_replica], retry_after_seconds=60)
+    monkeypatch.setattr(db_session_middleware, "replica_router", router)
+
+    response = test_client_authenticated_default.get(f"/users/{user.id}")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["email"] == user.email
+    assert not router.is_healthy(broken_replica)
+
+
+def test_write_db_records_the_writer(
+    monkeypatch: pytest.MonkeyPatch,
+    test_client_authenticated_default: TestClient,
+    create_default_user: dict[str, Any],
+):
+    user: User = create_default_user["user"]
+    replica = _engine()
+    router = ReplicaRouter(conn.engine, [replica], read_your_writes_seconds=60)
+    monkeypatch.setattr(db_session_middleware, "replica_router", router)
+
+    response = test_client_authenticated_default.put(
+        "/users/me", json={"full_name": "Test User Updated"}
+    )
+
+    assert response.status_code == 200
+    assert router.writes.is_recent(user.id)
+    assert router.choose(user.id) is conn.engine
+
+
+def test_read_your_writes_across_workers(
+    monkeypatch: pytest.MonkeyPatch,
+    test_client_authenticated_default: TestClient,
+    create_default_user: dict[str, Any],
+):
+    user: User = create_default_user["user"]
+    writer = ReplicaRouter(conn.engine, [_engine()], read_your_writes_seconds=60)
+    monkeypatch.setattr(db_session_middleware, "replica_router", writer)
+
+    response = test_client_authenticated_default.put(
+        "/users/me", json={"full_name": "Test User Updated"}
+    )
+
+    assert response.status_code == 200
+    assert db_session_middleware.LAST_WRITE_COOKIE in response.cookies
+
+    # Another worker, which knows nothing of the write: a replica it tried
+    # would be broken, and marked so.
+    broken_replica = _engine("sqlite:////nonexistent/dir/replica.db")
+    reader = ReplicaRouter(
+        conn.engine,
+        [broken_replica],
+        read_your_writes_seconds=60,
+        retry_after_seconds=60,
+    )
+    monkeypatch.setattr(db_session_middleware, "replica_router", reader)
+
+    response = test_client_authenticated_default.get(f"/users/{user.id}")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["full_name"] == "Test User Updated"
+    assert not reader.writes.is_recent(user.id)
+    assert reader.is_healthy(broken_replica)
+
+
+def test_router_trusts_recent_client_writes_only():
+    primary, replica = _engine(), _engine()
+    router = ReplicaRouter(primary, [replica], read_your_writes_seconds=60)
+
+    assert router.choose(1, time() - 1) is primary
+    assert router.choose(1, time() - 120) is replica
+    assert router.choose(1, time() + 3600) is replica
+    assert router.choose(1, None) is replica
+
+
+def test_write_db_listener_is_removed(db_session: Session):
+    listeners = len(db_session.dispatch.after_commit)
+
+    generator = db_session_middleware.get_write_db(db_session, None)  # type: ignore
+    next(generator)
+    assert len(db_session.dispatch.after_commit) == listeners + 1
+
+    generator.close()
+    assert len(db_session.dispatch.after_commit) == listeners
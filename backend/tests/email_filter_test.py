@@ -0,0 +1,153 @@
+""" Tests for the filter of known emails and the unknown email login path """
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from aio_pika.tools import CallbackCollection
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.auth.email_filter import (
+    CountingBloomFilter,
+    apply_broadcast,
+    encode_changes,
+    known_emails,
+)
+from app.auth.revocation import revocations
+from app.auth.token_version import token_versions
+from app.main import Messaging, load_known_emails
+from app.models.user import User
+
+
+class FakeConnection:
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.connected = asyncio.Event()
+        self.connected.set()
+        self.close_callbacks = CallbackCollection(self)
+        self.reconnect_callbacks = CallbackCollection(self)
+
+
+def test_counting_filter_adds_and_removes():
+    emails = [f"user{i}@mail.com" for i in range(200)]
+    bloom = CountingBloomFilter(1000, 0.01)
+
+    for email in emails:
+        bloom.add(email)
+
+    assert all(email in bloom for email in emails)
+
+    for email in emails[:100]:
+        bloom.remove(email)
+
+    assert all(email in bloom for email in emails[100:])
+    assert sum(email in bloom for email in emails[:100]) < 5
+
+
+def test_filter_follows_committed_users(
+    db_session: Session, create_default_user: dict[str, Any]
+):
+    user = create_default_user["user"]
+    assert user.email in known_emails.filter
+
+    user.email = "renamed@example.com"
+    db_session.add(user)
+    db_session.commit()
+
+    assert "renamed@example.com" in known_emails.filter
+    assert "test@example.com" not in known_emails.filter
+
+    db_session.delete(user)
+    db_session.commit()
+
+    assert "renamed@example.com" not in known_emails.filter
+
+
+def test_broadcast_of_this_process_is_ignored():
+    apply_broadcast(encode_changes(["mine@mail.com"], []))
+    assert "mine@mail.com" not in known_emails.filter
+
+    apply_broadcast('{"origin": "other", "added": ["theirs@mail.com"], "removed": []}')
+    assert "theirs@mail.com" in known_emails.filter
+
+
+def test_unknown_email_skips_the_query_and_verifies_a_dummy(
+    test_client: TestClient, create_default_user: dict[str, Any], query_budget
+):
+    # pylint: disable=unused-argument
+    known_emails.ready = True
+
+    with (
+        patch("app.router.login.dummy_validate", return_value=False) as dummy,
+        query_budget(0),
+    ):
+        response = test_client.post(
+            "/auth/login", data={"username": "nobody@mail.com", "password": "x"}
+        )
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Incorrect username or password"
+    dummy.assert_called_once_with("x")
+
+
+def test_filter_is_ignored_until_ready(
+    test_client: TestClient, create_default_user: dict[str, Any], query_budget
+):
+    # pylint: disable=unused-argument
+
+    with (
+        patch("app.router.login.dummy_validate", return_value=False),
+        query_budget(1),
+    ):
+        response = test_client.post(
+            "/auth/login", data={"username": "nobody@mail.com", "password": "x"}
+        )
+
+    assert response.status_code == 401
+
+
+def test_filter_is_reloaded_after_the_broadcast_was_lost(
+    db_session: Session,
+    create_default_user: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    user = create_default_user["user"]
+
+    for state in (known_emails, token_versions, revocations):
+        monkeypatch.setattr(state, "on_change", state.on_change)
+
+    monkeypatch.setattr(
+        "app.main.get_db", lambda: iter([Session(bind=db_session.connection())])
+    )
+
+    async def scenario():
+        broadcast = Messaging().known_email_broadcast
+        connection = FakeConnection()
+        broadcast.connection = connection
+        broadcast.watch(connection)
+
+        load_known_emails(broadcast)
+        assert known_emails.ready
+
+        connection.connected.clear()
+        await connection.close_callbacks(ConnectionError("lost"))
+        assert not known_emails.ready
+
+        # Changed on another pod while this one was disconnected.
+        db_session.execute(
+            update(User).where(User.id == user.id).values(email="moved@example.com")
+        )
+        assert known_emails.might_exist("moved@example.com")
+
+        connection.connected.set()
+        await connection.reconnect_callbacks()
+
+    asyncio.run(scenario())
+
+    assert known_emails.ready
+    assert known_emails.might_exist("moved@example.com")
+    assert not known_emails.might_exist("test@example.com")
@@ -53,6 +53,8 @@ def test_get_full_enterprise(test_client_authenticated_default: TestClient):
         assert scope["name"] is not None
 
     assert response.json()["data"]["users"][0]["username"] == "testuser"
+    assert "hashed_password" not in response.json()["data"]["users"][0]
+    assert "token_version" not in response.json()["data"]["users"][0]
 
 
 def test_update_enterprise(test_client_authenticated_default: TestClient):
@@ -0,0 +1,120 @@
+""" Tests for the signing keys and the JWKS endpoint """
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi.testclient import TestClient
+import jwt
+import pytest
+
+from app.auth.jwks import SigningKeys, get_signing_keys, parse_keys
+from app.auth.jwt_utils import create_jwt_token, decode_jwt_token
+
+CLAIMS = {"id": 1, "username": "test"}
+
+
+def pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("ascii")
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode("ascii")
+    )
+
+    return private_pem, public_pem
+
+
+@pytest.fixture(scope="module")
+def rsa_keys() -> list[tuple[str, str]]:
+    return [
+        pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        for _ in range(2)
+    ]
+
+
+def configs(keys: SigningKeys) -> tuple[dict, dict]:
+    encode = {
+        "JWT_KEY": keys.encode_key,
+        "JWT_ALGO": keys.algorithm,
+        "JWT_KID": keys.kid,
+    }
+    decode = {
+        "JWT_KEY": keys.primary_decode_key,
+        "JWT_ALGO": keys.algorithm,
+        "JWT_KEYS": keys,
+    }
+
+    return encode, decode
+
+
+def test_tokens_carry_the_kid_of_the_signing_key():
+    token = create_jwt_token(CLAIMS)
+
+    assert jwt.get_unverified_header(token)["kid"] == get_signing_keys().kid
+    assert decode_jwt_token(token)["sub"] == CLAIMS
+
+
+def test_secrets_are_never_published():
+    assert get_signing_keys().symmetric
+    assert get_signing_keys().jwks == {"keys": []}
+
+
+def test_published_keys_verify_tokens(rsa_keys: list[tuple[str, str]]):
+    private_pem, public_pem = rsa_keys[0]
+    keys = SigningKeys("RS256", private_pem, public_pem)
+    encode, _ = configs(keys)
+
+    token = create_jwt_token(CLAIMS, config=encode)
+    (jwk,) = keys.jwks["keys"]
+
+    assert jwk["kid"] == keys.kid and "d" not in jwk
+    assert jwt.decode(
+        token,
+        key=jwt.PyJWK(jwk).key,
+        algorithms=["RS256"],
+        options={"verify_iss": False},
+    )["jti"]
+
+
+def test_rotation_keeps_verifying_the_previous_key(rsa_keys: list[tuple[str, str]]):
+    (old_private, old_public), (new_private, new_public) = rsa_keys
+    old_token = create_jwt_token(
+        CLAIMS, config=configs(SigningKeys("RS256", old_private, old_public))[0]
+    )
+
+    keys = SigningKeys("RS256", new_private, new_public, parse_keys(old_public))
+    encode, decode = configs(keys)
+
+    assert [key["kid"] for key in keys.jwks["keys"]][0] == keys.kid
+    assert len(keys.jwks["keys"]) == 2
+    assert decode_jwt_token(old_token, config=decode)["sub"] == CLAIMS
+    assert decode_jwt_token(create_jwt_token(CLAIMS, config=encode), config=decode)
+
+
+def test_unknown_kid_is_rejected():
+    keys = SigningKeys("ES256", *pem_pair(ec.generate_private_key(ec.SECP256R1())))
+    other = SigningKeys("ES256", *pem_pair(ec.generate_private_key(ec.SECP256R1())))
+    token = create_jwt_token(CLAIMS, config=configs(other)[0])
+
+    with pytest.raises(jwt.InvalidKeyError):
+        decode_jwt_token(token, config=configs(keys)[1])
+
+
+def test_jwks_endpoint_is_cacheable(test_client: TestClient):
+    response = test_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.json() == get_signing_keys().jwks
+    assert "max-age=" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    cached = test_client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.content == b""
@@ -0,0 +1,61 @@
+""" Tests for the logging subsystem """
+
+import json
+import logging
+from queue import Queue
+
+from fastapi.testclient import TestClient
+
+from app.log import request_id_var
+from app.log.setup import DroppingQueueHandler, JsonFormatter, SamplingFilter
+from app.main import app
+
+
+def _record(level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.makeLogRecord(
+        {"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+    record.msg, record.args = "User %s updated", (7,)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extra():
+    entry = json.loads(
+        JsonFormatter().format(_record(request_id="abc", route="/users/{user_id}"))
+    )
+
+    assert entry["message"] == "User 7 updated"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc"
+    assert entry["route"] == "/users/{user_id}"
+
+
+def test_sampling_keeps_warnings():
+    sampler = SamplingFilter(0.0)
+
+    assert not sampler.filter(_record(logging.INFO))
+    assert sampler.filter(_record(logging.WARNING))
+    assert SamplingFilter(1.0).filter(_record(logging.DEBUG))
+
+
+def test_full_queue_drops_records():
+    handler = DroppingQueueHandler(Queue(maxsize=1))
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "User 7 updated"
+
+
+def test_request_id_is_echoed_and_generated():
+    client = TestClient(app)
+
+    response = client.get("/check/", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+
+    generated = client.get("/check/").headers["x-request-id"]
+    assert len(generated) == 32
+    assert request_id_var.get() is None
@@ -0,0 +1,85 @@
+""" Tests for the Prometheus metrics """
+
+from typing import Any
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.auth.data_hash import get_hashed_data
+from app.db import pool as db_pool
+from app.metrics.collectors import PoolCollector
+from app.metrics.db import track_queries
+
+
+def _sample(name: str, labels: dict[str, str]) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_latency_uses_route_template(
+    test_client_authenticated_default: TestClient, create_default_user: dict[str, Any]
+):
+    labels = {"method": "GET", "route": "/users/{user_id}", "status": "200"}
+    before = _sample("rh_http_request_duration_seconds_count", labels)
+
+    user_id = create_default_user["user"].id
+    response = test_client_authenticated_default.get(f"/users/{user_id}")
+
+    assert response.status_code == 200
+    assert _sample("rh_http_request_duration_seconds_count", labels) == before + 1
+    assert _sample("rh_db_queries_per_request_sum", {"route": "/users/{user_id}"}) > 0
+
+
+def test_metrics_endpoint_exposes_histograms(test_client: TestClient):
+    test_client.get("/check/")
+
+    response = test_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'rh_http_request_duration_seconds_count{method="GET",route="/check/"' in (
+        response.text
+    )
+    assert 'rh_db_pool_capacity{pool="primary"}' in response.text
+
+
+def test_track_queries_counts_statements():
+    engine = create_engine("sqlite:///:memory:")
+
+    with engine.connect() as connection, track_queries() as queries:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+
+    assert queries.count == 2
+    assert queries.seconds > 0
+
+
+def test_pool_collector_reports_waits():
+    engine = create_engine(
+        "sqlite:///:memory:", poolclass=db_pool.InstrumentedQueuePool, pool_size=1
+    )
+
+    with engine.connect():
+        pass
+
+    families = {
+        family.name: family
+        for family in PoolCollector(lambda: [("test", engine.pool)]).collect()
+    }
+    buckets = [
+        sample
+        for sample in families["rh_db_pool_wait_seconds"].samples
+        if sample.name.endswith("_bucket")
+    ]
+
+    assert buckets[-1].labels["le"] == "+Inf"
+    assert buckets[-1].value == 1
+
+
+def test_password_hash_is_timed():
+    before = _sample("rh_password_hash_duration_seconds_count", {"operation": "hash"})
+
+    get_hashed_data("secret")
+
+    after = _sample("rh_password_hash_duration_seconds_count", {"operation": "hash"})
+    assert after == before + 1
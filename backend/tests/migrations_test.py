@@ -0,0 +1,55 @@
+""" Tests for the schema migrations """
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.db import migrate
+
+
+def _fresh_engine():
+    return create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def test_upgrade_creates_schema():
+    engine = _fresh_engine()
+
+    with engine.connect() as connection:
+        migrate.upgrade("head", connection=connection)
+
+    tables = set(inspect(engine).get_table_names())
+
+    assert {"enterprise", "role", "scope", "user", "alembic_version"} <= tables
+
+    user_indexes = {index["name"] for index in inspect(engine).get_indexes("user")}
+    assert "ix_user_enterprise_id" in user_indexes
+
+
+def test_migrations_match_models():
+    engine = _fresh_engine()
+
+    with engine.connect() as connection:
+        migrate.upgrade("head", connection=connection)
+
+    with engine.connect() as connection:
+        diff = compare_metadata(
+            MigrationContext.configure(connection), SQLModel.metadata
+        )
+
+    assert diff == []
+
+
+def test_downgrade_removes_schema():
+    engine = _fresh_engine()
+
+    with engine.connect() as connection:
+        migrate.upgrade("head", connection=connection)
+        migrate.downgrade("base", connection=connection)
+
+    assert set(inspect(engine).get_table_names()) == {"alembic_version"}
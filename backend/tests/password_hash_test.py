@@ -0,0 +1,105 @@
+""" Tests for the configurable password hashing and the rehash on login """
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+import pytest
+from sqlmodel import Session
+
+from app.auth import data_hash
+from app.models.user import User
+
+
+@pytest.fixture
+def cheap_context(monkeypatch):
+    context = data_hash.build_context(bcrypt_rounds=5)
+    monkeypatch.setattr(data_hash, "passord_hash", context)
+    return context
+
+
+def test_other_costs_need_rehash(cheap_context: CryptContext):
+    # pylint: disable=redefined-outer-name
+    lower = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    higher = CryptContext(schemes=["bcrypt"], bcrypt__rounds=6).hash("secret")
+
+    assert data_hash.validate_hashed_data("secret", lower)
+    assert data_hash.needs_rehash(lower)
+    assert data_hash.needs_rehash(higher)
+    assert not data_hash.needs_rehash(cheap_context.hash("secret"))
+
+
+def test_deprecated_schemes_still_verify(monkeypatch):
+    monkeypatch.setattr(
+        data_hash,
+        "passord_hash",
+        data_hash.build_context(["bcrypt", "sha256_crypt"], bcrypt_rounds=4),
+    )
+    legacy = CryptContext(schemes=["sha256_crypt"]).hash("secret")
+
+    assert data_hash.validate_hashed_data("secret", legacy)
+    assert data_hash.needs_rehash(legacy)
+    assert data_hash.get_hashed_data("secret").startswith("$2b$04$")
+
+
+def test_schemes_without_a_backend_fail_at_startup(monkeypatch):
+    with pytest.raises(ValueError, match="unknown password scheme"):
+        data_hash.build_context(["bcrypt", "no_such_scheme"])
+
+    argon2 = data_hash.get_crypt_handler("argon2")
+    monkeypatch.setattr(argon2, "has_backend", lambda *args: False)
+
+    with pytest.raises(ValueError, match="argon2 has no backend"):
+        data_hash.build_context(["argon2", "bcrypt"])
+
+
+def test_login_rehashes_stale_hashes(
+    cheap_context: CryptContext,
+    test_client: TestClient,
+    db_session: Session,
+    create_default_user: dict[str, Any],
+):
+    # pylint: disable=redefined-outer-name,unused-argument
+    user = create_default_user["user"]
+    user.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(
+        "secret"
+    )
+    db_session.add(user)
+    db_session.commit()
+    user_id, version = user.id, user.token_version
+
+    response = test_client.post(
+        "/auth/login", data={"username": user.email, "password": "secret"}
+    )
+    assert response.status_code == 200
+
+    # The login closed the session, read the row again.
+    stored = db_session.get(User, user_id)
+    assert stored.hashed_password.startswith("$2b$05$")
+    assert data_hash.validate_hashed_data("secret", stored.hashed_password)
+    assert stored.token_version == version
+
+
+def test_login_verifies_off_the_event_loop(
+    test_client: TestClient, user_with_password: Any
+):
+    loops = []
+
+    def validate(password: str, hashed_password: str) -> bool:
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+
+        return data_hash.passord_hash.verify(password, hashed_password)
+
+    with patch("app.router.login.validate_hashed_data", validate):
+        response = test_client.post(
+            "/auth/login",
+            data={"username": user_with_password.email, "password": "secret"},
+        )
+
+    assert response.status_code == 200
+    assert loops == [None]
@@ -0,0 +1,181 @@
+""" Tests for the authorization policies """
+
+from typing import Any
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.auth.policy import COMPILED_POLICIES, compile_policy, scope_bit
+from app.main import app
+from app.middlewares.auth import authenticate_user
+from app.models.role import DefaultRole, DefaultRoleSchema
+from app.models.scope import DefaultScope, DefaultScopeSchema
+from app.models.user import UserRead
+
+
+def make_user(role: DefaultRole, scope: DefaultScope) -> UserRead:
+    return UserRead(
+        id=1,
+        username="test",
+        email="testuser@test.mail.com",
+        created_at="2022-01-01T00:00:00",
+        edited_at="2022-01-02T00:00:00",
+        role={"id": 1, **DefaultRoleSchema.get_default_roles()[role]},
+        scope={"id": 1, **DefaultScopeSchema.get_default_scopes()[scope]},
+        enterprise={
+            "id": 1,
+            "name": "enterprise1",
+            "accountable_email": "test@test.mail.com",
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "policy, role, scope, allowed",
+    [
+        ("enterprise.read_full", DefaultRole.COLLABORATOR, DefaultScope.ALL, True),
+        (
+            "enterprise.read_full",
+            DefaultRole.COLLABORATOR,
+            DefaultScope.HUMAN_RESOURCE,
+            True,
+        ),
+        ("enterprise.read_full", DefaultRole.MANAGER, DefaultScope.SELLS, False),
+        ("enterprise.update", DefaultRole.OWNER, DefaultScope.ALL, True),
+        ("enterprise.update", DefaultRole.MANAGER, DefaultScope.ALL, False),
+        ("enterprise.delete", DefaultRole.COLLABORATOR, DefaultScope.ALL, False),
+        ("user.list", DefaultRole.OWNER, DefaultScope.ALL, True),
+        ("user.list", DefaultRole.OWNER, DefaultScope.PATRIMONIAL, False),
+    ],
+)
+def test_policy_table(
+    policy: str, role: DefaultRole, scope: DefaultScope, allowed: bool
+):
+    hierarchy = DefaultRole.get_default_hierarchy(role.value)
+
+    assert COMPILED_POLICIES[policy].allows(hierarchy, scope.value) is allowed
+
+
+def test_owner_passes_any_hierarchy_threshold():
+    policy = compile_policy((DefaultScope.SELLS.value,), 0)
+
+    assert policy.allows(1, DefaultScope.SELLS.value)
+    assert not policy.allows(2, DefaultScope.SELLS.value)
+
+
+def test_scope_set_is_closed():
+    with pytest.raises(ValueError):
+        compile_policy(("Logistics",), 3)
+
+    assert scope_bit("Logistics") == 0
+    assert not COMPILED_POLICIES["user.list"].allows(1, "Logistics")
+
+
+@pytest.mark.parametrize(
+    "policy, role, scope, target_role, target_scope, allowed",
+    [
+        (
+            "user.delete",
+            DefaultRole.OWNER,
+            DefaultScope.SELLS,
+            DefaultRole.OWNER,
+            DefaultScope.ALL,
+            False,
+        ),
+        (
+            "user.delete",
+            DefaultRole.MANAGER,
+            DefaultScope.ALL,
+            DefaultRole.COLLABORATOR,
+            DefaultScope.SELLS,
+            True,
+        ),
+        (
+            "user.delete",
+            DefaultRole.MANAGER,
+            DefaultScope.SELLS,
+            DefaultRole.COLLABORATOR,
+            DefaultScope.SELLS,
+            True,
+        ),
+        (
+            "user.delete",
+            DefaultRole.MANAGER,
+            DefaultScope.SELLS,
+            DefaultRole.COLLABORATOR,
+            DefaultScope.PATRIMONIAL,
+            False,
+        ),
+        (
+            "user.delete",
+            DefaultRole.COLLABORATOR,
+            DefaultScope.ALL,
+            DefaultRole.MANAGER,
+            DefaultScope.SELLS,
+            False,
+        ),
+        (
+            "user.update",
+            DefaultRole.MANAGER,
+            DefaultScope.SELLS,
+            DefaultRole.OWNER,
+            DefaultScope.SELLS,
+            True,
+        ),
+        (
+            "user.update",
+            DefaultRole.COLLABORATOR,
+            DefaultScope.SELLS,
+            DefaultRole.MANAGER,
+            DefaultScope.SELLS,
+            False,
+        ),
+        (
+            "user.create",
+            DefaultRole.COLLABORATOR,
+            DefaultScope.SELLS,
+            DefaultRole.COLLABORATOR,
+            DefaultScope.SELLS,
+            True,
+        ),
+    ],
+)
+def test_target_policies(
+    policy: str,
+    role: DefaultRole,
+    scope: DefaultScope,
+    target_role: DefaultRole,
+    target_scope: DefaultScope,
+    allowed: bool,
+):
+    # pylint: disable=too-many-arguments
+
+    assert (
+        COMPILED_POLICIES[policy].allows_over(
+            DefaultRole.get_default_hierarchy(role.value),
+            scope.value,
+            DefaultRole.get_default_hierarchy(target_role.value),
+            target_scope.value,
+        )
+        is allowed
+    )
+
+
+def test_route_denied_before_running(test_client: TestClient):
+    user = make_user(DefaultRole.COLLABORATOR, DefaultScope.SELLS)
+
+    def override_authenticate_user(token: str = "") -> Any:
+        # pylint: disable=unused-argument
+
+        return user
+
+    app.dependency_overrides[authenticate_user] = override_authenticate_user
+
+    try:
+        response = test_client.get("/enterprise/full")
+        assert response.status_code == 403
+
+        response = test_client.put("/enterprise/", json={"name": "renamed"})
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(authenticate_user, None)
@@ -0,0 +1,78 @@
+""" Tests for the instrumented connection pool """
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db import pool as db_pool
+from app.db import settings as st
+
+
+def _engine(pool_size=1, max_overflow=0):
+    return create_engine(
+        "sqlite://",
+        poolclass=db_pool.InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=0.05,
+    )
+
+
+def test_checkout_wait_is_recorded():
+    engine = _engine()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+        status = db_pool.get_pool_status(engine.pool)
+        assert status["checked_out"] == 1
+        assert status["utilization"] == 1.0
+
+    status = db_pool.get_pool_status(engine.pool)
+
+    assert status["checkouts"] == 1
+    assert status["timeouts"] == 0
+    assert status["checked_out"] == 0
+    assert sum(status["wait_buckets"].values()) == 1
+
+
+def test_checkout_timeout_is_recorded():
+    engine = _engine()
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    status = db_pool.get_pool_status(engine.pool)
+
+    assert status["timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.05
+
+
+def test_pool_size_defaults(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(st, "DB_POD_MAX_CONNECTIONS", 0)
+    monkeypatch.setattr(st, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(st, "DB_MAX_OVERFLOW", 3)
+
+    assert db_pool.get_pool_size() == (7, 3)
+
+
+def test_pool_size_split_by_pod_budget(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(st, "DB_POD_MAX_CONNECTIONS", 40)
+    monkeypatch.setattr(st, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(st, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(st, "DB_MAX_OVERFLOW", 5)
+
+    pool_size, max_overflow = db_pool.get_pool_size()
+
+    assert pool_size + max_overflow == 10
+    assert pool_size == 5
+
+
+def test_connect_args_have_server_timeouts(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(st, "DB_STATEMENT_TIMEOUT_MS", 1000)
+    monkeypatch.setattr(st, "DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", 0)
+
+    connect_args = db_pool.get_connect_args()
+
+    assert connect_args["options"] == "-c statement_timeout=1000"
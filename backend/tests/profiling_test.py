@@ -0,0 +1,116 @@
+""" Tests for the request profiling """
+
+from pathlib import Path
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.middlewares.profiling import ProfilingMiddleware
+from app.profiling import ProfilingState, StackSampler, profiler, route_folder
+from app.router import admin
+
+
+@pytest.fixture
+def profiling(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(profiler, "state", ProfilingState(enabled=False))
+    monkeypatch.setattr(profiler, "directory", tmp_path)
+    monkeypatch.setattr(profiler.sampler, "interval", 0.001)
+    return profiler
+
+
+def _busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collapses_busy_stacks():
+    sampler = StackSampler(0.001)
+    profile = sampler.subscribe()
+
+    worker = threading.Thread(target=_busy_wait, args=(0.1,))
+    worker.start()
+    worker.join()
+    sampler.unsubscribe(profile)
+
+    assert profile.samples > 0
+    assert any(stack.endswith("._busy_wait") for stack in profile.stacks)
+    assert all(
+        line.rsplit(" ", 1)[1].isdigit() for line in profile.folded().split("\n")[:-1]
+    )
+
+
+def test_route_folder():
+    assert route_folder("GET /users/{user_id}") == "GET_users_user_id"
+    assert route_folder("GET /enterprise/full") == "GET_enterprise_full"
+
+
+def _write_with_retry(folder: Path) -> list[Path]:
+    # Profiles are written by the executor after the response.
+    for _ in range(100):
+        files = list(folder.glob("*.folded"))
+        if files:
+            return files
+        time.sleep(0.01)
+    return []
+
+
+def test_slow_requests_are_profiled_per_route(profiling, tmp_path: Path):
+    profiling.configure(enabled=True, sample_rate=0.0, slow_seconds=0.05)
+
+    test_app = FastAPI()
+    test_app.add_middleware(ProfilingMiddleware)
+
+    @test_app.get("/slow/{item}")
+    def slow(item: int):
+        _busy_wait(0.1)
+        return {"item": item}
+
+    @test_app.get("/fast")
+    def fast():
+        return {}
+
+    with TestClient(test_app) as client:
+        assert client.get("/slow/1").status_code == 200
+        assert client.get("/fast").status_code == 200
+
+    files = _write_with_retry(tmp_path / "GET_slow_item")
+
+    assert len(files) == 1
+    assert "_busy_wait" in files[0].read_text(encoding="utf-8")
+    assert not (tmp_path / "GET_fast").exists()
+
+
+def test_admin_toggle(
+    profiling, monkeypatch: pytest.MonkeyPatch, test_client: TestClient
+):
+    assert test_client.get("/admin/profiling").status_code == 404
+
+    monkeypatch.setattr(admin, "PROFILING_ADMIN_TOKEN", "secret")
+
+    assert test_client.get("/admin/profiling").status_code == 401
+
+    response = test_client.put(
+        "/admin/profiling",
+        headers={"X-Admin-Token": "secret"},
+        json={"enabled": True, "sample_rate": 0.5},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["enabled"] is True
+    assert profiling.state.sample_rate == 0.5
+
+    profiling.toggle()
+
+    assert profiling.state.enabled is False
+    assert (
+        test_client.put(
+            "/admin/profiling",
+            headers={"X-Admin-Token": "secret"},
+            json={"sample_rate": 2},
+        ).status_code
+        == 422
+    )
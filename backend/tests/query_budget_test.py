@@ -0,0 +1,131 @@
+""" SQL statement budgets of the user and enterprise routes """
+
+from typing import Any
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlmodel import Session
+
+from app.models.role import DefaultRole
+from app.models.scope import DefaultScope
+from app.models.user import User
+
+# Members added to the enterprise, so per-row queries exceed the budgets.
+MEMBERS = 5
+
+
+@pytest.fixture
+def members(db_session: Session, create_default_user: dict[str, Any]) -> list[User]:
+    roles = {role.name: role.id for role in create_default_user["roles"]}
+    scopes = {scope.name: scope.id for scope in create_default_user["scopes"]}
+    role_names = [DefaultRole.MANAGER.value, DefaultRole.COLLABORATOR.value]
+    scope_names = [scope.value for scope in DefaultScope if scope != DefaultScope.ALL]
+
+    users = [
+        User(
+            username=f"member{index}",
+            email=f"member{index}@example.com",
+            hashed_password="somehashedpassword",
+            role_id=roles[role_names[index % len(role_names)]],
+            scope_id=scopes[scope_names[index % len(scope_names)]],
+            enterprise_id=create_default_user["enterprise"].id,
+        )
+        for index in range(MEMBERS)
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+
+    for user in users:
+        db_session.refresh(user)
+
+    # Start every request from an empty identity map, as a new session would.
+    db_session.expunge_all()
+
+    return users
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "budget"),
+    [
+        ("GET", "/users/me", 0),
+        ("GET", "/users/{member_id}", 1),
+        ("GET", "/users/", 2),
+        ("GET", "/users/?role_names=Collaborator&scope_names=Sells", 5),
+        ("GET", "/users/?usernames=member&emails=example", 2),
+        ("GET", "/enterprise/", 1),
+        ("GET", "/enterprise/full", 4),
+    ],
+)
+def test_read_routes_within_budget(
+    test_client_authenticated_default: TestClient,
+    members: list[User],
+    query_budget,
+    method: str,
+    url: str,
+    budget: int,
+):
+    # pylint: disable=redefined-outer-name,too-many-arguments
+
+    with query_budget(budget):
+        response = test_client_authenticated_default.request(
+            method, url.format(member_id=members[0].id)
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "body", "budget"),
+    [
+        (
+            "POST",
+            "/users/",
+            {
+                "username": "budget",
+                "email": "budget@example.com",
+                "password": "budgetpassword",
+                "role_name": "Collaborator",
+                "scope_name": "Sells",
+            },
+            7,
+        ),
+        ("PUT", "/users/me", {"full_name": "Budget"}, 6),
+        ("PUT", "/users/{member_id}", {"full_name": "Budget"}, 9),
+        ("DELETE", "/users/{member_id}", None, 8),
+        ("PUT", "/enterprise/", {"name": "Budget"}, 3),
+        (
+            "POST",
+            "/enterprise/signup",
+            {
+                "enterprise": {
+                    "name": "Budget",
+                    "accountable_email": "budget@example.com",
+                },
+                "user": {
+                    "username": "budget",
+                    "email": "budget@example.com",
+                    "password": "budgetpassword",
+                },
+            },
+            15,
+        ),
+        ("DELETE", "/enterprise/", None, 13),
+    ],
+)
+def test_write_routes_within_budget(
+    test_client_authenticated_default: TestClient,
+    members: list[User],
+    query_budget,
+    method: str,
+    url: str,
+    body: dict[str, Any] | None,
+    budget: int,
+):
+    # pylint: disable=redefined-outer-name,too-many-arguments
+
+    with query_budget(budget):
+        response = test_client_authenticated_default.request(
+            method, url.format(member_id=members[0].id), json=body
+        )
+
+    assert response.status_code in (200, 201)
@@ -0,0 +1,150 @@
+""" Tests for the login throttling """
+
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.auth import rate_limit
+from app.auth.rate_limit import (
+    Limit,
+    LocalBucketStore,
+    LoginRateLimiter,
+    TrustedProxies,
+    client_address,
+    load_store,
+    login_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    store = LocalBucketStore(clock=clock)
+
+    assert [store.take("key", 2, 0.5) for _ in range(2)] == [0, 0]
+    assert store.take("key", 2, 0.5) == pytest.approx(2.0)
+
+    clock.now = 2.0
+    assert store.take("key", 2, 0.5) == 0
+    assert store.take("key", 2, 0.5) > 0
+
+
+def test_bucket_store_drops_least_recently_used():
+    store = LocalBucketStore(max_keys=2)
+
+    for key in ("a", "b", "a", "c"):
+        store.take(key, 1, 1)
+
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_limiter_checks_ip_before_email():
+    store = LocalBucketStore(clock=FakeClock())
+    limiter = LoginRateLimiter(store, Limit("ip", 1, 60), Limit("email", 3, 60))
+
+    assert limiter.attempt("10.0.0.1", "User@Mail.com") == 0
+    assert limiter.attempt("10.0.0.1", "user@mail.com") > 0
+    # The rejected attempt did not take from the email bucket.
+    assert limiter.attempt("10.0.0.2", "user@mail.com") == 0
+    assert limiter.attempt("10.0.0.3", "user@mail.com") == 0
+    assert limiter.attempt("10.0.0.4", "user@mail.com") > 0
+
+
+def test_zero_rate_turns_a_limit_off():
+    store = LocalBucketStore(clock=FakeClock())
+    limiter = LoginRateLimiter(store, Limit("ip", 1, 0), Limit("email", 1, 60))
+
+    assert limiter.attempt("10.0.0.1", "user@mail.com") == 0
+    assert limiter.attempt("10.0.0.1", "other@mail.com") == 0
+    assert limiter.attempt("10.0.0.1", "user@mail.com") > 0
+
+    limiter = LoginRateLimiter(store, Limit("ip", 1, 60), Limit("email", 1, 0))
+
+    assert limiter.attempt("10.0.0.2", "user@mail.com") == 0
+    assert limiter.attempt("10.0.0.3", "user@mail.com") == 0
+
+
+def test_client_address_behind_trusted_proxies():
+    trusted = TrustedProxies(["10.0.0.0/8", "ingress"])
+
+    assert client_address("203.0.113.7", "198.51.100.1", trusted) == "203.0.113.7"
+    assert client_address("10.1.2.3", "198.51.100.1", trusted) == "198.51.100.1"
+    # Entries left of the proxies' own are the client's to make up.
+    assert (
+        client_address("10.1.2.3", "1.2.3.4, 198.51.100.1, 10.9.9.9", trusted)
+        == "198.51.100.1"
+    )
+    assert client_address("ingress", "198.51.100.1", trusted) == "198.51.100.1"
+    assert client_address("10.1.2.3", None, trusted) is None
+    assert client_address("10.1.2.3", "10.9.9.9", trusted) is None
+    assert client_address(None, "198.51.100.1", trusted) is None
+
+
+def test_load_store_accepts_a_factory():
+    assert isinstance(load_store("local"), LocalBucketStore)
+    assert isinstance(
+        load_store("app.auth.rate_limit:LocalBucketStore"), LocalBucketStore
+    )
+
+
+def test_login_is_throttled_before_hashing(
+    test_client: TestClient, user_with_password: Any
+):
+    form = {"username": user_with_password.email, "password": "wrong"}
+
+    for _ in range(int(login_limiter.email_limit.burst)):
+        assert test_client.post("/auth/login", data=form).status_code == 401
+
+    with patch("app.router.login.validate_hashed_data") as verify:
+        response = test_client.post("/auth/login", data=form)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    verify.assert_not_called()
+
+
+def test_successful_login_refills_the_email_bucket(
+    test_client: TestClient, user_with_password: Any
+):
+    email = user_with_password.email
+
+    for _ in range(int(login_limiter.email_limit.burst) - 1):
+        test_client.post("/auth/login", data={"username": email, "password": "x"})
+
+    response = test_client.post(
+        "/auth/login", data={"username": email, "password": "secret"}
+    )
+    assert response.status_code == 200
+
+    response = test_client.post(
+        "/auth/login", data={"username": email, "password": "x"}
+    )
+    assert response.status_code == 401
+
+
+def test_clients_behind_the_proxy_get_their_own_bucket(
+    monkeypatch: pytest.MonkeyPatch, test_client: TestClient
+):
+    monkeypatch.setattr(rate_limit, "trusted_proxies", TrustedProxies(["testclient"]))
+    monkeypatch.setattr(login_limiter, "ip_limit", Limit("ip", 2, 1))
+
+    def login(forwarded_for: str, email: str) -> int:
+        return test_client.post(
+            "/auth/login",
+            data={"username": email, "password": "x"},
+            headers={"X-Forwarded-For": forwarded_for},
+        ).status_code
+
+    assert login("203.0.113.7", "a@mail.com") == 401
+    assert login("203.0.113.7", "b@mail.com") == 401
+    assert login("203.0.113.7", "c@mail.com") == 429
+    assert login("198.51.100.1", "d@mail.com") == 401
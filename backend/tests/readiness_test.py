@@ -0,0 +1,139 @@
+""" Tests for the readiness checks and the /check/ready endpoint """
+
+import asyncio
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine
+
+from app.db import conn
+from app.db.pool import InstrumentedQueuePool
+from app.health import (
+    PoolSaturation,
+    Readiness,
+    build_readiness,
+    check_in_flight,
+    consumer_check,
+)
+from app.main import app
+from app.middlewares.metrics import in_flight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_results_are_cached_and_rounds_shared():
+    calls = []
+
+    async def database():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    clock = FakeClock()
+    readiness = Readiness({"database": database}, cache_seconds=1, clock=clock)
+
+    async def probe():
+        return await asyncio.gather(readiness.check(), readiness.check())
+
+    first, second = asyncio.run(probe())
+    assert first == second == (True, {"database": "ok"})
+    assert len(calls) == 1
+
+    asyncio.run(readiness.check())
+    assert len(calls) == 1
+
+    clock.now = 2
+    asyncio.run(readiness.check())
+    assert len(calls) == 2
+
+
+def test_slow_and_failing_checks_make_it_not_ready():
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def broken():
+        raise ConnectionError("refused")
+
+    readiness = Readiness({"slow": slow, "broken": broken}, timeout_seconds=0.01)
+
+    ready, checks = asyncio.run(readiness.check())
+
+    assert not ready
+    assert checks["slow"].startswith("no answer")
+    assert checks["broken"] == "ConnectionError: refused"
+
+
+def test_pool_saturation_looks_at_the_recent_waits(monkeypatch: pytest.MonkeyPatch):
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+    monkeypatch.setattr(conn, "engine", engine)
+    saturation = PoolSaturation(max_wait_seconds=0.5)
+    stats = engine.pool.stats
+
+    stats.observe(2.0)
+    stats.observe(0.0)
+    assert asyncio.run(saturation()) == "checkouts waited 1.000s on average"
+
+    stats.observe(0.1)
+    assert asyncio.run(saturation()) is None
+
+    stats.observe(10.0, timed_out=True)
+    assert asyncio.run(saturation()) == "1 checkouts timed out"
+
+
+def test_in_flight_threshold(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(in_flight, "count", 3)
+
+    assert asyncio.run(check_in_flight(2)) == "3 requests in flight"
+    assert asyncio.run(check_in_flight(3)) is None
+    assert asyncio.run(check_in_flight(0)) is None
+
+
+def test_consumer_task_must_be_running():
+    class State:
+        consumer = None
+
+    check = consumer_check(State)
+    assert asyncio.run(check()) == "not started"
+
+    async def finished():
+        State.consumer = asyncio.get_running_loop().create_task(asyncio.sleep(0))
+        await State.consumer
+        return await check()
+
+    assert asyncio.run(finished()) == "stopped"
+
+
+def test_dead_consumer_fails_readiness_by_default():
+    class State:
+        consumer = None
+
+    checks = build_readiness(State).checks
+
+    assert {"consumer", "publisher"} <= set(checks)
+    assert asyncio.run(checks["consumer"]()) == "not started"
+
+
+def test_ready_endpoint(monkeypatch: pytest.MonkeyPatch, test_client: TestClient):
+    healthy = True
+
+    async def database():
+        return None if healthy else "unreachable"
+
+    monkeypatch.setattr(
+        app.state, "readiness", Readiness({"database": database}, cache_seconds=0)
+    )
+
+    response = test_client.get("/check/ready")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "checks": {"database": "ok"}}
+
+    healthy = False
+    response = test_client.get("/check/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"] == {"database": "unreachable"}
+    assert test_client.get("/check/").status_code == 200
@@ -0,0 +1,94 @@
+""" Tests for the refresh tokens """
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.auth.refresh_token import hash_refresh_token, utcnow
+from app.models.refresh_token import RefreshToken
+
+
+def login(client: TestClient, email: str) -> dict[str, Any]:
+    response = client.post(
+        "/auth/login", data={"username": email, "password": "secret"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_without_verifying_the_password(
+    test_client: TestClient, user_with_password: Any
+):
+    # The login closes the test session, keep what is needed from the user.
+    email = user_with_password.email
+    tokens = login(test_client, email)
+
+    with patch("app.router.login.validate_hashed_data") as verify:
+        response = test_client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+
+    verify.assert_not_called()
+    assert response.status_code == 200
+
+    renewed = response.json()
+    assert renewed["refresh_token"] != tokens["refresh_token"]
+
+    response = test_client.get(
+        "/users/me",
+        headers={"Authorization": f"Bearer {renewed['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["email"] == email
+
+
+def test_stored_tokens_are_hashed(
+    test_client: TestClient, db_session: Session, user_with_password: Any
+):
+    email = user_with_password.email
+    token = login(test_client, email)["refresh_token"]
+
+    stored = db_session.exec(select(RefreshToken.token_hash)).all()
+
+    assert stored == [hash_refresh_token(token)]
+    assert token not in stored
+
+
+def test_reuse_revokes_the_family(test_client: TestClient, user_with_password: Any):
+    email = user_with_password.email
+    first = login(test_client, email)["refresh_token"]
+    other_login = login(test_client, email)["refresh_token"]
+
+    second = test_client.post("/auth/refresh", json={"refresh_token": first}).json()
+
+    reused = test_client.post("/auth/refresh", json={"refresh_token": first})
+    assert reused.status_code == 401
+
+    revoked = test_client.post(
+        "/auth/refresh", json={"refresh_token": second["refresh_token"]}
+    )
+    assert revoked.status_code == 401
+
+    untouched = test_client.post("/auth/refresh", json={"refresh_token": other_login})
+    assert untouched.status_code == 200
+
+
+def test_expired_and_unknown_tokens_are_rejected(
+    test_client: TestClient, db_session: Session, user_with_password: Any
+):
+    email = user_with_password.email
+    token = login(test_client, email)["refresh_token"]
+
+    stored = db_session.exec(select(RefreshToken)).one()
+    stored.expires_at = utcnow() - timedelta(seconds=1)
+    db_session.add(stored)
+    db_session.commit()
+
+    for refresh_token in (token, "unknown"):
+        response = test_client.post(
+            "/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 401
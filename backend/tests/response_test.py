@@ -0,0 +1,32 @@
+""" Tests for the shared JSON response class """
+
+from datetime import datetime, timezone
+import json
+
+from app.models.api_response import APIResponse
+from app.models.enterprise import Enterprise
+from app.router.response import ModelResponse
+
+
+def test_renders_models_without_revalidation():
+    response = ModelResponse(
+        APIResponse(status=201, message="Created"), status_code=201
+    )
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == {"status": 201, "message": "Created"}
+
+
+def test_renders_nested_table_models():
+    enterprise = Enterprise(
+        id=1, name="Jarucucu", accountable_email="a@test.com", activity_type="Fishing"
+    )
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    body = json.loads(
+        ModelResponse({"data": {"items": [enterprise], "created": created}}).body
+    )
+
+    assert body["data"]["items"][0]["name"] == "Jarucucu"
+    assert body["data"]["created"].startswith("2024-01-01T00:00:00")
@@ -0,0 +1,144 @@
+""" Tests for the access token revocation """
+
+from time import time
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.auth.revocation import (
+    ACCESS_TOKEN_LIFETIME,
+    RevocationIndex,
+    decode_revocations,
+    encode_revocations,
+    revocations,
+)
+from app.auth.token_version import token_versions
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def login(client: TestClient, email: str) -> dict[str, Any]:
+    response = client.post(
+        "/auth/login", data={"username": email, "password": "secret"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(tokens: dict[str, Any]) -> dict[str, str]:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_index_drops_entries_once_expired():
+    clock = FakeClock(1000)
+    index = RevocationIndex(resolution=10, clock=clock)
+
+    index.revoke({"a": 1005, "b": 2000}, {7: 1000})
+
+    assert index.is_revoked("a", 1, 0)
+    assert index.is_revoked(None, 7, 999)
+    assert not index.is_revoked(None, 7, 1000)
+
+    clock.now = 1020
+    assert not index.is_revoked("a", 1, 0)
+    assert index.is_revoked("b", 1, 0)
+    assert len(index) == 2
+
+    clock.now = 1000 + ACCESS_TOKEN_LIFETIME + 10
+    index.purge()
+    assert len(index) == 0
+
+
+def test_latest_not_before_wins():
+    index = RevocationIndex()
+
+    index.revoke(not_before={7: 200})
+    index.revoke(*decode_revocations(encode_revocations({}, {7: 100})))
+
+    assert index.is_revoked(None, 7, 150)
+
+
+def test_logout_revokes_access_and_refresh_tokens(
+    test_client: TestClient, user_with_password: Any
+):
+    tokens = login(test_client, user_with_password.email)
+    assert test_client.get("/users/me", headers=bearer(tokens)).status_code == 200
+
+    response = test_client.post(
+        "/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers=bearer(tokens),
+    )
+    assert response.status_code == 204
+
+    assert test_client.get("/users/me", headers=bearer(tokens)).status_code == 401
+    refreshed = test_client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert refreshed.status_code == 401
+
+
+def test_logout_everywhere(test_client: TestClient, user_with_password: Any):
+    email = user_with_password.email
+    first, second = login(test_client, email), login(test_client, email)
+
+    with patch("app.auth.revocation.time", return_value=time() + 1):
+        response = test_client.post(
+            "/auth/logout", json={"everywhere": True}, headers=bearer(first)
+        )
+    assert response.status_code == 204
+
+    assert test_client.get("/users/me", headers=bearer(second)).status_code == 401
+    refreshed = test_client.post(
+        "/auth/refresh", json={"refresh_token": second["refresh_token"]}
+    )
+    assert refreshed.status_code == 401
+
+
+def test_password_change_revokes_earlier_tokens(
+    test_client: TestClient, db_session: Session, user_with_password: Any
+):
+    user_id = user_with_password.id
+    tokens = login(test_client, user_with_password.email)
+
+    user = db_session.get(User, user_id)
+    user.hashed_password = "another hash"
+    with patch("app.auth.revocation.time", return_value=time() + 1):
+        db_session.add(user)
+        db_session.commit()
+
+    assert revocations.is_revoked(None, user_id, int(time()))
+    assert test_client.get("/users/me", headers=bearer(tokens)).status_code == 401
+    assert db_session.exec(select(RefreshToken)).all() == []
+
+
+def test_deleted_user_stays_revoked_after_a_restart(
+    test_client: TestClient, db_session: Session, user_with_password: Any
+):
+    user_id = user_with_password.id
+    tokens = login(test_client, user_with_password.email)
+
+    db_session.delete(db_session.get(User, user_id))
+    db_session.commit()
+
+    # A worker started after the delete, or that missed its broadcast.
+    index = RevocationIndex()
+    index.load(db_session)
+
+    assert index.is_revoked(None, user_id, int(time()))
+
+    token_versions.clear()
+    revocations.clear()
+    revocations.load(db_session)
+
+    assert test_client.get("/users/me", headers=bearer(tokens)).status_code == 401
@@ -0,0 +1,102 @@
+""" Tests for the autoscaling signals """
+
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+import pytest
+from sqlalchemy import create_engine
+
+from app.auth import data_hash
+from app.db import conn
+from app.db.pool import InstrumentedQueuePool
+from app.metrics.scaling import ScalingSampler
+from app.middlewares.metrics import in_flight
+
+
+class FakeListener:
+    queue_name = "scaling-test"
+
+    def __init__(self, *counts):
+        self.counts = list(counts)
+
+    async def backlog(self, timeout: float) -> int | None:
+        # pylint: disable=unused-argument
+
+        count = self.counts.pop(0)
+
+        if isinstance(count, Exception):
+            raise count
+
+        return count
+
+
+def test_sample(monkeypatch: pytest.MonkeyPatch):
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+    monkeypatch.setattr(conn, "engine", engine)
+    monkeypatch.setattr(in_flight, "count", 3)
+    sampler = ScalingSampler()
+
+    engine.pool.stats.observe(0.2)
+    engine.pool.stats.observe(0.0)
+    sampler.sample(0.25)
+
+    assert REGISTRY.get_sample_value("rh_http_requests_in_flight") == 3
+    assert REGISTRY.get_sample_value("rh_event_loop_lag_seconds") == 0.25
+    assert REGISTRY.get_sample_value("rh_db_pool_recent_wait_seconds") == pytest.approx(
+        0.1
+    )
+
+    # Only the checkouts since the previous sample count.
+    sampler.sample(0.0)
+    assert REGISTRY.get_sample_value("rh_db_pool_recent_wait_seconds") == 0
+
+
+def test_blocked_loop_shows_as_lag():
+    async def scenario() -> float | None:
+        sampler = ScalingSampler(interval=0.01)
+        sampler.start()
+        await asyncio.sleep(0.02)
+
+        time.sleep(0.1)
+
+        # The overdue sample runs first, the next one is 10ms away.
+        await asyncio.sleep(0.001)
+        lag = REGISTRY.get_sample_value("rh_event_loop_lag_seconds")
+        await sampler.stop()
+
+        return lag
+
+    assert asyncio.run(scenario()) >= 0.05
+
+
+def test_backlog_keeps_the_last_count():
+    def backlog() -> float | None:
+        return REGISTRY.get_sample_value(
+            "rh_consumer_backlog_messages", {"queue": "scaling-test"}
+        )
+
+    sampler = ScalingSampler(FakeListener(12, asyncio.TimeoutError(), None))
+
+    asyncio.run(sampler.sample_backlog())
+    assert backlog() == 12
+
+    asyncio.run(sampler.sample_backlog())
+    asyncio.run(sampler.sample_backlog())
+    assert backlog() == 12
+
+
+def test_hashes_in_progress(monkeypatch: pytest.MonkeyPatch):
+    seen = []
+
+    class Context:
+        def hash(self, data: str) -> str:
+            seen.append(REGISTRY.get_sample_value("rh_password_hash_in_progress"))
+            return data
+
+    monkeypatch.setattr(data_hash, "passord_hash", Context())
+
+    data_hash.get_hashed_data("secret")
+
+    assert seen == [1]
+    assert REGISTRY.get_sample_value("rh_password_hash_in_progress") == 0
@@ -0,0 +1,133 @@
+""" Tests for the production launcher and the consumer election """
+
+import asyncio
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from app import server
+from app.messages.election import FileLeaderLock, run_consumer, supervise
+
+
+def _cgroup(tmp_path: Path, files: dict[str, str]) -> Path:
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return tmp_path
+
+
+def test_cpu_quota_from_cgroup_v2(tmp_path: Path):
+    assert server.cpu_quota(_cgroup(tmp_path, {"cpu.max": "150000 100000\n"})) == 1.5
+
+
+def test_cpu_quota_unlimited(tmp_path: Path):
+    assert server.cpu_quota(_cgroup(tmp_path, {"cpu.max": "max 100000\n"})) is None
+    assert server.cpu_quota(tmp_path / "missing") is None
+
+
+def test_cpu_quota_from_cgroup_v1(tmp_path: Path):
+    root = _cgroup(
+        tmp_path,
+        {"cpu/cpu.cfs_quota_us": "30000", "cpu/cpu.cfs_period_us": "100000"},
+    )
+
+    assert server.cpu_quota(root) == 0.3
+
+
+def test_worker_count_follows_cpus():
+    assert server.worker_count(0.3, per_cpu=1, maximum=16, override=0) == 1
+    assert server.worker_count(2.5, per_cpu=1, maximum=16, override=0) == 3
+    assert server.worker_count(8, per_cpu=2, maximum=10, override=0) == 10
+    assert server.worker_count(8, per_cpu=1, maximum=16, override=2) == 2
+
+
+def test_config_uses_uvicorn_workers_without_reload():
+    config = server.get_config(cpus=2)
+
+    assert config["workers"] >= 1
+    assert config["worker_class"] == "app.server.Worker"
+    assert config["max_requests_jitter"] > 0
+    assert server.Worker.CONFIG_KWARGS["loop"] == "uvloop"
+    assert "reload" not in config
+
+
+def test_workers_split_the_pod_connections(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 0)
+    config = server.get_config(cpus=4)
+
+    server.export_worker_count(config["workers"])
+
+    # A worker reads its settings when it imports them, after the fork.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from app.db.pool import get_pool_size; print(sum(get_pool_size()))",
+        ],
+        env={**os.environ, "DB_POD_MAX_CONNECTIONS": "40"},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert os.environ["WEB_CONCURRENCY"] == str(config["workers"])
+    assert int(result.stdout) == 40 // config["workers"]
+
+
+def test_only_one_lock_holder(tmp_path: Path):
+    path = str(tmp_path / "consumer.lock")
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    first.release()
+
+    assert second.try_acquire()
+    second.release()
+
+
+def test_elected_consumer_waits_for_the_lock(tmp_path: Path):
+    path = str(tmp_path / "consumer.lock")
+    holder = FileLeaderLock(path)
+    holder.try_acquire()
+    started = []
+
+    async def listen():
+        started.append(True)
+
+    async def scenario():
+        task = asyncio.create_task(
+            run_consumer(listen, lambda: True, "elected", path, retry_seconds=0.01)
+        )
+        await asyncio.sleep(0.05)
+        assert not started
+
+        holder.release()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(scenario())
+
+    assert started == [True]
+
+
+def test_consumer_is_restarted_until_stopped():
+    runs = []
+
+    async def listen():
+        runs.append(True)
+
+        if len(runs) == 1:
+            raise ConnectionError("broker unreachable")
+
+    async def scenario():
+        await asyncio.wait_for(supervise(listen, lambda: len(runs) == 3, 0.01, 0.02), 1)
+
+    asyncio.run(scenario())
+
+    assert len(runs) == 3
@@ -0,0 +1,104 @@
+""" Tests for the graceful shutdown of the broker clients """
+
+import asyncio
+import threading
+
+from app.messages.client import AsyncSender
+from app.messages.subscriber import AsyncListener
+from app.middlewares import send_message
+
+
+class FakeConnection:
+    def __init__(self):
+        self.is_closed = False
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeQueueIterator:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_drain_publishes_waits_then_cancels(monkeypatch):
+    sender = AsyncSender(queue_name="rh_event.#")
+    sender.connection = FakeConnection()
+    monkeypatch.setattr(send_message, "event_sender", sender)
+
+    async def scenario():
+        quick = asyncio.create_task(asyncio.sleep(0.01))
+        stuck = asyncio.create_task(asyncio.sleep(10))
+        send_message._pending_publishes.update({quick, stuck})
+
+        cancelled = await send_message.drain_publishes(0.2)
+        await asyncio.gather(stuck, return_exceptions=True)
+
+        return quick, stuck, cancelled
+
+    quick, stuck, cancelled = asyncio.run(scenario())
+
+    assert cancelled == 1
+    assert quick.done() and not quick.cancelled()
+    assert stuck.cancelled()
+    assert sender.connection is None
+
+
+def test_join_sender_threads_reports_stragglers():
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    send_message._sender_threads.add(thread)
+    thread.start()
+
+    try:
+        assert send_message.join_sender_threads(0.05) == 1
+    finally:
+        release.set()
+        thread.join()
+        send_message._sender_threads.discard(thread)
+
+    assert send_message.join_sender_threads(0.05) == 0
+
+
+def test_listener_stop_lets_the_handler_finish():
+    listener = AsyncListener(queue_name="test", processor=print)
+    listener.queue_iter = FakeQueueIterator()
+    connection = listener.connection = FakeConnection()
+
+    async def scenario():
+        task = asyncio.create_task(asyncio.sleep(0.05, "handled"))
+        await listener.stop(task, 1)
+        return task
+
+    task = asyncio.run(scenario())
+
+    assert listener.stopping
+    assert listener.queue_iter.closed
+    assert task.result() == "handled"
+    assert connection.is_closed
+
+
+def test_listener_stop_cancels_after_the_deadline():
+    listener = AsyncListener(queue_name="test", processor=print)
+    listener.queue_iter = FakeQueueIterator()
+
+    async def scenario():
+        task = asyncio.create_task(asyncio.sleep(10))
+        await listener.stop(task, 0.05)
+        return task
+
+    assert asyncio.run(scenario()).cancelled()
+
+
+def test_listener_stop_cancels_while_not_consuming():
+    listener = AsyncListener(queue_name="test", processor=print)
+
+    async def scenario():
+        task = asyncio.create_task(asyncio.sleep(10))
+        await listener.stop(task, 10)
+        return task
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 1)).cancelled()
@@ -0,0 +1,141 @@
+""" Tests for the token version freshness check """
+
+import json
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import pytest
+from sqlmodel import Session
+
+from app.auth.jwt_utils import create_jwt_token
+from app.auth.token_version import (
+    DELETED,
+    decode_versions,
+    encode_versions,
+    token_versions,
+)
+from app.middlewares import auth
+from app.models.user import User, UserRead
+
+
+def create_token(user: User) -> str:
+    user_read = UserRead(
+        **user.model_dump(),
+        role=user.role.model_dump(),  # type: ignore
+        scope=user.scope.model_dump(),  # type: ignore
+        enterprise=user.enterprise.model_dump(),  # type: ignore
+    )
+
+    return create_jwt_token(
+        json.loads(user_read.model_dump_json(exclude_none=True)),
+        claims={"ver": user.token_version},
+    )
+
+
+@pytest.fixture(name="primary_session")
+def fixture_primary_session(monkeypatch: pytest.MonkeyPatch, db_session: Session):
+    def override_get_db():
+        yield db_session
+
+    monkeypatch.setattr(auth, "get_db", override_get_db)
+
+    return db_session
+
+
+def test_claim_change_bumps_version(
+    db_session: Session, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+    assert user.token_version == 1
+
+    user.email = "changed@example.com"
+    db_session.add(user)
+    db_session.commit()
+
+    assert user.token_version == 2
+    assert token_versions.get(user.id) == 2  # type: ignore
+
+
+def test_password_change_keeps_version(
+    db_session: Session, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+
+    user.hashed_password = "anotherhashedpassword"
+    db_session.add(user)
+    db_session.commit()
+
+    assert user.token_version == 1
+    assert token_versions.get(user.id) is None  # type: ignore
+
+
+def test_current_token_skips_database(
+    monkeypatch: pytest.MonkeyPatch, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+    token = create_token(user)
+
+    def fail_get_db():
+        raise AssertionError("database should not be read")
+
+    monkeypatch.setattr(auth, "get_db", fail_get_db)
+    token_versions.set(user.id, user.token_version)  # type: ignore
+
+    assert auth.authenticate_user(token).email == user.email
+
+
+def test_stale_token_reloads_user(
+    primary_session: Session, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+    token = create_token(user)
+
+    user.full_name = "Renamed User"
+    primary_session.add(user)
+    primary_session.commit()
+
+    authenticated = auth.authenticate_user(token)
+
+    assert authenticated.full_name == "Renamed User"
+    assert token_versions.get(user.id) == 2  # type: ignore
+
+
+def test_deleted_user_token_is_rejected(
+    primary_session: Session, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+    token = create_token(user)
+
+    primary_session.delete(user)
+    primary_session.commit()
+
+    assert token_versions.get(user.id) == DELETED  # type: ignore
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.authenticate_user(token)
+
+    assert exc_info.value.status_code == 401
+
+
+def test_update_me_bumps_version(
+    test_client_authenticated_default: TestClient, create_default_user: dict[str, Any]
+):
+    user: User = create_default_user["user"]
+
+    response = test_client_authenticated_default.put(
+        "/users/me", json={"username": "renamed"}
+    )
+
+    assert response.status_code == 200
+    assert token_versions.get(user.id) == 2  # type: ignore
+
+
+def test_broadcast_versions_keep_newest():
+    token_versions.observe(decode_versions(encode_versions({1: 3, 2: 2})))
+    token_versions.observe({1: 2})
+
+    assert token_versions.get(1) == 3
+    assert token_versions.is_stale(1, 2)
+    assert not token_versions.is_stale(2, 2)
+    assert not token_versions.is_stale(3, 1)
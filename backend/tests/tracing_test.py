@@ -0,0 +1,96 @@
+""" Tests for the OpenTelemetry tracing """
+
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.util._once import Once
+import pytest
+
+from app.messages.subscriber import AsyncListener
+from app.tracing import configure_tracing, inject_context, setup, tracer
+
+
+@pytest.fixture(name="spans", scope="module")
+def fixture_spans():
+    # pylint: disable=protected-access
+
+    exporter = InMemorySpanExporter()
+
+    with pytest.MonkeyPatch.context() as mp:
+        # The global provider can only be set once per process: restored on
+        # teardown, with the cached tracer, so the later test modules run
+        # with the non-recording default again.
+        mp.setattr(trace, "_TRACER_PROVIDER", trace._TRACER_PROVIDER)
+        mp.setattr(trace, "_TRACER_PROVIDER_SET_ONCE", Once())
+        mp.setattr(setup, "_provider", setup._provider)
+        mp.setattr(tracer, "_real_tracer", None)
+
+        provider = configure_tracing(exporter=exporter)
+
+        if provider is None:
+            pytest.skip("tracing is already configured with another exporter")
+
+        def finished():
+            provider.force_flush()
+            return exporter.get_finished_spans()
+
+        def reset():
+            provider.force_flush()
+            exporter.clear()
+
+        yield SimpleNamespace(finished=finished, reset=reset)
+
+        provider.shutdown()
+
+
+def test_request_span_continues_caller_trace(
+    spans,
+    test_client_authenticated_default: TestClient,
+    create_default_user: dict[str, Any],
+):
+    spans.reset()
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    response = test_client_authenticated_default.get(
+        f"/users/{create_default_user['user'].id}",
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    assert response.status_code == 200
+
+    finished = spans.finished()
+    server = next(span for span in finished if span.kind == trace.SpanKind.SERVER)
+
+    assert server.name == "GET /users/{user_id}"
+    assert format(server.context.trace_id, "032x") == trace_id
+    assert server.attributes["http.response.status_code"] == 200
+    assert any(
+        span.name == "db select"
+        and span.parent is not None
+        and span.parent.span_id == server.context.span_id
+        for span in finished
+    )
+
+
+def test_consumer_span_continues_publisher_trace(spans):
+    spans.reset()
+    processed = []
+
+    with tracer.start_as_current_span("rh_event publish") as producer:
+        headers = inject_context()
+
+    message = SimpleNamespace(timestamp=None, headers=headers, body=b"{}")
+    listener = AsyncListener("external.rh_event", processed.append)
+    listener.process(message)  # type: ignore[arg-type]
+
+    consumer = next(
+        span for span in spans.finished() if span.name == "external.rh_event process"
+    )
+
+    assert processed == ["{}"]
+    assert consumer.context.trace_id == producer.get_span_context().trace_id
+    assert consumer.parent.span_id == producer.get_span_context().span_id
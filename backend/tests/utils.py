@@ -0,0 +1,40 @@
+""" Helpers shared by the tests """
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Connection, Engine, event
+
+
+@contextmanager
+def count_statements(bind: Connection | Engine) -> Iterator[list[str]]:
+    """
+    Collects the SQL statements executed through ``bind`` inside the block.
+    Connections only see listeners added to their engine before they opened,
+    so pass the open connection when there is one.
+    """
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+@contextmanager
+def statement_budget(bind: Connection | Engine, budget: int) -> Iterator[list[str]]:
+    """Fails when the block executes more than ``budget`` SQL statements."""
+
+    with count_statements(bind) as statements:
+        yield statements
+
+    assert (
+        len(statements) <= budget
+    ), f"{len(statements)} SQL statements, budget is {budget}:\n" + "\n".join(
+        statements
+    )